@@ -0,0 +1,52 @@
+###############################################################################
+#
+# Copyright (C) 2021 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+import os
+
+# benchmarks run against in-process stand-ins, so the environment only needs
+# to satisfy geomet_data_registry.env
+BENCHMARK_ENV = {
+    'GDR_BASEDIR': '/tmp',
+    'GDR_DATADIR': '/tmp',
+    'GDR_TILEINDEX_TYPE': 'Elasticsearch',
+    'GDR_TILEINDEX_BASEURL': 'http://localhost:9200',
+    'GDR_TILEINDEX_NAME': 'geomet-data-registry-benchmark',
+    'GDR_STORE_TYPE': 'Redis',
+    'GDR_STORE_URL': 'redis://localhost:6379',
+    'GDR_METPX_EVENT_FILE_PY': 'geomet_data_registry/event/file_.py',
+    'GDR_METPX_EVENT_MESSAGE_PY': 'geomet_data_registry/event/message.py'
+}
+
+
+def setup_environment(**kwargs):
+    """
+    Sets geomet-data-registry environment variables not already set
+
+    :param kwargs: environment variables overriding the benchmark defaults
+
+    :returns: `None`
+    """
+
+    env = dict(BENCHMARK_ENV, **kwargs)
+
+    for key, value in env.items():
+        if key in kwargs:
+            os.environ[key] = value
+        else:
+            os.environ.setdefault(key, value)
@@ -0,0 +1,95 @@
+###############################################################################
+#
+# Copyright (C) 2026 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+"""
+Microbenchmark of layer plugin dispatch: sequential fnmatch loop over
+PLUGINS['layer'] versus the precompiled LayerDispatchIndex
+
+usage: python -m benchmarks.bench_dispatch [--runs N]
+"""
+
+import argparse
+from fnmatch import fnmatch
+import logging
+import os
+import timeit
+
+from benchmarks import setup_environment
+
+setup_environment()
+
+from geomet_data_registry.handler.dispatch import LayerDispatchIndex  # noqa
+from geomet_data_registry.plugin import PLUGINS  # noqa
+from benchmarks.filenames import all_filenames  # noqa
+
+
+def fnmatch_loop(filename):
+    """dispatch as done previously by CoreHandler.handle"""
+
+    match = None
+    for key, value in PLUGINS['layer'].items():
+        if fnmatch(filename, value['pattern']):
+            match = key
+    return match
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=1,
+                        help='model runs to generate per model')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='timing repetitions (best is reported)')
+    args = parser.parse_args()
+
+    filenames = [os.path.basename(filepath) for filepaths in
+                 all_filenames(runs=args.runs).values()
+                 for filepath in filepaths]
+
+    # ambiguities are reported on every build, which is noise here
+    logging.getLogger('geomet_data_registry').setLevel(logging.ERROR)
+
+    build_time = min(timeit.repeat(
+        lambda: LayerDispatchIndex(PLUGINS['layer']), number=1,
+        repeat=args.repeat))
+    index = LayerDispatchIndex(PLUGINS['layer'])
+
+    mismatches = [f for f in filenames if fnmatch_loop(f) != index.match(f)]
+    if mismatches:
+        raise SystemExit('Dispatch mismatch: {}'.format(mismatches[:10]))
+
+    results = {}
+    for name, func in [('fnmatch loop', fnmatch_loop),
+                       ('dispatch index', index.match)]:
+        elapsed = min(timeit.repeat(
+            lambda: [func(f) for f in filenames], number=1,
+            repeat=args.repeat))
+        results[name] = elapsed
+
+    print('filenames: {}'.format(len(filenames)))
+    print('index build: {:.3f} ms'.format(build_time * 1000))
+    for name, elapsed in results.items():
+        print('{:<15} {:8.3f} ms total {:8.3f} us/file {:10.0f} files/s'
+              .format(name, elapsed * 1000, elapsed / len(filenames) * 1e6,
+                      len(filenames) / elapsed))
+    print('speedup: {:.1f}x'.format(
+        results['fnmatch loop'] / results['dispatch index']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+###############################################################################
+#
+# Copyright (C) 2026 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+"""
+Benchmark of sarracenia event callback latency under a burst of messages:
+the previous FileEvent (setup on every callback, lazily built state)
+versus the warm-start FileEvent (one-time setup in __init__).
+
+Each variant runs in a freshly spawned interpreter, like a newly started
+sr_subscribe instance, against in-process store/tileindex stand-ins with
+a simulated connection setup latency.
+
+usage: python -m benchmarks.bench_events [--model MODEL] [--messages N]
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import statistics
+import time
+from types import SimpleNamespace
+from urllib.parse import urlparse
+
+from benchmarks import setup_environment
+
+setup_environment(GDR_STORE_TYPE='Memory', GDR_TILEINDEX_TYPE='Memory')
+
+from benchmarks import standins  # noqa
+from benchmarks.filenames import load_configs, model_filenames  # noqa
+
+standins.register()
+
+EVENT_PLUGIN = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'geomet_data_registry', 'event', 'file_.py')
+
+
+class LegacyFileEvent:
+    """FileEvent as done previously (setup on every callback)"""
+
+    def __init__(self, parent):
+        pass
+
+    def on_file(self, parent):
+        from geomet_data_registry import env
+        from geomet_data_registry.log import setup_logger
+
+        setup_logger(env.LOGGING_LOGLEVEL, env.LOGGING_LOGFILE)
+
+        try:
+            from urllib.parse import urlunparse
+            from geomet_data_registry.handler.core import CoreHandler
+
+            filepath = parent.msg.local_file
+            url = urlunparse(parent.msg.url)
+            handler = CoreHandler(filepath, url)
+            handler.handle()
+            return True
+        except Exception as err:
+            parent.logger.warning(err)
+            return False
+
+
+def load_event_plugin():
+    """
+    Load the FileEvent plugin the way sarracenia does (exec of the plugin
+    file, which sets `self.plugin`)
+
+    :returns: FileEvent class
+    """
+
+    holder = SimpleNamespace()
+    namespace = {'self': holder}
+
+    with open(EVENT_PLUGIN) as fh:
+        exec(compile(fh.read(), EVENT_PLUGIN, 'exec'), namespace)
+
+    return namespace[holder.plugin]
+
+
+def run_burst(variant, filepaths, connect_latency):
+    """
+    Run a burst of messages through an event plugin (in a fresh process)
+
+    :param variant: `str` of plugin variant (`legacy` or `warm-start`)
+    :param filepaths: `list` of file paths of the burst
+    :param connect_latency: `float` of provider connection setup seconds
+
+    :returns: `dict` of startup seconds and `list` of callback latencies
+    """
+
+    # dispatch ambiguities are reported on every build, which is noise here
+    logging.getLogger('geomet_data_registry').setLevel(logging.ERROR)
+
+    standins.CONNECT_LATENCY.update(store=connect_latency,
+                                    tileindex=connect_latency)
+    standins.load_store()
+
+    parent = SimpleNamespace(logger=logging.getLogger('sr_subscribe'),
+                             msg=SimpleNamespace())
+
+    start = time.perf_counter()
+    if variant == 'legacy':
+        plugin = LegacyFileEvent(parent)
+    else:
+        plugin = load_event_plugin()(parent)
+    startup = time.perf_counter() - start
+
+    latencies = []
+    for filepath in filepaths:
+        parent.msg.local_file = filepath
+        parent.msg.url = urlparse('https://dd.weather.gc.ca{}'.format(
+            filepath))
+        start = time.perf_counter()
+        if not plugin.on_file(parent):
+            raise RuntimeError('Callback failed: {}'.format(filepath))
+        latencies.append(time.perf_counter() - start)
+
+    return {'startup': startup, 'latencies': latencies}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model', default='model_gem_global',
+                        help='model (configuration basename) of the burst')
+    parser.add_argument('--messages', type=int, default=500,
+                        help='number of messages of the burst')
+    parser.add_argument('--connect-latency-ms', type=float, default=10,
+                        help='simulated provider connection setup latency')
+    args = parser.parse_args()
+
+    config = load_configs()[args.model]
+    filepaths = ['/data/{}'.format(filepath) for filepath in
+                 model_filenames(args.model, config)][:args.messages]
+
+    context = multiprocessing.get_context('spawn')
+
+    print('messages: {} ({})'.format(len(filepaths), args.model))
+    print('{:<11} {:>10} {:>10} {:>10} {:>10} {:>10}'.format(
+        'variant', 'startup', 'first', 'p50', 'p99', 'mean'))
+
+    for variant in ['legacy', 'warm-start']:
+        with context.Pool(1) as pool:
+            result = pool.apply(run_burst, (variant, filepaths,
+                                            args.connect_latency_ms / 1000))
+
+        latencies = result['latencies']
+        quantiles = statistics.quantiles(latencies, n=100)
+        print('{:<11} {:>7.2f} ms {:>7.2f} ms {:>7.3f} ms {:>7.3f} ms '
+              '{:>7.3f} ms'.format(variant, result['startup'] * 1000,
+                                   latencies[0] * 1000, quantiles[49] * 1000,
+                                   quantiles[98] * 1000,
+                                   statistics.mean(latencies) * 1000))
+
+
+if __name__ == '__main__':
+    main()
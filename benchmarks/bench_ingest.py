@@ -0,0 +1,179 @@
+###############################################################################
+#
+# Copyright (C) 2026 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+"""
+End-to-end ingest throughput benchmark: drives CoreHandler over realistic
+filename streams (generated from deploy/default/*.yml) against in-process
+store/tileindex stand-ins (or an embedded SQLite tileindex), and reports
+files/s, p50/p99 latency, store requests per file and peak RSS per
+model.
+
+Each model runs in a freshly spawned interpreter (peak RSS is per model).
+
+usage: python -m benchmarks.bench_ingest [--scenario NAME ...] [--runs N]
+"""
+
+import argparse
+import logging
+import multiprocessing
+import resource
+import statistics
+import tempfile
+import time
+
+from benchmarks import setup_environment
+
+setup_environment(GDR_STORE_TYPE='Memory', GDR_TILEINDEX_TYPE='Memory')
+
+from benchmarks import standins  # noqa
+from benchmarks.filenames import load_configs, model_filenames  # noqa
+
+standins.register()
+
+SCENARIOS = {
+    # full deterministic model runs
+    'gdps': ['model_gem_global'],
+    'rdps': ['model_gem_regional'],
+    'hrdps': ['model_hrdps_continental'],
+    # ensemble bursts
+    'reps': ['reps'],
+    'geps': ['geps'],
+    # monthly drops
+    'cansips': ['cansips']
+}
+
+
+def run_model(model, filepaths, roundtrip_latency=0, batch_size=None,
+              tileindex='Memory'):
+    """
+    Ingest the files of a model (in a fresh process)
+
+    :param model: `str` of model name (configuration basename)
+    :param filepaths: `list` of file paths, in arrival order
+    :param roundtrip_latency: `float` of simulated seconds per provider
+                              request
+    :param batch_size: `int` of tileindex bulk batch size (bulk ingest),
+                       or `None` to handle files one by one
+    :param tileindex: `str` of tileindex type (`Memory` or `SQLite`)
+
+    :returns: `dict` of elapsed seconds, file latencies, number of failed
+              files, number of store requests and peak RSS
+    """
+
+    from geomet_data_registry.env import TILEINDEX_PROVIDER_DEF
+    from geomet_data_registry.handler.bulk import ingest_files
+    from geomet_data_registry.handler.core import CoreHandler, warm_start
+    from geomet_data_registry.plugin import load_plugin
+
+    logging.getLogger('geomet_data_registry').setLevel(logging.CRITICAL)
+
+    if tileindex == 'SQLite':
+        TILEINDEX_PROVIDER_DEF.update(type='SQLite', url=tempfile.mkdtemp(),
+                                      name='geomet-data-registry-benchmark')
+        load_plugin('tileindex', TILEINDEX_PROVIDER_DEF).setup()
+
+    standins.ROUNDTRIP_LATENCY.update(store=roundtrip_latency,
+                                      tileindex=roundtrip_latency)
+    standins.load_store({model: load_configs()[model]})
+    warm_start()
+    standins.ROUNDTRIPS.update(store=0, tileindex=0)
+
+    latencies = []
+    failed = 0
+    start = time.perf_counter()
+
+    if batch_size is not None:
+        summary = ingest_files(filepaths, batch_size)
+        failed = summary['failed']
+    else:
+        for filepath in filepaths:
+            file_start = time.perf_counter()
+            try:
+                CoreHandler(filepath).handle()
+            except Exception:
+                failed += 1
+            latencies.append(time.perf_counter() - file_start)
+
+    elapsed = time.perf_counter() - start
+
+    return {
+        'elapsed': elapsed,
+        'latencies': latencies,
+        'failed': failed,
+        'store_requests': standins.ROUNDTRIPS['store'],
+        'maxrss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scenario', action='append',
+                        choices=sorted(SCENARIOS) + ['all'],
+                        help='scenario(s) to run (default: all)')
+    parser.add_argument('--runs', type=int, default=1,
+                        help='model runs to generate per model')
+    parser.add_argument('--max-forecast-hours', type=int, default=None,
+                        help='maximum number of forecast hours per variable')
+    parser.add_argument('--roundtrip-latency-ms', type=float, default=0,
+                        help='simulated store/tileindex request latency')
+    parser.add_argument('--bulk', type=int, default=None, metavar='N',
+                        help='use bulk ingest with batches of N files')
+    parser.add_argument('--tileindex', choices=['Memory', 'SQLite'],
+                        default='Memory', help='tileindex provider')
+    args = parser.parse_args()
+
+    scenarios = args.scenario or ['all']
+    if 'all' in scenarios:
+        scenarios = sorted(SCENARIOS)
+
+    configs = load_configs()
+    context = multiprocessing.get_context('spawn')
+
+    print('{:<24} {:>7} {:>7} {:>10} {:>9} {:>9} {:>9} {:>9}'.format(
+        'model', 'files', 'failed', 'files/s', 'p50 ms', 'p99 ms',
+        'store/f', 'RSS MB'))
+
+    for scenario in scenarios:
+        for model in SCENARIOS[scenario]:
+            filepaths = ['/data/{}'.format(filepath) for filepath in
+                         model_filenames(model, configs[model], args.runs,
+                                         args.max_forecast_hours)]
+
+            with context.Pool(1) as pool:
+                result = pool.apply(run_model, (
+                    model, filepaths, args.roundtrip_latency_ms / 1000,
+                    args.bulk, args.tileindex))
+
+            if result['latencies'] and len(result['latencies']) > 1:
+                quantiles = statistics.quantiles(result['latencies'], n=100)
+                p50 = '{:9.3f}'.format(quantiles[49] * 1000)
+                p99 = '{:9.3f}'.format(quantiles[98] * 1000)
+            else:
+                p50 = p99 = '{:>9}'.format('-')
+
+            print('{:<24} {:>7} {:>7} {:>10.0f} {} {} {:>9.1f} '
+                  '{:>9.1f}'.format(
+                      model, len(filepaths), result['failed'],
+                      len(filepaths) / result['elapsed'], p50, p99,
+                      result['store_requests'] / len(filepaths),
+                      result['maxrss'] / 1024))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+###############################################################################
+#
+# Copyright (C) 2026 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+"""
+Microbenchmark of filename parsing: parse.parse() of the model filename
+pattern on every file versus the compiled FilenameParserRegistry parsers
+
+usage: python -m benchmarks.bench_parse [--max-forecast-hours N]
+"""
+
+import argparse
+import timeit
+
+from parse import parse
+
+from benchmarks import setup_environment
+
+setup_environment()
+
+from geomet_data_registry.layer.base import (FilenameParserRegistry,  # noqa
+                                             FILENAME_PATTERN_TYPES)
+from benchmarks.filenames import (REFERENCE_DATETIME, forecast_hours,  # noqa
+                                  format_filename, load_configs,
+                                  variable_groups)
+
+
+def pattern_filenames(max_forecast_hours=None):
+    """
+    Generate the filenames of one model run of all models along with the
+    filename pattern they are parsed with
+
+    :param max_forecast_hours: maximum number of forecast hours per variable
+
+    :returns: `list` of (model, filename pattern, filename) tuples
+    """
+
+    filenames = []
+
+    for model, config in load_configs().items():
+        key = list(config.keys())[0]
+        for section, pattern, variables in variable_groups(config[key]):
+            patterns = (pattern.values() if isinstance(pattern, dict)
+                        else [pattern])
+            for pattern_ in patterns:
+                for name, variable in variables.items():
+                    for fh in forecast_hours(variable, max_forecast_hours):
+                        filenames.append((key, pattern_, format_filename(
+                            model, pattern_, name, variable,
+                            REFERENCE_DATETIME, fh)))
+
+    return filenames
+
+
+def parse_uncompiled(model, pattern, filename):
+    """parse as done previously by the layers"""
+
+    if 'NonWhitespaceChars' in pattern:
+        return parse(pattern, filename, FILENAME_PATTERN_TYPES)
+    return parse(pattern, filename)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--max-forecast-hours', type=int, default=None,
+                        help='maximum number of forecast hours per variable')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='timing repetitions (best is reported)')
+    args = parser.parse_args()
+
+    filenames = pattern_filenames(args.max_forecast_hours)
+
+    configs = {list(config.keys())[0]: config
+               for config in load_configs().values()}
+
+    def build():
+        registry = FilenameParserRegistry()
+        for model, config in configs.items():
+            registry.register(model, config)
+        return registry
+
+    build_time = min(timeit.repeat(build, number=1, repeat=args.repeat))
+    registry = build()
+
+    def parse_compiled(model, pattern, filename):
+        return registry.get(model, pattern).parse(filename)
+
+    for model, pattern, filename in filenames:
+        before = parse_uncompiled(model, pattern, filename)
+        after = parse_compiled(model, pattern, filename)
+        if before is None or before.named != after.named:
+            raise SystemExit('Parse mismatch: {}'.format(filename))
+
+    results = {}
+    for name, func in [('parse', parse_uncompiled),
+                       ('compiled parser', parse_compiled)]:
+        elapsed = min(timeit.repeat(
+            lambda: [func(*args_) for args_ in filenames], number=1,
+            repeat=args.repeat))
+        results[name] = elapsed
+
+    print('filenames: {}'.format(len(filenames)))
+    print('registry build: {:.3f} ms ({} parsers)'.format(
+        build_time * 1000, len(registry.parsers)))
+    for name, elapsed in results.items():
+        print('{:<16} {:8.3f} ms total {:8.3f} us/file {:10.0f} files/s'
+              .format(name, elapsed * 1000, elapsed / len(filenames) * 1e6,
+                      len(filenames) / elapsed))
+    print('speedup: {:.1f}x'.format(
+        results['parse'] / results['compiled parser']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+###############################################################################
+#
+# Copyright (C) 2026 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+"""
+Generates realistic filename streams from the model configurations
+in deploy/default/*.yml
+"""
+
+from datetime import datetime, timedelta
+import glob
+import os
+import re
+
+from yaml import load, Loader
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'deploy', 'default')
+
+REFERENCE_DATETIME = datetime(2021, 11, 26, 0, 0)
+
+# model run datetime formats of {YYYYMMDD_model_run} which differ from
+# the default %Y%m%d%H
+RUN_FORMATS = {
+    'model_riops': '%Y%m%dT%HZ',
+    'model_raqdps-fw-ce': '%Y%m%dT%HZ',
+    'model_rdaqa-ce': '%Y%m%dT%HZ'
+}
+
+# values of filename pattern fields which are not derived from the
+# variable or time being generated
+STATIC_FIELDS = {
+    'fileinfo': 'latlon0.2x0.2',
+    'grid': 'LatLon0.009x0.012',
+    'interval': 'P1M',
+    'resolution': '2.5x2.5',
+    'region': 'Lake-Huron-Michigan'
+}
+
+FORMAT_SPEC = re.compile(r'{(\w+):[^}]+}')
+
+
+def load_configs(config_dir=CONFIG_DIR):
+    """
+    Load all model configurations
+
+    :param config_dir: directory of model YAML configurations
+
+    :returns: `dict` of model name to model configuration
+    """
+
+    configs = {}
+
+    for config in sorted(glob.glob(os.path.join(config_dir, '*.yml'))):
+        with open(config) as fh:
+            yml_dict = load(fh, Loader=Loader)
+        model = list(yml_dict.keys())[0]
+        if model == 'amqp':
+            continue
+        configs[os.path.splitext(os.path.basename(config))[0]] = yml_dict
+
+    return configs
+
+
+def variable_groups(model_config):
+    """
+    Finds all variable sections of a model configuration along with
+    their filename pattern (e.g. REPS/GEPS member/product or GIOPS/RIOPS
+    2D/3D sections)
+
+    :param model_config: `dict` of model configuration
+
+    :returns: `list` of (section name, filename pattern, variables dict)
+    """
+
+    groups = []
+    filename_pattern = model_config.get('filename_pattern')
+
+    if 'variable' in model_config:
+        groups.append((None, filename_pattern, model_config['variable']))
+
+    for key, value in model_config.items():
+        if isinstance(value, dict) and 'variable' in value:
+            groups.append((key, value.get('filename_pattern',
+                                          filename_pattern),
+                           value['variable']))
+
+    return groups
+
+
+def forecast_hours(variable, limit=None):
+    """
+    Derive the forecast hours a variable is published at
+
+    :param variable: `dict` of variable configuration
+    :param limit: maximum number of forecast hours to return
+
+    :returns: `list` of `int` forecast hours
+    """
+
+    hours = set()
+    layers = variable.get('geomet_layers')
+
+    if not isinstance(layers, dict):
+        return [0]
+
+    for layer in layers.values():
+        if 'forecast_hours' not in layer:
+            continue
+        begin, end, interval = layer['forecast_hours'].split('/')
+        begin, end = int(begin), int(end)
+        step = int(re.sub('[^0-9]', '', interval)) or 1
+        if interval.endswith('M'):  # minutes: e.g. radar
+            hours.add(0)
+            continue
+        hours.update(range(max(begin, 0), end + 1, step))
+
+    hours = sorted(hours) or [0]
+
+    if limit is not None:
+        hours = hours[:limit]
+
+    return hours
+
+
+def format_filename(model, pattern, variable_name, variable, run, fh):
+    """
+    Build a filename from a model filename pattern
+
+    :param model: `str` of model name
+    :param pattern: `str` of model filename pattern
+    :param variable_name: `str` of weather variable
+    :param variable: `dict` of variable configuration
+    :param run: `datetime` of model run
+    :param fh: `int` of forecast hour
+
+    :returns: `str` of filename
+    """
+
+    fields = dict(STATIC_FIELDS)
+    fields.update({
+        'wx_variable': variable_name,
+        'precipitation_type': variable_name,
+        'elevation': variable.get('elevation') or 'surface',
+        'YYYYMMDD_model_run': run.strftime(
+            RUN_FORMATS.get(model, '%Y%m%d%H')),
+        'YYYYMMDD': run.strftime('%Y%m%d'),
+        'model_run': run.strftime('%H'),
+        'YYYYMMDDThhmm': run.strftime('%Y%m%dT%H%M'),
+        'YYYY': run.strftime('%Y'),
+        'MM': run.strftime('%m'),
+        'forecast_hour': '{:03d}'.format(fh)
+    })
+
+    if '{pressure}' in pattern:  # CanSIPS splits the variable name
+        (fields['wx_variable'], fields['pressure'],
+         fields['pres_value']) = variable_name.rsplit('_', 2)
+
+    if 'bands' in variable and model == 'model_riops':
+        band = list(variable['bands'].values())[0]
+        fields['elevation'] = band.get('elevation', fields['elevation'])
+
+    return FORMAT_SPEC.sub(r'{\1}', pattern).format(**fields)
+
+
+def model_filenames(model, config, runs=1, max_forecast_hours=None,
+                    start=REFERENCE_DATETIME):
+    """
+    Generate the filepaths of one or more model runs, in arrival order
+    (i.e. by forecast hour, then by variable)
+
+    :param model: `str` of model name (configuration basename)
+    :param config: `dict` of model configuration
+    :param runs: number of consecutive model runs to generate
+    :param max_forecast_hours: maximum number of forecast hours per variable
+    :param start: `datetime` of first model run
+
+    :returns: `list` of relative filepaths
+    """
+
+    model_config = config[list(config.keys())[0]]
+    interval = model_config.get('model_run_interval_hours', 24)
+
+    filepaths = []
+
+    for run_number in range(runs):
+        run = start + timedelta(hours=interval * run_number)
+        entries = []
+        for section, pattern, variables in variable_groups(model_config):
+            if isinstance(pattern, dict):  # e.g. RDPA 10km/15km
+                pattern = list(pattern.values())[-1]
+            dimension = (section or 'grib2').lower()
+            for name, variable in variables.items():
+                for fh in forecast_hours(variable, max_forecast_hours):
+                    filename = format_filename(model, pattern, name,
+                                               variable, run, fh)
+                    entries.append((fh, os.path.join(
+                        model, dimension, run.strftime('%H'),
+                        '{:03d}'.format(fh), filename)))
+        filepaths.extend(filepath for fh, filepath in
+                         sorted(entries, key=lambda entry: entry[0]))
+
+    return filepaths
+
+
+def all_filenames(runs=1, max_forecast_hours=None, config_dir=CONFIG_DIR):
+    """
+    Generate the filepaths of all configured models
+
+    :param runs: number of consecutive model runs to generate
+    :param max_forecast_hours: maximum number of forecast hours per variable
+    :param config_dir: directory of model YAML configurations
+
+    :returns: `dict` of model name to `list` of relative filepaths
+    """
+
+    return {model: model_filenames(model, config, runs, max_forecast_hours)
+            for model, config in load_configs(config_dir).items()}
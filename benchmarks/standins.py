@@ -0,0 +1,244 @@
+###############################################################################
+#
+# Copyright (C) 2026 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+"""
+In-process stand-ins of the store and tileindex providers, with optional
+simulated connection setup and round trip latencies
+"""
+
+from fnmatch import fnmatch
+import hashlib
+import json
+import time
+
+from geomet_data_registry.plugin import PLUGINS
+from geomet_data_registry.store.base import BaseStore, partition_config
+from geomet_data_registry.tileindex.base import BaseTileIndex, \
+    TileNotFoundError
+from benchmarks.filenames import load_configs
+
+# seconds spent opening a provider connection (e.g. TCP/TLS handshake and
+# initial ping)
+CONNECT_LATENCY = {
+    'store': 0,
+    'tileindex': 0
+}
+
+# seconds spent per request (i.e. network round trip)
+ROUNDTRIP_LATENCY = {
+    'store': 0,
+    'tileindex': 0
+}
+
+# number of requests (round trips) per provider
+ROUNDTRIPS = {
+    'store': 0,
+    'tileindex': 0
+}
+
+# provider contents outlive provider instances, like a real server would
+STORE = {}
+TILEINDEX = {}
+
+
+def roundtrip(provider):
+    """simulate the round trip latency of a provider request"""
+
+    ROUNDTRIPS[provider] += 1
+    if ROUNDTRIP_LATENCY[provider]:
+        time.sleep(ROUNDTRIP_LATENCY[provider])
+
+
+class MemoryStore(BaseStore):
+    """in-memory store"""
+
+    def __init__(self, provider_def):
+        super().__init__(provider_def)
+        time.sleep(CONNECT_LATENCY['store'])
+
+    def setup(self):
+        return True
+
+    def teardown(self):
+        STORE.clear()
+        return True
+
+    def ping(self):
+        return True
+
+    def get_key(self, key, raw=False):
+        roundtrip('store')
+        if raw:
+            return STORE.get(key)
+        return STORE.get('geomet-data-registry_{}'.format(key))
+
+    def set_key(self, key, value, raw=False):
+        roundtrip('store')
+        if raw:
+            STORE[key] = str(value)
+        else:
+            STORE['geomet-data-registry_{}'.format(key)] = str(value)
+        return True
+
+    def get_keys(self, keys, raw=False):
+        roundtrip('store')
+        if not raw:
+            keys = ['geomet-data-registry_{}'.format(key) for key in keys]
+        return [STORE.get(key) for key in keys]
+
+    def set_keys(self, mapping, ttl=None, raw=False):
+        roundtrip('store')
+        for key, value in mapping.items():
+            if not raw:
+                key = 'geomet-data-registry_{}'.format(key)
+            STORE[key] = str(value)
+        return True
+
+    def get_fields(self, key, fields, raw=False):
+        roundtrip('store')
+        if not raw:
+            key = 'geomet-data-registry_{}'.format(key)
+        hash_ = STORE.get(key) or {}
+        return [hash_.get(field) for field in fields]
+
+    def set_fields(self, key, mapping, raw=False):
+        roundtrip('store')
+        if not raw:
+            key = 'geomet-data-registry_{}'.format(key)
+        STORE[key] = dict(mapping)
+        return True
+
+    def increment_count(self, key, expected_count, run_keys, raw=False):
+        # a server-side script: one round trip
+        roundtrip('store')
+        prefix = '' if raw else 'geomet-data-registry_'
+
+        count = int(STORE.get(prefix + key) or 0) + 1
+        STORE[prefix + key] = str(count)
+
+        if count >= int(expected_count):
+            STORE.update((prefix + run_key, '0') for run_key in run_keys)
+            return True, {}
+
+        incomplete = {}
+        if count == 1:
+            for run_key in run_keys:
+                run_count = STORE.get(prefix + run_key)
+                if run_key != key and run_count not in ['0', None]:
+                    incomplete[run_key] = run_count
+                    STORE[prefix + run_key] = '0'
+
+        return False, incomplete
+
+    def delete_key(self, key, raw=False):
+        if not raw:
+            key = 'geomet-data-registry_{}'.format(key)
+        return STORE.pop(key, None) is not None
+
+    def list_keys(self, pattern=None):
+        if pattern is None:
+            return list(STORE.keys())
+        return [key for key in STORE.keys() if fnmatch(key, pattern)]
+
+    def publish(self, channel, message):
+        return 0
+
+
+class MemoryTileIndex(BaseTileIndex):
+    """in-memory tileindex"""
+
+    def __init__(self, provider_def):
+        super().__init__(provider_def)
+        time.sleep(CONNECT_LATENCY['tileindex'])
+
+    def setup(self):
+        return True
+
+    def teardown(self):
+        TILEINDEX.clear()
+        return True
+
+    def ping(self):
+        return True
+
+    def get(self, identifier, model=None, reference_datetime=None):
+        roundtrip('tileindex')
+        try:
+            return TILEINDEX[identifier]
+        except KeyError:
+            raise TileNotFoundError()
+
+    def add(self, identifier, data):
+        roundtrip('tileindex')
+        return self.index(identifier, data)
+
+    def bulk_add(self, data):
+        roundtrip('tileindex')
+        return {doc['properties']['identifier']: self.index(
+            doc['properties']['identifier'], doc) for doc in data}
+
+    def index(self, identifier, data):
+        status = 200 if identifier in TILEINDEX else 201
+        TILEINDEX[identifier] = data
+        return status
+
+    def update(self, identifier, update_dict):
+        roundtrip('tileindex')
+        TILEINDEX[identifier]['properties'].update(update_dict)
+        return 200
+
+
+def register():
+    """
+    Registers the stand-ins as the `Memory` store and tileindex plugins
+
+    :returns: `None`
+    """
+
+    PLUGINS['store']['Memory'] = {
+        'path': 'benchmarks.standins.MemoryStore'
+    }
+    PLUGINS['tileindex']['Memory'] = {
+        'path': 'benchmarks.standins.MemoryTileIndex'
+    }
+
+
+def load_store(configs=None):
+    """
+    Loads model configurations into the stand-in store, as done by
+    `geomet-data-registry store set --partitioned` (whole and partitioned
+    configurations)
+
+    :param configs: `dict` of model name to model configuration
+                    (default: all configurations of deploy/default)
+
+    :returns: `None`
+    """
+
+    if configs is None:
+        configs = load_configs()
+
+    store = MemoryStore({'type': 'Memory', 'url': None})
+
+    for model, config in configs.items():
+        string_ = json.dumps(config)
+        store.set_key(model, string_)
+        store.set_fields('{}_config'.format(model), partition_config(config))
+        store.set_key('{}_version'.format(model), hashlib.sha256(
+            string_.encode('utf-8')).hexdigest())
@@ -20,14 +20,17 @@
 import click
 
 from geomet_data_registry import env
+from geomet_data_registry.gateway import serve
 from geomet_data_registry.handler import data
 from geomet_data_registry.log import setup_logger
+from geomet_data_registry.metrics import METRICS
 from geomet_data_registry.store import store
 from geomet_data_registry.tileindex import tileindex
 
 __version__ = '0.1.0'
 
 setup_logger(env.LOGGING_LOGLEVEL, env.LOGGING_LOGFILE)
+METRICS.setup(env.METRICS_PORT, env.METRICS_TEXTFILE_DIR)
 
 
 @click.group()
@@ -37,5 +40,6 @@ def cli():
 
 
 cli.add_command(data)
+cli.add_command(serve)
 cli.add_command(store)
 cli.add_command(tileindex)
@@ -33,26 +33,68 @@ DATADIR = os.environ.get('GDR_DATADIR', None)
 TILEINDEX_TYPE = os.environ.get('GDR_TILEINDEX_TYPE', None)
 TILEINDEX_BASEURL = os.environ.get('GDR_TILEINDEX_BASEURL', None)
 TILEINDEX_NAME = os.environ.get('GDR_TILEINDEX_NAME', None)
+TILEINDEX_BUFFER_DOCS = int(os.environ.get('GDR_TILEINDEX_BUFFER_DOCS', 0))
+TILEINDEX_BUFFER_BYTES = int(
+    os.environ.get('GDR_TILEINDEX_BUFFER_BYTES', 5242880))
+TILEINDEX_BUFFER_AGE = float(os.environ.get('GDR_TILEINDEX_BUFFER_AGE', 1))
+TILEINDEX_MAPPING = os.environ.get('GDR_TILEINDEX_MAPPING', 'v1')
+TILEINDEX_ROLLOVER = str2bool(os.environ.get('GDR_TILEINDEX_ROLLOVER', False))
+TILEINDEX_ROUTES = os.environ.get('GDR_TILEINDEX_ROUTES', None)
+TILEINDEX_CONCURRENCY = int(os.environ.get('GDR_TILEINDEX_CONCURRENCY', 8))
+TILEINDEX_SPOOL_DIR = os.environ.get('GDR_TILEINDEX_SPOOL_DIR', None)
+TILEINDEX_SPOOL_LATENCY = float(
+    os.environ.get('GDR_TILEINDEX_SPOOL_LATENCY', 5))
+TILEINDEX_SPOOL_INTERVAL = float(
+    os.environ.get('GDR_TILEINDEX_SPOOL_INTERVAL', 30))
+TILEINDEX_DEDUP_TTL = int(os.environ.get('GDR_TILEINDEX_DEDUP_TTL', 0))
+TILEINDEX_DEDUP_SIZE = int(os.environ.get('GDR_TILEINDEX_DEDUP_SIZE', 100000))
+TILEINDEX_DEDUP_STORE = str2bool(
+    os.environ.get('GDR_TILEINDEX_DEDUP_STORE', False))
 STORE_TYPE = os.environ.get('GDR_STORE_TYPE', None)
 STORE_URL = os.environ.get('GDR_STORE_URL', None)
+STORE_CONFIG_PARTITIONED = str2bool(
+    os.environ.get('GDR_STORE_CONFIG_PARTITIONED', False))
 METPX_DISCARD = os.environ.get('GDR_METPX_DISCARD', 'on')
 METPX_EVENT_FILE_PY = os.environ.get('GDR_METPX_EVENT_FILE_PY', None)
 METPX_EVENT_MESSAGE_PY = os.environ.get('GDR_METPX_EVENT_MESSAGE_PY', None)
 NOTIFICATIONS = str2bool(os.environ.get('GDR_NOTIFICATIONS', False))
 NOTIFICATIONS_TYPE = os.environ.get('GDR_NOTIFICATIONS_TYPE', None)
 NOTIFICATIONS_URL = os.environ.get('GDR_NOTIFICATIONS_URL', None)
+PROVIDER_HEALTH_CHECK_INTERVAL = int(
+    os.environ.get('GDR_PROVIDER_HEALTH_CHECK_INTERVAL', 30))
+CONFIG_CACHE_TTL = int(os.environ.get('GDR_CONFIG_CACHE_TTL', 60))
+DOCUMENT_CACHE_SIZE = int(os.environ.get('GDR_DOCUMENT_CACHE_SIZE', 10000))
+DOCUMENT_CACHE_TTL = int(os.environ.get('GDR_DOCUMENT_CACHE_TTL', 300))
+GATEWAY_URL = os.environ.get('GDR_GATEWAY_URL', None)
+METRICS_PORT = os.environ.get('GDR_METRICS_PORT', None)
+METRICS_TEXTFILE_DIR = os.environ.get('GDR_METRICS_TEXTFILE_DIR', None)
 
 LOGGER.debug(BASEDIR)
 LOGGER.debug(DATADIR)
 LOGGER.debug(TILEINDEX_TYPE)
 LOGGER.debug(TILEINDEX_BASEURL)
 LOGGER.debug(TILEINDEX_NAME)
+LOGGER.debug(TILEINDEX_BUFFER_DOCS)
+LOGGER.debug(TILEINDEX_MAPPING)
+LOGGER.debug(TILEINDEX_ROLLOVER)
+LOGGER.debug(TILEINDEX_ROUTES)
+LOGGER.debug(TILEINDEX_CONCURRENCY)
+LOGGER.debug(TILEINDEX_SPOOL_DIR)
+LOGGER.debug(TILEINDEX_DEDUP_TTL)
 LOGGER.debug(STORE_TYPE)
 LOGGER.debug(STORE_URL)
+LOGGER.debug(STORE_CONFIG_PARTITIONED)
 LOGGER.debug(METPX_DISCARD)
 LOGGER.debug(NOTIFICATIONS)
 LOGGER.debug(NOTIFICATIONS_TYPE)
 LOGGER.debug(NOTIFICATIONS_URL)
+LOGGER.debug(PROVIDER_HEALTH_CHECK_INTERVAL)
+LOGGER.debug(CONFIG_CACHE_TTL)
+LOGGER.debug(DOCUMENT_CACHE_SIZE)
+LOGGER.debug(DOCUMENT_CACHE_TTL)
+LOGGER.debug(GATEWAY_URL)
+LOGGER.debug(METRICS_PORT)
+LOGGER.debug(METRICS_TEXTFILE_DIR)
 
 if None in [
     BASEDIR,
@@ -75,7 +117,26 @@ TILEINDEX_PROVIDER_DEF = {
     'type': TILEINDEX_TYPE,
     'url': TILEINDEX_BASEURL,
     'name': TILEINDEX_NAME,
-    'group': None
+    'group': None,
+    'mapping': TILEINDEX_MAPPING,
+    'rollover': TILEINDEX_ROLLOVER,
+    'routes': TILEINDEX_ROUTES,
+    'concurrency': TILEINDEX_CONCURRENCY,
+    'buffer': {
+        'docs': TILEINDEX_BUFFER_DOCS,
+        'bytes': TILEINDEX_BUFFER_BYTES,
+        'age': TILEINDEX_BUFFER_AGE
+    },
+    'spool': {
+        'path': TILEINDEX_SPOOL_DIR,
+        'latency': TILEINDEX_SPOOL_LATENCY,
+        'interval': TILEINDEX_SPOOL_INTERVAL
+    },
+    'dedup': {
+        'ttl': TILEINDEX_DEDUP_TTL,
+        'size': TILEINDEX_DEDUP_SIZE,
+        'store': STORE_PROVIDER_DEF if TILEINDEX_DEDUP_STORE else None
+    }
 }
 
 NOTIFICATIONS_PROVIDER_DEF = {
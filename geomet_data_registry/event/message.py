@@ -22,32 +22,73 @@ class MessageEvent:
     """core event"""
 
     def __init__(self, parent):
-        """initialize"""
-        pass
-
-    def on_message(self, parent):
         """
-        sarracenia dispatcher
+        initialize
 
-        :param parent: `sarra.sr_subscribe.sr_subscribe`
+        All one-time setup (logging, imports, plugin connections, model
+        configurations) is done here, so that each event only does the
+        per-file work.
 
-        :returns: `bool` of dispatch result
+        :param parent: `sarra.sr_subscribe.sr_subscribe`
         """
 
+        from urllib.parse import urlunparse
+
         from geomet_data_registry import env
         from geomet_data_registry.log import setup_logger
 
         setup_logger(env.LOGGING_LOGLEVEL, env.LOGGING_LOGFILE)
 
-        try:
-            from urllib.parse import urlunparse
-            from geomet_data_registry.handler.core import CoreHandler
+        from geomet_data_registry.gateway.core import (GatewayClient,
+                                                       GatewayError)
+        from geomet_data_registry.handler.core import CoreHandler, warm_start
+
+        self.urlunparse = urlunparse
+        self.handler_class = CoreHandler
+        self.gateway_error = GatewayError
+
+        # registration gateway client (see geomet-data-registry serve)
+        self.gateway = None
+
+        if env.GATEWAY_URL is not None:
+            try:
+                self.gateway = GatewayClient(env.GATEWAY_URL)
+            except GatewayError as err:
+                parent.logger.warning(err)
+
+        if self.gateway is None:
+            try:
+                models = warm_start()
+                parent.logger.debug('Warm start: {} models'.format(
+                    len(models)))
+            except Exception as err:
+                # setup is retried lazily when handling files
+                parent.logger.warning('Warm start failed: {}'.format(err))
 
+    def on_message(self, parent):
+        """
+        sarracenia dispatcher
+
+        :param parent: `sarra.sr_subscribe.sr_subscribe`
+
+        :returns: `bool` of dispatch result
+        """
+
+        try:
             filepath = parent.msg.local_file
             parent.logger.debug('Filepath: {}'.format(filepath))
-            url = urlunparse(parent.msg.url)
+            url = self.urlunparse(parent.msg.url)
             parent.logger.debug('URL: {}'.format(url))
-            handler = CoreHandler(filepath, url)
+
+            if self.gateway is not None:
+                try:
+                    self.gateway.send(filepath, url)
+                    parent.logger.debug('Forwarded to gateway')
+                    return True
+                except self.gateway_error as err:
+                    parent.logger.warning('{}: handling file'.format(err))
+
+            handler = self.handler_class(filepath, url)
             result = handler.handle()
             parent.logger.debug('Result: {}'.format(result))
             return True
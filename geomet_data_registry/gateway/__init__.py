@@ -0,0 +1,68 @@
+###############################################################################
+#
+# Copyright (C) 2019 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+import logging
+import signal
+
+import click
+
+from geomet_data_registry.env import GATEWAY_URL
+from geomet_data_registry.gateway.core import GatewayError, RegistrationGateway
+from geomet_data_registry.metrics import METRICS
+
+LOGGER = logging.getLogger(__name__)
+
+
+@click.command()
+@click.pass_context
+@click.option('--url', '-u', default=GATEWAY_URL,
+              help='Gateway URL (unix:///path/to/socket or '
+                   'redis://host:port/db), defaults to GDR_GATEWAY_URL')
+@click.option('--batch-size', '-b', type=click.IntRange(min=1), default=100,
+              help='Maximum number of files per batch')
+@click.option('--batch-window', '-w', type=click.FloatRange(min=0),
+              default=1.0,
+              help='Maximum number of seconds to wait for a batch to fill')
+@click.option('--metrics-port', '-m', type=int,
+              help='Port of the Prometheus metrics endpoint (/metrics)')
+def serve(ctx, url, batch_size, batch_window, metrics_port=None):
+    """run the registration gateway"""
+
+    if url is None:
+        raise click.ClickException('Missing --url/-u option or '
+                                   'GDR_GATEWAY_URL')
+
+    if metrics_port is not None:
+        METRICS.setup(port=metrics_port)
+
+    try:
+        gateway = RegistrationGateway(url, batch_size, batch_window)
+    except GatewayError as err:
+        raise click.ClickException(err)
+
+    def shutdown(signum, frame):
+        LOGGER.info('Received signal {}: stopping gateway'.format(signum))
+        gateway.stop()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    click.echo('Serving on {}'.format(url))
+    gateway.run()
+    click.echo('Done')
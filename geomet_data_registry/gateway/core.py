@@ -0,0 +1,529 @@
+###############################################################################
+#
+# Copyright (C) 2021 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+from collections import deque
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+from threading import Event, Thread
+import time
+from urllib.parse import urlparse
+
+import redis
+
+from geomet_data_registry.handler.bulk import ingest_events
+
+LOGGER = logging.getLogger(__name__)
+
+# Redis list of gateway events
+GATEWAY_QUEUE = 'geomet-data-registry_gateway-events'
+
+# suffix of the Redis list of gateway events being processed
+PROCESSING_SUFFIX = '_processing'
+
+
+class RegistrationGateway:
+    """
+    Long-running registration gateway.
+
+    File events are received from a unix socket or a Redis list (see
+    `GatewayClient`) and registered in micro-batches: events are collected
+    until `batch_size` events are received or `batch_window` seconds have
+    passed since the first event of the batch, and each batch is indexed
+    with a single tileindex bulk request.  Events are registered in order
+    of arrival.
+    """
+
+    def __init__(self, url, batch_size=100, batch_window=1.0):
+        """
+        Initialize object
+
+        :param url: `str` of gateway URL (`unix:///path/to/socket` or
+                    `redis://host:port/db`)
+        :param batch_size: `int` of maximum number of events per batch
+        :param batch_window: `float` of maximum number of seconds to wait
+                             for a batch to fill
+
+        :returns: `geomet_data_registry.gateway.core.RegistrationGateway`
+        """
+
+        self.url = url
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.events = queue.Queue()
+        self.stopped = Event()
+
+        url_parsed = urlparse(url)
+
+        if url_parsed.scheme == 'unix':
+            self.source = UnixSocketSource(url_parsed.path)
+        elif url_parsed.scheme in ['redis', 'rediss']:
+            self.source = RedisListSource(url)
+        else:
+            msg = 'Unsupported gateway URL {}'.format(url)
+            LOGGER.error(msg)
+            raise GatewayError(msg)
+
+    def run(self):
+        """
+        Receive and register events until the gateway is stopped
+
+        :returns: `None`
+        """
+
+        LOGGER.info('Starting gateway on {}'.format(self.url))
+        self.source.start(self.events.put)
+
+        try:
+            while not self.stopped.is_set():
+                self.process(self.next_batch())
+        finally:
+            self.source.stop()
+
+        # register events received before the source was stopped
+        events = []
+        while not self.events.empty():
+            events.append(self.events.get_nowait())
+        self.process(events)
+
+        LOGGER.info('Gateway stopped')
+
+    def stop(self):
+        """
+        Stop the gateway
+
+        :returns: `None`
+        """
+
+        self.stopped.set()
+
+    def next_batch(self):
+        """
+        Collect the next batch of events
+
+        :returns: `list` of (file path, URL) tuples
+        """
+
+        try:
+            events = [self.events.get(timeout=1)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.batch_window
+
+        while len(events) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                events.append(self.events.get(timeout=timeout))
+            except queue.Empty:
+                break
+
+        return events
+
+    def process(self, events):
+        """
+        Register a batch of events
+
+        :param events: `list` of (file path, URL) tuples
+
+        :returns: `dict` of number of processed, registered and failed
+                  files
+        """
+
+        if not events:
+            return None
+
+        summary = ingest_events(events, self.batch_size)
+        LOGGER.debug('Processed batch: {}'.format(summary))
+
+        self.source.ack(len(events))
+
+        return summary
+
+    def __repr__(self):
+        return '<RegistrationGateway> {}'.format(self.url)
+
+
+class UnixSocketSource:
+    """Unix socket source of gateway events (one JSON event per line)"""
+
+    def __init__(self, path):
+        """
+        Initialize object
+
+        :param path: `str` of unix socket path
+
+        :returns: `geomet_data_registry.gateway.core.UnixSocketSource`
+        """
+
+        self.path = path
+        self.server = None
+
+    def start(self, callback):
+        """
+        Start receiving events in a background thread
+
+        :param callback: function called with each (file path, URL) event
+
+        :returns: `None`
+        """
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        callback(decode_event(line))
+                    except ValueError as err:
+                        LOGGER.warning('Invalid event: {}'.format(err))
+
+        if os.path.exists(self.path):
+            LOGGER.debug('Removing stale socket {}'.format(self.path))
+            os.remove(self.path)
+
+        self.server = socketserver.ThreadingUnixStreamServer(self.path,
+                                                             Handler)
+        self.server.daemon_threads = True
+
+        Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        """
+        Stop receiving events
+
+        :returns: `None`
+        """
+
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            os.remove(self.path)
+            self.server = None
+
+    def ack(self, count):
+        """
+        Acknowledge processed events (no-op: events are delivered at most
+        once, as they are not persisted)
+
+        :param count: `int` of number of processed events
+
+        :returns: `None`
+        """
+
+        pass
+
+    def __repr__(self):
+        return '<UnixSocketSource> {}'.format(self.path)
+
+
+class RedisListSource:
+    """
+    Redis list source of gateway events (reliable queue).
+
+    Events are pushed to the head of the event list (LPUSH), atomically
+    moved from its tail to a processing list (RPOPLPUSH), and removed
+    from the processing list (LREM) once acknowledged, i.e. once
+    registered.  Events left in the processing
+    list by a gateway which did not stop cleanly are moved back to the
+    head of the event list when the source is started, so that events
+    are delivered at least once (registering a file twice is harmless).
+    A processing list is used by a single gateway at a time.
+    """
+
+    def __init__(self, url, key=GATEWAY_QUEUE, batch_size=100):
+        """
+        Initialize object
+
+        :param url: `str` of Redis URL
+        :param key: `str` of Redis list key
+        :param batch_size: `int` of maximum number of events popped per
+                           request
+
+        :returns: `geomet_data_registry.gateway.core.RedisListSource`
+        """
+
+        self.url = url
+        self.key = key
+        self.processing_key = '{}{}'.format(key, PROCESSING_SUFFIX)
+        self.batch_size = batch_size
+        self.redis = redis.Redis.from_url(url, decode_responses=True,
+                                          health_check_interval=30,
+                                          retry_on_timeout=True)
+        # events received and not yet acknowledged, in order of arrival
+        self.pending = deque()
+        self.stopped = Event()
+        self.thread = None
+
+    def start(self, callback):
+        """
+        Start receiving events in a background thread
+
+        :param callback: function called with each (file path, URL) event
+
+        :returns: `None`
+        """
+
+        try:
+            recovered = self.recover()
+        except redis.exceptions.RedisError as err:
+            LOGGER.warning('Cannot requeue unacknowledged events: {}'.format(
+                err))
+        else:
+            if recovered:
+                LOGGER.warning('Requeued {} unacknowledged events'.format(
+                    recovered))
+
+        self.stopped.clear()
+        self.thread = Thread(target=self.listen, args=(callback,),
+                             daemon=True)
+        self.thread.start()
+
+    def recover(self):
+        """
+        Move events of the processing list back to the tail of the event
+        list (i.e. to be popped first), keeping their order
+
+        :returns: `int` of number of requeued events
+        """
+
+        messages = self.redis.lrange(self.processing_key, 0, -1)
+
+        if messages:
+            pipeline = self.redis.pipeline()
+            pipeline.rpush(self.key, *messages)
+            pipeline.delete(self.processing_key)
+            pipeline.execute()
+
+        return len(messages)
+
+    def listen(self, callback):
+        """
+        Pop events from the Redis list until stopped
+
+        :param callback: function called with each (file path, URL) event
+
+        :returns: `None`
+        """
+
+        while not self.stopped.is_set():
+            try:
+                messages = self.pop()
+            except redis.exceptions.RedisError as err:
+                LOGGER.warning('Cannot read events from Redis: {}'.format(
+                    err))
+                self.stopped.wait(1)
+                continue
+
+            for message in messages:
+                try:
+                    event = decode_event(message)
+                except ValueError as err:
+                    LOGGER.warning('Invalid event: {}'.format(err))
+                    self.remove([message])
+                    continue
+
+                self.pending.append(message)
+                callback(event)
+
+    def pop(self):
+        """
+        Move available events to the processing list (waiting at most one
+        second for an event)
+
+        :returns: `list` of `str` of JSON events
+        """
+
+        message = self.redis.brpoplpush(self.key, self.processing_key,
+                                        timeout=1)
+
+        if message is None:
+            return []
+
+        # move events queued behind the first one in one round trip
+        pipeline = self.redis.pipeline(transaction=False)
+        for _ in range(self.batch_size - 1):
+            pipeline.rpoplpush(self.key, self.processing_key)
+
+        return [message] + [message_ for message_ in pipeline.execute()
+                            if message_ is not None]
+
+    def ack(self, count):
+        """
+        Acknowledge processed events, removing them from the processing
+        list (events are processed in order of arrival)
+
+        :param count: `int` of number of processed events
+
+        :returns: `None`
+        """
+
+        self.remove([self.pending.popleft()
+                     for _ in range(min(count, len(self.pending)))])
+
+    def remove(self, messages):
+        """
+        Remove events from the processing list (events which cannot be
+        removed are requeued when the source is next started)
+
+        :param messages: `list` of `str` of JSON events
+
+        :returns: `None`
+        """
+
+        pipeline = self.redis.pipeline(transaction=False)
+        for message in messages:
+            pipeline.lrem(self.processing_key, -1, message)
+
+        try:
+            pipeline.execute()
+        except redis.exceptions.RedisError as err:
+            LOGGER.warning('Cannot remove processed events: {}'.format(err))
+
+    def stop(self):
+        """
+        Stop receiving events
+
+        :returns: `None`
+        """
+
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def __repr__(self):
+        return '<RedisListSource> {}'.format(self.key)
+
+
+class GatewayClient:
+    """Client forwarding file events to the registration gateway"""
+
+    def __init__(self, url):
+        """
+        Initialize object
+
+        :param url: `str` of gateway URL (`unix:///path/to/socket` or
+                    `redis://host:port/db`)
+
+        :returns: `geomet_data_registry.gateway.core.GatewayClient`
+        """
+
+        self.url = url
+        self.url_parsed = urlparse(url)
+        self.socket = None
+        self.redis = None
+
+        if self.url_parsed.scheme in ['redis', 'rediss']:
+            self.redis = redis.Redis.from_url(url, health_check_interval=30,
+                                              retry_on_timeout=True)
+        elif self.url_parsed.scheme != 'unix':
+            msg = 'Unsupported gateway URL {}'.format(url)
+            LOGGER.error(msg)
+            raise GatewayError(msg)
+
+    def send(self, filepath, url=None):
+        """
+        Forward a file event to the gateway
+
+        :param filepath: path to file
+        :param url: fully qualified URL of file
+
+        :returns: `None`
+        """
+
+        event = encode_event(filepath, url)
+
+        if self.redis is not None:
+            try:
+                self.redis.lpush(GATEWAY_QUEUE, event)
+            except redis.exceptions.RedisError as err:
+                msg = 'Cannot forward event to {}: {}'.format(self.url, err)
+                LOGGER.warning(msg)
+                raise GatewayError(msg)
+            return
+
+        # the connection is kept open between events, and re-opened once
+        # when the gateway closed it (e.g. on restart)
+        for attempt in range(2):
+            try:
+                if self.socket is None:
+                    self.socket = socket.socket(socket.AF_UNIX,
+                                                socket.SOCK_STREAM)
+                    self.socket.connect(self.url_parsed.path)
+                self.socket.sendall('{}\n'.format(event).encode('utf-8'))
+                return
+            except OSError as err:
+                self.close()
+                if attempt > 0:
+                    msg = 'Cannot forward event to {}: {}'.format(
+                        self.url, err)
+                    LOGGER.warning(msg)
+                    raise GatewayError(msg)
+
+    def close(self):
+        """
+        Close the gateway connection
+
+        :returns: `None`
+        """
+
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+
+    def __repr__(self):
+        return '<GatewayClient> {}'.format(self.url)
+
+
+def encode_event(filepath, url=None):
+    """
+    Helper function to serialize a gateway event
+
+    :param filepath: path to file
+    :param url: fully qualified URL of file
+
+    :returns: `str` of JSON event
+    """
+
+    return json.dumps({'filepath': filepath, 'url': url})
+
+
+def decode_event(message):
+    """
+    Helper function to deserialize a gateway event
+
+    :param message: `str` or `bytes` of JSON event
+
+    :returns: `tuple` of file path and URL
+    """
+
+    try:
+        event = json.loads(message)
+        return event['filepath'], event.get('url')
+    except (KeyError, TypeError) as err:
+        raise ValueError('Missing event property: {}'.format(err))
+
+
+class GatewayError(Exception):
+    """Gateway error"""
+    pass
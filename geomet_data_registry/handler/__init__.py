@@ -18,10 +18,10 @@
 ###############################################################################
 
 import logging
-import os
 
 import click
 
+from geomet_data_registry.handler.bulk import BulkIngestor, find_files
 from geomet_data_registry.handler.core import CoreHandler
 from geomet_data_registry.util import json_pretty_print
 
@@ -45,21 +45,36 @@ def data():
               help='Path to directory')
 @click.option('--verify', '-v', is_flag=True, help='Verify only',
               default=False)
-def add_data(ctx, file_, directory, verify=False):
+@click.option('--workers', '-w', 'workers', type=click.IntRange(min=1),
+              help='Number of worker processes (bulk ingest of --directory)')
+def add_data(ctx, file_, directory, verify=False, workers=None):
     """add data to system"""
 
     if all([file_ is None, directory is None]):
         raise click.ClickException('Missing --file/-f or --dir/-d option')
 
+    if verify and workers is not None:
+        raise click.ClickException('--verify/-v cannot be used with '
+                                   '--workers/-w')
+
     files_to_process = []
 
     if file_ is not None:
         files_to_process = [file_]
     elif directory is not None:
-        for root, dirs, files in os.walk(directory):
-            for f in files:
-                files_to_process.append(os.path.join(root, f))
-        files_to_process.sort(key=os.path.getmtime)
+        files_to_process = find_files(directory)
+
+    if workers is not None and directory is not None:
+        def progress(processed, total, rate):
+            click.echo('Processed {}/{} files ({:.1f} files/s)'.format(
+                processed, total, rate), err=True)
+
+        summary = BulkIngestor(workers).run(files_to_process, progress)
+        click.echo('Registered {} files, {} failed, {} skipped'.format(
+            summary['registered'], summary['failed'],
+            summary['processed'] - summary['registered'] -
+            summary['failed']))
+        return
 
     for file_to_process in files_to_process:
         handler = CoreHandler(file_to_process)
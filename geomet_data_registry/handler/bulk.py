@@ -0,0 +1,330 @@
+###############################################################################
+#
+# Copyright (C) 2021 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import logging
+import os
+import re
+import time
+
+from geomet_data_registry.handler.core import CoreHandler
+from geomet_data_registry.handler.dispatch import get_dispatch_index
+from geomet_data_registry.metrics import METRICS
+from geomet_data_registry.tileindex.base import bulk_status, INDEXED_STATUSES
+
+LOGGER = logging.getLogger(__name__)
+
+# model run of a filename (YYYYMMDDHH, YYYYMMDDTHH[MM] or YYYY-MM)
+MODEL_RUN_REGEX = re.compile(r'\d{8}T?\d{1,2}|\d{4}-\d{2}')
+
+# number of files per task sent to a worker
+CHUNK_SIZE = 100
+
+# maximum number of files per tileindex bulk request
+BULK_BATCH_SIZE = 100
+
+
+class BulkIngestor:
+    """
+    Parallel, ordered ingest of many files (e.g. backfills).
+
+    Files are partitioned by model (layer plugin) and model run, and each
+    partition keeps the arrival order of its files.  Partitions are split
+    into chunks which are processed by a pool of worker processes.  As
+    `update_count` and `add_time_key` rely on the order of files of a model
+    (the first file of a model run resets the counts of the other runs of
+    the model), chunks of a given model are never processed concurrently:
+    partitions of different models are processed in parallel, while
+    partitions of a model are processed one after the other, in order of
+    their first file.
+    """
+
+    def __init__(self, workers=1, chunk_size=CHUNK_SIZE,
+                 batch_size=BULK_BATCH_SIZE):
+        """
+        Initialize object
+
+        :param workers: `int` of number of worker processes
+        :param chunk_size: `int` of number of files per worker task
+        :param batch_size: `int` of maximum number of files per tileindex
+                           bulk request
+
+        :returns: `geomet_data_registry.handler.bulk.BulkIngestor`
+        """
+
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+
+    def run(self, filepaths, progress=None):
+        """
+        Ingest files
+
+        :param filepaths: `list` of file paths, in arrival order
+        :param progress: optional callable receiving the number of
+                         processed files, total number of files and files
+                         per second after each completed chunk
+
+        :returns: `dict` of number of processed, registered and failed
+                  files (processed files which are neither registered nor
+                  failed were not identified, e.g. unconfigured variables)
+        """
+
+        total = len(filepaths)
+        summary = {
+            'processed': 0,
+            'registered': 0,
+            'failed': 0
+        }
+
+        pending = deque()
+        for model, files in partition_files(filepaths):
+            for i in range(0, len(files), self.chunk_size):
+                pending.append((model, files[i:i + self.chunk_size]))
+
+        LOGGER.info('Ingesting {} files ({} chunks) with {} workers'.format(
+            total, len(pending), self.workers))
+
+        start = time.monotonic()
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            running = {}
+
+            while pending or running:
+                busy_models = set(running.values())
+                # submit the first chunks of idle models, keeping the
+                # order of chunks of a model
+                for task in list(pending):
+                    if len(running) >= self.workers:
+                        break
+                    model, files = task
+                    if model in busy_models:
+                        continue
+                    pending.remove(task)
+                    busy_models.add(model)
+                    future = executor.submit(ingest_files, files,
+                                             self.batch_size)
+                    running[future] = model
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    del running[future]
+                    for key, value in future.result().items():
+                        summary[key] += value
+
+                if progress is not None:
+                    elapsed = time.monotonic() - start
+                    rate = summary['processed'] / elapsed if elapsed else 0
+                    progress(summary['processed'], total, rate)
+
+        return summary
+
+    def __repr__(self):
+        return '<BulkIngestor> {} workers'.format(self.workers)
+
+
+def find_files(directory):
+    """
+    Helper function to find all files of a directory (recursive), sorted
+    by modification time.  Modification times are read from the directory
+    entries while walking the directory, rather than sorting on
+    `os.path.getmtime` afterwards.
+
+    :param directory: `str` of directory path
+
+    :returns: `list` of file paths
+    """
+
+    files = []
+    directories = [directory]
+
+    while directories:
+        with os.scandir(directories.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(entry.path)
+                elif entry.is_file():
+                    files.append((entry.stat().st_mtime, entry.path))
+
+    files.sort(key=lambda file_: file_[0])
+
+    return [path for mtime, path in files]
+
+
+def partition_files(filepaths):
+    """
+    Helper function to partition files by model (layer plugin) and
+    model run, keeping the arrival order of files
+
+    :param filepaths: `list` of file paths, in arrival order
+
+    :returns: `list` of (model, `list` of file paths) tuples, in order of
+              the first file of each partition
+    """
+
+    dispatch_index = get_dispatch_index()
+    partitions = {}
+
+    for filepath in filepaths:
+        filename = os.path.basename(filepath)
+        model = dispatch_index.match(filename)
+        model_run = MODEL_RUN_REGEX.search(filename)
+        if model_run is not None:
+            model_run = model_run.group()
+
+        partitions.setdefault((model, model_run), []).append(filepath)
+
+    return [(model, files) for (model, model_run), files in
+            partitions.items()]
+
+
+def ingest_files(filepaths, batch_size=BULK_BATCH_SIZE):
+    """
+    Identify and register files in order (in a worker process)
+
+    :param filepaths: `list` of file paths
+    :param batch_size: `int` of maximum number of files per bulk request
+
+    :returns: `dict` of number of processed, registered and failed files
+    """
+
+    return ingest_events([(filepath, None) for filepath in filepaths],
+                         batch_size)
+
+
+def ingest_events(events, batch_size=BULK_BATCH_SIZE):
+    """
+    Identify and register files in order, sending tileindex writes in
+    bulk requests of up to `batch_size` files.
+
+    Store counts and time keys are updated in file order once the file
+    documents are indexed.  The batch is flushed before identifying a file
+    whose layer plugin may have layer dependencies, so that dependencies
+    of the batch are found in the tileindex.
+
+    :param events: `list` of (file path, URL) tuples
+    :param batch_size: `int` of maximum number of files per bulk request
+
+    :returns: `dict` of number of processed, registered and failed files
+    """
+
+    summary = {
+        'processed': 0,
+        'registered': 0,
+        'failed': 0
+    }
+    batch = []
+
+    for filepath, url in events:
+        summary['processed'] += 1
+        try:
+            handler = CoreHandler(filepath, url)
+            if batch and handler.dispatch().layer_dependencies:
+                flush(batch, summary)
+                batch = []
+            identify_status = handler.identify()
+        except Exception as err:
+            LOGGER.error('Cannot identify {}: {}'.format(filepath, err))
+            summary['failed'] += 1
+            continue
+
+        if identify_status:
+            batch.append(handler)
+
+        if len(batch) >= batch_size:
+            flush(batch, summary)
+            batch = []
+
+    if batch:
+        flush(batch, summary)
+
+    return summary
+
+
+def flush(handlers, summary):
+    """
+    Helper function to register a batch of identified files, adding
+    results to an ingest summary
+
+    :param handlers: `list` of `CoreHandler` objects of identified files
+    :param summary: `dict` of number of processed, registered and failed
+                    files
+
+    :returns: `None`
+    """
+
+    registered = register_files(handlers)
+    summary['registered'] += registered
+    summary['failed'] += len(handlers) - registered
+
+
+def register_files(handlers):
+    """
+    Register identified files with a single tileindex bulk request, then
+    update store counts and time keys (and send notifications) in file
+    order
+
+    :param handlers: `list` of `CoreHandler` objects of identified files
+
+    :returns: `int` of number of successfully registered files
+    """
+
+    files = []
+    docs = []
+
+    for handler in handlers:
+        layer = handler.layer_plugin
+        items = [item for item in layer.items if item['register_status']]
+        if not items:
+            LOGGER.error('Empty item list for {}'.format(layer.filepath))
+            continue
+        files.append((handler, items))
+        docs.extend([layer.layer2dict(item) for item in items])
+
+    if not docs:
+        return 0
+
+    LOGGER.debug('Adding {} files to tileindex (bulk)'.format(len(files)))
+    tileindex = handlers[0].layer_plugin.tileindex
+    with METRICS.span('tileindex_bulk_add', handlers[0].layer_plugin.model):
+        r = tileindex.bulk_add(docs)
+
+    registered = 0
+
+    for handler, items in files:
+        status = bulk_status(r, [item['identifier'] for item in items])
+
+        if status not in INDEXED_STATUSES:
+            LOGGER.error('Cannot register {}: status {}'.format(
+                handler.filepath, status))
+            continue
+
+        try:
+            # counts of spooled files are updated once replayed
+            handler.layer_plugin.complete(items, r, handler.publish)
+        except Exception as err:
+            LOGGER.error('Cannot register {}: {}'.format(
+                handler.filepath, err))
+            continue
+
+        registered += 1
+
+    return registered
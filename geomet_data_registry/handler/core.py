@@ -17,13 +17,18 @@
 #
 ###############################################################################
 
-from fnmatch import fnmatch
+import importlib
 import logging
 import os
 
-from geomet_data_registry.env import NOTIFICATIONS_PROVIDER_DEF
+from geomet_data_registry.env import (NOTIFICATIONS_PROVIDER_DEF,
+                                      STORE_PROVIDER_DEF,
+                                      TILEINDEX_PROVIDER_DEF)
 from geomet_data_registry.plugin import load_plugin, PLUGINS
 from geomet_data_registry.handler.base import BaseHandler
+from geomet_data_registry.handler.dispatch import get_dispatch_index
+from geomet_data_registry.layer.base import list_models, MODEL_CONFIG_CACHE
+from geomet_data_registry.metrics import METRICS
 from geomet_data_registry.util import get_today_and_now
 
 LOGGER = logging.getLogger(__name__)
@@ -54,53 +59,122 @@ class CoreHandler(BaseHandler):
         :returns: `bool` of status result
         """
 
+        if self.identify():
+            LOGGER.debug('Registering file')
+            self.layer_plugin.register(callback=self.publish)
+
+        return True
+
+    def dispatch(self):
+        """
+        Detect and load the layer plugin of the file
+
+        :returns: layer plugin object
+        """
+
         LOGGER.debug('Detecting filename pattern')
-        for key, value in PLUGINS['layer'].items():
-            if fnmatch(os.path.basename(self.filepath), value['pattern']):
-                plugin_def = {
-                    'type': key
-                }
-                LOGGER.debug('Loading plugin {}'.format(plugin_def))
-                self.layer_plugin = load_plugin('layer', plugin_def)
+        with METRICS.span('dispatch') as span:
+            key = get_dispatch_index().match(os.path.basename(self.filepath))
+            span.model = key
+        if key is not None:
+            plugin_def = {
+                'type': key
+            }
+            LOGGER.debug('Loading plugin {}'.format(plugin_def))
+            self.layer_plugin = load_plugin('layer', plugin_def)
 
         if self.layer_plugin is None:
             msg = 'Plugin not found'
             LOGGER.error(msg)
             raise RuntimeError(msg)
 
+        return self.layer_plugin
+
+    def identify(self):
+        """
+        Detect the layer plugin of the file (unless already dispatched)
+        and identify the file
+
+        :returns: `bool` of identify status
+        """
+
+        if self.layer_plugin is None:
+            self.dispatch()
+
         LOGGER.debug('Identifying file')
         identify_status = self.layer_plugin.identify(self.filepath, self.url)
 
         if identify_status:
             self.layer_plugin.identify_datetime = get_today_and_now()
-            LOGGER.debug('Registering file')
-            self.layer_plugin.register()
-            if self.layer_plugin.new_key_store:
-                self.layer_plugin.add_time_key()
-
-                for notifier in PLUGINS['notifier'].keys():
-                    if all([notifier == NOTIFICATIONS_PROVIDER_DEF['type'],
-                           NOTIFICATIONS_PROVIDER_DEF['active']]):
-                        LOGGER.debug('Loading plugin {}'.format(
-                            NOTIFICATIONS_PROVIDER_DEF))
-                        self.notification_plugin = load_plugin(
-                            'notifier', NOTIFICATIONS_PROVIDER_DEF
-                        )
-
-                        if self.notification_plugin is None:
-                            msg = 'Plugin not found'
-                            LOGGER.error(msg)
-                            raise RuntimeError(msg)
-
-                        if notifier == 'Celery':
-                            LOGGER.debug(
-                                'Sending mapfile refresh tasks to Celery'
-                            )
-                            self.notification_plugin.notify(
-                                self.layer_plugin.items
-                            )
 
-        return True
+        return identify_status
+
+    def publish(self):
+        """
+        Update the store time keys and send notifications of a registered
+        file, if it completed a new model run
+
+        :returns: `None`
+        """
+
+        if not self.layer_plugin.new_key_store:
+            return
+
+        with METRICS.span('add_time_key', self.layer_plugin.model):
+            self.layer_plugin.add_time_key()
+
+        for notifier in PLUGINS['notifier'].keys():
+            if all([notifier == NOTIFICATIONS_PROVIDER_DEF['type'],
+                   NOTIFICATIONS_PROVIDER_DEF['active']]):
+                LOGGER.debug('Loading plugin {}'.format(
+                    NOTIFICATIONS_PROVIDER_DEF))
+                self.notification_plugin = load_plugin(
+                    'notifier', NOTIFICATIONS_PROVIDER_DEF, shared=True
+                )
+
+                if self.notification_plugin is None:
+                    msg = 'Plugin not found'
+                    LOGGER.error(msg)
+                    raise RuntimeError(msg)
+
+                if notifier == 'Celery':
+                    LOGGER.debug('Sending mapfile refresh tasks to Celery')
+                    with METRICS.span('notify', self.layer_plugin.model):
+                        self.notification_plugin.notify(
+                            self.layer_plugin.items)
 
     def __repr__(self):
         return '<CoreHandler> {}'.format(self.url)
+
+
+def warm_start():
+    """
+    Helper function to perform the one-time setup of a process handling
+    files (e.g. a sarracenia instance), so that the first files handled
+    do not pay for it: layer plugin imports, layer dispatch index, shared
+    store/tileindex/notifier connections and parsed model configurations
+    (of all models configured in the store).
+
+    :returns: `list` of models with cached configurations
+    """
+
+    for plugin_def in PLUGINS['layer'].values():
+        importlib.import_module(plugin_def['path'].rsplit('.', 1)[0])
+
+    get_dispatch_index()
+
+    store = load_plugin('store', STORE_PROVIDER_DEF, shared=True)
+    load_plugin('tileindex', TILEINDEX_PROVIDER_DEF, shared=True)
+
+    if NOTIFICATIONS_PROVIDER_DEF['active']:
+        load_plugin('notifier', NOTIFICATIONS_PROVIDER_DEF, shared=True)
+
+    models = list_models(store)
+    if not models:
+        LOGGER.warning('No model configuration found in store')
+
+    for model in models:
+        LOGGER.debug('Loading {} configuration'.format(model))
+        MODEL_CONFIG_CACHE.get(store, model)
+
+    return models
@@ -0,0 +1,192 @@
+###############################################################################
+#
+# Copyright (C) 2026 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+import logging
+import os
+import re
+
+from geomet_data_registry.plugin import PLUGINS
+
+LOGGER = logging.getLogger(__name__)
+
+_DISPATCH_INDEX = None
+
+
+class LayerDispatchIndex:
+    """
+    Precompiled filename pattern index of layer plugins.
+
+    All layer plugin glob patterns are compiled into a single regular
+    expression so that an incoming filename is resolved to its layer plugin
+    in one pass.  When several patterns match the same filename, the layer
+    plugin defined last wins (as per the sequential fnmatch loop this index
+    replaces).
+    """
+
+    def __init__(self, layer_plugins):
+        """
+        Initialize object
+
+        :param layer_plugins: `dict` of layer plugin definitions
+                              (i.e. `PLUGINS['layer']`)
+
+        :returns: `geomet_data_registry.handler.dispatch.LayerDispatchIndex`
+        """
+
+        self.patterns = [(key, os.path.normcase(value['pattern']))
+                         for key, value in layer_plugins.items()]
+        self.groups = {}
+
+        alternatives = []
+        # alternatives are tried in order, so last defined plugins go first
+        for i, (key, pattern) in enumerate(reversed(self.patterns)):
+            group = 'layer{}'.format(i)
+            self.groups[group] = key
+            alternatives.append('(?P<{}>{})'.format(group,
+                                                    glob2regex(pattern)))
+
+        self.regex = re.compile('|'.join(alternatives), re.DOTALL)
+
+        self.ambiguities = find_ambiguities(self.patterns)
+        for key, other_key in self.ambiguities:
+            LOGGER.warning('Layer plugin patterns {} ({}) and {} ({}) '
+                           'overlap: {} takes precedence'.format(
+                               key, layer_plugins[key]['pattern'],
+                               other_key, layer_plugins[other_key]['pattern'],
+                               other_key))
+
+    def match(self, filename):
+        """
+        Resolve a filename to its layer plugin
+
+        :param filename: `str` of filename (basename)
+
+        :returns: `str` of layer plugin name, or `None` if no plugin matches
+        """
+
+        result = self.regex.match(os.path.normcase(filename))
+
+        if result is None:
+            return None
+
+        return self.groups[result.lastgroup]
+
+    def __repr__(self):
+        return '<LayerDispatchIndex> {} patterns'.format(len(self.patterns))
+
+
+def get_dispatch_index():
+    """
+    Helper function to return the process-wide layer dispatch index,
+    building it on first use
+
+    :returns: `geomet_data_registry.handler.dispatch.LayerDispatchIndex`
+    """
+
+    global _DISPATCH_INDEX
+
+    if _DISPATCH_INDEX is None:
+        LOGGER.debug('Building layer dispatch index')
+        _DISPATCH_INDEX = LayerDispatchIndex(PLUGINS['layer'])
+
+    return _DISPATCH_INDEX
+
+
+def find_ambiguities(patterns):
+    """
+    Detects pairs of glob patterns where one pattern matches the shortest
+    filename of the other (i.e. one pattern is a specialization of the
+    other, such as `*MSC_RAQDPS*` and `*MSC_RAQDPS-FW_*.grib2`)
+
+    :param patterns: `list` of (name, glob pattern) tuples
+
+    :returns: `list` of (name, overriding name) tuples, where the
+              overriding name is the pattern defined last
+    """
+
+    ambiguities = []
+
+    compiled = [(key, re.compile(glob2regex(pattern), re.DOTALL),
+                 shortest_match(pattern)) for key, pattern in patterns]
+
+    for i, (key, regex, witness) in enumerate(compiled):
+        for other_key, other_regex, other_witness in compiled[i + 1:]:
+            if other_regex.match(witness) or regex.match(other_witness):
+                ambiguities.append((key, other_key))
+
+    return ambiguities
+
+
+def glob2regex(pattern):
+    """
+    Translates a glob pattern into a regular expression.  Unlike
+    `fnmatch.translate`, wildcards are translated to plain (backtracking)
+    `.*`, which is much faster for the short prefix/infix/suffix patterns
+    used by layer plugins.
+
+    :param pattern: `str` of glob pattern
+
+    :returns: `str` of regular expression
+    """
+
+    regex = []
+    i = 0
+
+    while i < len(pattern):
+        char = pattern[i]
+        i += 1
+        if char == '*':
+            regex.append('.*')
+        elif char == '?':
+            regex.append('.')
+        elif char == '[':
+            start = i
+            if pattern[start:start + 1] == '!':
+                start += 1
+            if pattern[start:start + 1] == ']':
+                start += 1
+            end = pattern.find(']', start)
+            if end == -1:
+                regex.append('\\[')
+                continue
+            chars = pattern[i:end].replace('\\', '\\\\')
+            if chars.startswith('!'):
+                chars = '^' + chars[1:]
+            elif chars.startswith('^'):
+                chars = '\\' + chars
+            regex.append('[{}]'.format(chars))
+            i = end + 1
+        else:
+            regex.append(re.escape(char))
+
+    return '{}\\Z'.format(''.join(regex))
+
+
+def shortest_match(pattern):
+    """
+    Builds the shortest filename matched by a glob pattern (wildcards
+    match nothing, single characters and character classes match `x`)
+
+    :param pattern: `str` of glob pattern
+
+    :returns: `str` of filename
+    """
+
+    return re.sub(r'\[!?\]?[^\]]*\]', 'x', pattern).replace(
+        '*', '').replace('?', 'x')
@@ -17,18 +17,552 @@
 #
 ###############################################################################
 
+from collections import OrderedDict
+from collections.abc import Mapping
 from datetime import datetime, timedelta
+import json
 import logging
+from threading import Lock
+import time
 
-from geomet_data_registry.env import STORE_PROVIDER_DEF, TILEINDEX_PROVIDER_DEF
+import parse
+
+from geomet_data_registry.env import (CONFIG_CACHE_TTL, DOCUMENT_CACHE_SIZE,
+                                      DOCUMENT_CACHE_TTL,
+                                      STORE_CONFIG_PARTITIONED,
+                                      STORE_PROVIDER_DEF,
+                                      TILEINDEX_PROVIDER_DEF)
+from geomet_data_registry.metrics import METRICS, timed
 from geomet_data_registry.plugin import load_plugin
-from geomet_data_registry.tileindex.base import TileNotFoundError
+from geomet_data_registry.store.base import (CONFIG_HEADER_FIELD,
+                                             CONFIG_UPDATES_CHANNEL,
+                                             StoreError)
+from geomet_data_registry.tileindex.base import (bulk_status,
+                                                 CREATED_STATUSES,
+                                                 SPOOLED_STATUS,
+                                                 STORED_STATUSES)
+from geomet_data_registry.tileindex.indexer import BulkIndexer
 from geomet_data_registry.util import (get_today_and_now, VRTDataset,
-                                       DATE_FORMAT)
+                                       DATE_FORMAT, GLOBAL_GEOMETRY,
+                                       parse_nonwhitespace)
 
 
 LOGGER = logging.getLogger(__name__)
 
+# custom types available to all model filename patterns
+FILENAME_PATTERN_TYPES = dict(NonWhitespaceChars=parse_nonwhitespace)
+
+
+class FilenameParserRegistry:
+    """
+    Registry of compiled model filename pattern parsers.
+
+    Parsers are keyed by model and filename pattern, and are compiled once
+    for all filename patterns of a model configuration (including
+    resolution and member/product specific patterns) when the model
+    configuration is loaded.
+    """
+
+    def __init__(self):
+        """
+        Initialize object
+
+        :returns: `geomet_data_registry.layer.base.FilenameParserRegistry`
+        """
+
+        self.parsers = {}
+
+    def register(self, model, file_dict):
+        """
+        Compile the parsers of all filename patterns of a model
+        configuration, replacing previously registered model parsers
+
+        :param model: `str` of model name
+        :param file_dict: `dict` of model configuration
+
+        :returns: `int` of number of registered parsers
+        """
+
+        self.invalidate(model)
+
+        patterns = set(find_filename_patterns(file_dict))
+        for pattern in patterns:
+            self.compile(model, pattern)
+
+        LOGGER.debug('Registered {} {} filename parsers'.format(
+            len(patterns), model))
+
+        return len(patterns)
+
+    def get(self, model, pattern):
+        """
+        Get the parser of a model filename pattern, compiling it if it
+        was not registered
+
+        :param model: `str` of model name
+        :param pattern: `str` of filename pattern
+
+        :returns: `parse.Parser` of filename pattern
+        """
+
+        parser = self.parsers.get((model, pattern))
+
+        if parser is None:
+            parser = self.compile(model, pattern)
+
+        return parser
+
+    def compile(self, model, pattern):
+        """
+        Compile and register the parser of a model filename pattern
+
+        :param model: `str` of model name
+        :param pattern: `str` of filename pattern
+
+        :returns: `parse.Parser` of filename pattern
+        """
+
+        parser = parse.compile(pattern, FILENAME_PATTERN_TYPES)
+        self.parsers[(model, pattern)] = parser
+
+        return parser
+
+    def invalidate(self, model=None):
+        """
+        Drop registered parsers
+
+        :param model: `str` of model name (all models if `None`)
+
+        :returns: `None`
+        """
+
+        if model is None:
+            self.parsers.clear()
+            return
+
+        for key in [key for key in self.parsers if key[0] == model]:
+            del self.parsers[key]
+
+    def __repr__(self):
+        return '<FilenameParserRegistry> {} parsers'.format(
+            len(self.parsers))
+
+
+def find_filename_patterns(config):
+    """
+    Helper function to find all filename patterns of a model configuration
+
+    :param config: `dict` of (part of) model configuration
+
+    :returns: generator of `str` filename patterns
+    """
+
+    for key, value in config.items():
+        if key == 'filename_pattern':
+            if isinstance(value, dict):  # e.g. RDPA 10km/15km patterns
+                yield from value.values()
+            else:
+                yield value
+        elif isinstance(value, dict):
+            yield from find_filename_patterns(value)
+
+
+FILENAME_PARSERS = FilenameParserRegistry()
+
+
+class ModelVariables(Mapping):
+    """
+    Variables of a partitioned model configuration.
+
+    The definition of a variable is fetched from the store (a single hash
+    field) when first looked up, then kept (as well as unknown variables)
+    for the lifetime of the cached configuration.  Variable names are only
+    fetched when iterating.
+    """
+
+    def __init__(self, store, key, path):
+        """
+        Initialize object
+
+        :param store: store provider
+        :param key: `str` of hash key of the partitioned configuration
+        :param path: `str` of path of the variables in the configuration
+                     (e.g. `model_giops/3D/variable`)
+
+        :returns: `geomet_data_registry.layer.base.ModelVariables`
+        """
+
+        self.store = store
+        self.key = key
+        self.path = path
+        self.names = None
+        self.variables = {}
+        self.lock = Lock()
+
+    def __getitem__(self, name):
+        with self.lock:
+            if name not in self.variables:
+                LOGGER.debug('Loading {}/{} configuration from store'.format(
+                    self.path, name))
+                value = self.store.get_fields(
+                    self.key, ['{}/{}'.format(self.path, name)])[0]
+                self.variables[name] = None if value is None \
+                    else json.loads(value)
+
+            variable = self.variables[name]
+
+        if variable is None:
+            raise KeyError(name)
+
+        return variable
+
+    def __contains__(self, name):
+        try:
+            self[name]
+        except KeyError:
+            return False
+
+        return True
+
+    def __iter__(self):
+        with self.lock:
+            if self.names is None:
+                value = self.store.get_fields(self.key, [self.path])[0]
+                self.names = json.loads(value) if value is not None else []
+
+        return iter(self.names)
+
+    def __len__(self):
+        return sum(1 for name in self)
+
+    def __repr__(self):
+        return '<ModelVariables> {} ({} loaded)'.format(
+            self.path, len(self.variables))
+
+
+class ModelConfigCache:
+    """
+    In-process cache of parsed model configurations.
+
+    Model configurations are fetched from the store and parsed once, then
+    served from memory.  Cached configurations are invalidated when
+    `geomet-data-registry store set` announces an update on the store
+    updates channel.  When the store does not support (or loses) the
+    subscription, the `<model>_version` key is checked instead, at most
+    every `ttl` seconds per model.
+
+    With partitioned model configurations (see `geomet-data-registry store
+    set --partitioned`), only the configuration header is fetched and
+    parsed when a model is loaded, and each variable when first accessed.
+    """
+
+    def __init__(self, ttl=60, partitioned=False):
+        """
+        Initialize object
+
+        :param ttl: `int` of seconds between version checks of a cached
+                    model configuration when no subscription is active
+        :param partitioned: `bool` of whether to load partitioned model
+                            configurations (`<model>_config` hashes), when
+                            available
+
+        :returns: `geomet_data_registry.layer.base.ModelConfigCache`
+        """
+
+        self.ttl = ttl
+        self.partitioned = partitioned
+        self.configs = {}
+        self.listener = None
+        self.last_subscribe = None
+        self.lock = Lock()
+
+    def get(self, store, model):
+        """
+        Get a model configuration
+
+        :param store: store provider
+        :param model: `str` of model name (i.e. store key)
+
+        :returns: `dict` of model configuration
+        """
+
+        with self.lock:
+            listening = self.is_listening(store)
+            now = time.monotonic()
+            entry = self.configs.get(model)
+
+            if entry is not None:
+                if listening or now < entry['expires']:
+                    return entry['file_dict']
+
+                version = store.get_key('{}_version'.format(model))
+                if version is not None and version == entry['version']:
+                    entry['expires'] = now + self.ttl
+                    return entry['file_dict']
+            else:
+                version = store.get_key('{}_version'.format(model))
+
+            file_dict = None
+            if self.partitioned:
+                file_dict = self.load_partitioned(store, model)
+            if file_dict is None:
+                LOGGER.debug('Loading {} configuration from store'.format(
+                    model))
+                file_dict = json.loads(store.get_key(model))
+            FILENAME_PARSERS.register(model, file_dict)
+
+            self.configs[model] = {
+                'file_dict': file_dict,
+                'version': version,
+                'expires': now + self.ttl
+            }
+
+            return file_dict
+
+    def load_partitioned(self, store, model):
+        """
+        Load the header of a partitioned model configuration, with
+        variables fetched on first access
+
+        :param store: store provider
+        :param model: `str` of model name
+
+        :returns: `dict` of model configuration, or `None` if the model
+                  configuration is not partitioned in the store
+        """
+
+        key = '{}_config'.format(model)
+
+        try:
+            header = store.get_fields(key, [CONFIG_HEADER_FIELD])[0]
+        except NotImplementedError:
+            LOGGER.debug('Store does not support partitioned '
+                         'configurations')
+            return None
+
+        if header is None:
+            LOGGER.debug('No partitioned {} configuration'.format(model))
+            return None
+
+        LOGGER.debug('Loading {} configuration header from store'.format(
+            model))
+
+        def load(value):
+            if not isinstance(value, dict):
+                return value
+
+            config = {}
+            for key_, value_ in value.items():
+                if key_ == 'variable' and isinstance(value_, str):
+                    config[key_] = ModelVariables(store, key, value_)
+                else:
+                    config[key_] = load(value_)
+
+            return config
+
+        return load(json.loads(header))
+
+    def invalidate(self, model=None):
+        """
+        Invalidate cached model configuration(s)
+
+        :param model: `str` of model name (all models if `None`)
+
+        :returns: `None`
+        """
+
+        if model is None:
+            self.configs.clear()
+        else:
+            LOGGER.debug('Invalidating cached {} configuration'.format(model))
+            self.configs.pop(model, None)
+
+    def clear(self):
+        """
+        Clear the cache (and filename parsers), and drop the subscription
+        listener
+
+        :returns: `None`
+        """
+
+        with self.lock:
+            self.configs.clear()
+            self.listener = None
+            self.last_subscribe = None
+            FILENAME_PARSERS.invalidate()
+
+    def is_listening(self, store):
+        """
+        Checks whether configuration updates are received from the store,
+        (re)subscribing at most every `ttl` seconds
+
+        :param store: store provider
+
+        :returns: `bool` of whether a subscription listener is active
+        """
+
+        if self.listener is not None and self.listener.is_alive():
+            return True
+
+        now = time.monotonic()
+        if (self.last_subscribe is not None and
+                now - self.last_subscribe < self.ttl):
+            return False
+
+        if self.listener is not None:
+            LOGGER.warning('Configuration updates subscription lost')
+            # updates may have been missed while disconnected
+            self.configs.clear()
+
+        self.last_subscribe = now
+        self.listener = None
+
+        try:
+            self.listener = store.subscribe(CONFIG_UPDATES_CHANNEL,
+                                            self.invalidate)
+        except NotImplementedError:
+            LOGGER.debug('Store does not support subscriptions')
+        except StoreError as err:
+            LOGGER.warning('Cannot subscribe to configuration updates: '
+                           '{}'.format(err))
+
+        return self.listener is not None
+
+    def __repr__(self):
+        return '<ModelConfigCache> {} models'.format(len(self.configs))
+
+
+MODEL_CONFIG_CACHE = ModelConfigCache(CONFIG_CACHE_TTL,
+                                      STORE_CONFIG_PARTITIONED)
+
+# suffixes of store keys derived from model configurations (configuration
+# versions, partitioned configurations and model run counts)
+MODEL_KEY_SUFFIXES = ('_version', '_config', '_count')
+
+
+def list_models(store):
+    """
+    Helper function to list the models configured in the store, i.e. the
+    keys set by `geomet-data-registry store set`, whether or not they have
+    a configuration version (stores populated before versions were set
+    have none)
+
+    :param store: store provider
+
+    :returns: sorted `list` of model names
+    """
+
+    prefix = 'geomet-data-registry_'
+    keys = [key[len(prefix):] for key in
+            store.list_keys('{}*'.format(prefix))]
+
+    models = set(key[:-len('_version')] for key in keys
+                 if key.endswith('_version'))
+
+    # a model configuration is a JSON object keyed by the model name
+    candidates = [key for key in keys if key not in models
+                  and not key.endswith(MODEL_KEY_SUFFIXES)]
+    for key, value in zip(candidates, store.get_keys(candidates)):
+        try:
+            config = json.loads(value)
+        except (TypeError, ValueError):
+            continue
+        if isinstance(config, dict) and key in config:
+            models.add(key)
+
+    return sorted(models)
+
+
+class DocumentCache:
+    """
+    In-process LRU cache of recently registered tileindex documents.
+
+    Documents are added once indexed by the register path, and serve
+    layer dependency lookups (e.g. wind layers looking up the other wind
+    component of a model run and forecast hour) without a tileindex
+    request.  Documents expire `ttl` seconds after being added; later
+    tileindex updates of a document (e.g. default model runs) are not
+    reflected, so the cache only serves dependency lookups.
+    """
+
+    def __init__(self, size=10000, ttl=300):
+        """
+        Initialize object
+
+        :param size: `int` of maximum number of cached documents
+        :param ttl: `int` of seconds documents are cached (0 disables the
+                    cache)
+
+        :returns: `geomet_data_registry.layer.base.DocumentCache`
+        """
+
+        self.size = size
+        self.ttl = ttl
+        self.docs = OrderedDict()
+        self.lock = Lock()
+
+    def add(self, docs):
+        """
+        Cache documents
+
+        :param docs: `list` of GeoJSON documents
+
+        :returns: `None`
+        """
+
+        if self.ttl <= 0 or self.size <= 0:
+            return
+
+        expires = time.monotonic() + self.ttl
+
+        with self.lock:
+            for doc in docs:
+                identifier = doc['properties']['identifier']
+                self.docs[identifier] = (doc, expires)
+                self.docs.move_to_end(identifier)
+
+            while len(self.docs) > self.size:
+                self.docs.popitem(last=False)
+
+    def get(self, identifier):
+        """
+        Get a cached document
+
+        :param identifier: tileindex item identifier
+
+        :returns: `dict` of GeoJSON document, or `None` if the document is
+                  not cached (or expired)
+        """
+
+        with self.lock:
+            entry = self.docs.get(identifier)
+            if entry is None:
+                return None
+
+            doc, expires = entry
+            if time.monotonic() >= expires:
+                del self.docs[identifier]
+                return None
+
+            self.docs.move_to_end(identifier)
+            return doc
+
+    def clear(self):
+        """
+        Clear the cache
+
+        :returns: `None`
+        """
+
+        with self.lock:
+            self.docs.clear()
+
+    def __repr__(self):
+        return '<DocumentCache> {} documents'.format(len(self.docs))
+
+
+DOCUMENT_CACHE = DocumentCache(DOCUMENT_CACHE_SIZE, DOCUMENT_CACHE_TTL)
+
 
 class BaseLayer:
     """generic layer ABC"""
@@ -59,10 +593,14 @@ class BaseLayer:
         self.date_ = None
         self.file_dict = None
         self.new_key_store = False
+        # whether layers of the model may be built from other layers of
+        # the tileindex (see check_layer_dependencies)
+        self.layer_dependencies = False
 
         self.name = provider_def['name']
-        self.store = load_plugin('store', STORE_PROVIDER_DEF)
-        self.tileindex = load_plugin('tileindex', TILEINDEX_PROVIDER_DEF)
+        self.store = load_plugin('store', STORE_PROVIDER_DEF, shared=True)
+        self.tileindex = load_plugin('tileindex', TILEINDEX_PROVIDER_DEF,
+                                     shared=True)
 
     def identify(self, filepath, url=None):
         """
@@ -77,35 +615,165 @@ class BaseLayer:
         self.filepath = filepath
         self.url = url
 
-    def register(self):
+    @timed('config_load')
+    def get_model_config(self):
+        """
+        Get the configuration of the layer model from the model
+        configuration cache
+
+        :returns: `dict` of model configuration
+        """
+
+        return MODEL_CONFIG_CACHE.get(self.store, self.model)
+
+    @timed('filename_parse')
+    def parse_filename(self, filename_pattern, filename):
+        """
+        Parse a filename with the compiled parser of a filename pattern
+        of the layer model
+
+        :param filename_pattern: `str` of filename pattern
+        :param filename: `str` of filename
+
+        :returns: `parse.Result` of parsed filename, or `None` if the
+                  filename does not match the pattern
+        """
+
+        return FILENAME_PARSERS.get(self.model, filename_pattern).parse(
+            filename)
+
+    def register(self, callback=None):
         """
         Registers a file into the system
+
+        When the tileindex buffers documents (see
+        `geomet_data_registry.tileindex.indexer.BulkIndexer`), documents
+        are indexed asynchronously, and counts are updated once indexed
+        (see `complete`).
+
+        :param callback: optional function called (without arguments) once
+                         the file is registered and counts are updated
+
         :returns: `bool` of status result
         """
         items = [item for item in self.items if item['register_status']]
+
+        if items and isinstance(self.tileindex.indexer, BulkIndexer):
+            LOGGER.debug('Adding to tileindex (buffered)')
+            item_bulk = [self.layer2dict(item) for item in items]
+            with METRICS.span('tileindex_submit', self.model):
+                future = self.tileindex.indexer.submit(item_bulk)
+            future.add_done_callback(
+                lambda future: self.registered(items, future, callback,
+                                               item_bulk))
+            return True
+
         if len(items) > 1:
             item_bulk = []
             for item in items:
                 item_bulk.append(self.layer2dict(item))
             LOGGER.debug('Adding to tileindex (bulk)')
-            r = self.tileindex.bulk_add(item_bulk)
-            status = r[items[0]['identifier']]
-            item_dict = item_bulk[0]
-            self.update_count(items[0], status)
+            with METRICS.span('tileindex_bulk_add', self.model):
+                r = self.tileindex.bulk_add(item_bulk)
+            self.complete(items, r, callback, item_bulk)
         elif len(items) == 1:
             item = items[0]
             LOGGER.debug('Adding item {}'.format(item['identifier']))
             item_dict = self.layer2dict(item)
             LOGGER.debug('Adding to tileindex')
-            r = self.tileindex.add(item_dict['properties']['identifier'],
-                                   item_dict)
-            self.update_count(items[0], r)
+            with METRICS.span('tileindex_add', self.model):
+                r = self.tileindex.add(item_dict['properties']['identifier'],
+                                       item_dict)
+            self.complete(items, r, callback, [item_dict])
         else:
             LOGGER.error('Empty item list for {}'.format(self.filepath))
             return False
 
         return True
 
+    def registered(self, items, future, callback=None, docs=None):
+        """
+        Completes the registration of a file once its documents are indexed
+        by the buffered bulk indexer
+
+        :param items: `list` of registered items of the items list
+        :param future: `concurrent.futures.Future` of `dict` of
+                       {identifier: HTTP status code}
+        :param callback: optional function called (without arguments) once
+                         counts are updated
+        :param docs: `list` of indexed GeoJSON documents, if any
+
+        :returns: `None`
+        """
+
+        try:
+            self.complete(items, future.result(), callback, docs)
+        except Exception as err:
+            LOGGER.exception('Error registering {}: {}'.format(
+                self.filepath, err))
+
+    def complete(self, items, result, callback=None, docs=None):
+        """
+        Completes the registration of a file once its documents are
+        indexed: caches documents, updates counts and calls the callback.
+        Registrations of spooled documents (`SPOOLED_STATUS`) are completed
+        once the documents are replayed, so that files are only counted
+        once stored in the tileindex.
+
+        :param items: `list` of registered items of the items list
+        :param result: `dict` of {identifier: HTTP status code}, or `int`
+                       HTTP status code of all documents
+        :param callback: optional function called (without arguments) once
+                         counts are updated
+        :param docs: `list` of indexed GeoJSON documents, if any
+
+        :returns: `None`
+        """
+
+        identifiers = [item['identifier'] for item in items]
+        if not isinstance(result, dict):
+            result = {identifier: result for identifier in identifiers}
+
+        status = bulk_status(result, identifiers)
+
+        if status == SPOOLED_STATUS:
+            LOGGER.debug('Completing registration of {} once replayed'.format(
+                self.filepath))
+            self.tileindex.when_replayed(
+                [identifier for identifier in identifiers
+                 if result.get(identifier) == SPOOLED_STATUS],
+                lambda replayed: self.complete(items, dict(result, **replayed),
+                                               callback, docs))
+            return
+
+        if docs is not None:
+            self.cache_documents(docs, result)
+        self.update_count(items[0], status)
+        if callback is not None:
+            callback()
+
+    def cache_documents(self, docs, result):
+        """
+        Adds documents stored in the tileindex (created or updated, not
+        spooled) to the document cache (see
+        `geomet_data_registry.layer.base.DocumentCache`), so that
+        dependencies are only resolved from queryable documents
+
+        :param docs: `list` of GeoJSON documents
+        :param result: `dict` of {identifier: HTTP status code}, or `int`
+                       HTTP status code of all documents
+
+        :returns: `None`
+        """
+
+        if isinstance(result, dict):
+            docs = [doc for doc in docs if result.get(
+                doc['properties']['identifier']) in STORED_STATUSES]
+        elif result not in STORED_STATUSES:
+            return
+
+        DOCUMENT_CACHE.add(docs)
+
     def layer2dict(self, item):
         """
         Uses one model item to create a dictionary
@@ -117,13 +785,7 @@ class BaseLayer:
 
         feature_dict = {
             'type': 'Feature',
-            'geometry': {
-                'type': 'Polygon',
-                'coordinates': [
-                    [[-180, -90], [-180, 90], [180, 90],
-                     [180, -90], [-180, -90]]
-                ]
-            },
+            'geometry': GLOBAL_GEOMETRY,
             'properties': {
                  'identifier': item['identifier'],
                  'layer': item['layer_name'],
@@ -150,6 +812,7 @@ class BaseLayer:
 
         return feature_dict
 
+    @timed('update_count')
     def update_count(self, item, r):
         """
         update count in store for expected files/layers
@@ -159,64 +822,67 @@ class BaseLayer:
         :param item_dict: dictionary of layers formatted for the tileindex
         """
 
-        if item['expected_count'] is not None and r == 201:
+        if item['expected_count'] is not None and r in CREATED_STATUSES:
             layer_count_key = '{}_{}_{}_count'.format(
                 self.model, self.wx_variable, self.model_run)
-            current_layer_file_count = self.store.get_key(layer_count_key)
-
-            LOGGER.debug('Adding to store')
-            if current_layer_file_count is not None:
-                LOGGER.debug('Incrementing count')
-                new_layer_file_count = int(current_layer_file_count) + 1
-                self.store.set_key(layer_count_key,
-                                   new_layer_file_count)
-            else:
-                LOGGER.debug('Initializing count')
-                new_layer_file_count = 1
-                self.store.set_key(layer_count_key, 1)
-
-            LOGGER.debug('Look if we have a complete model run')
-            if int(new_layer_file_count) >= item['expected_count']:
-                for mr in self.model_run_list:
-                    layer_count_key_reset = '{}_{}_{}_count'.format(
-                        self.model, self.wx_variable, mr)
-                    self.store.set_key(layer_count_key_reset, 0)
-                    self.new_key_store = True
-            elif int(new_layer_file_count) == 1:
-                for mr in self.model_run_list:
-                    layer_count_key_reset = '{}_{}_{}_count'.format(
-                        self.model, self.wx_variable, mr)
-                    mr_nm = self.store.get_key(layer_count_key_reset)
-                    if layer_count_key_reset != layer_count_key and \
-                       mr_nm not in ['0', None]:
-                        LOGGER.error('Incomplete model run: {} '
-                                     '--> {} / {} files '
-                                     '({})'.format(mr,
-                                                   mr_nm,
-                                                   item['expected_count'],
-                                                   item['layer_name']))
-                        self.store.set_key(layer_count_key_reset, 0)
-        elif r == 201:
+            run_count_keys = {
+                '{}_{}_{}_count'.format(self.model, self.wx_variable, mr): mr
+                for mr in self.model_run_list
+            }
+
+            LOGGER.debug('Incrementing count')
+            completed, incomplete = self.store.increment_count(
+                layer_count_key, item['expected_count'],
+                list(run_count_keys))
+
+            if completed:
+                LOGGER.debug('Complete model run')
+                self.new_key_store = True
+
+            for run_count_key, mr_nm in incomplete.items():
+                LOGGER.error('Incomplete model run: {} '
+                             '--> {} / {} files '
+                             '({})'.format(run_count_keys[run_count_key],
+                                           mr_nm,
+                                           item['expected_count'],
+                                           item['layer_name']))
+        elif r in CREATED_STATUSES:
             self.new_key_store = True
 
-    def check_layer_dependencies(self, layers_list, str_mr, str_fh):
+    @timed('dependency_lookup')
+    def check_layer_dependencies(self, layers_list, str_mr, str_fh,
+                                 model=None):
         """
         Checks if all layer dependencies are available in the tileindex
         for a given model run and forecast hour.
         :param layers_list: `list` of layer dependencies
         :param str_mr: `str` of model run
         :param str_fh: `str` of forecast hour
+        :param model: `str` of model property of the dependencies
+                      (default: layer model)
         :returns: `list` of GeoJSON objects for all retrieved dependencies if
                    all dependencies are found otherwise returns an empty list
         """
-        try:
-            dependencies = [self.tileindex.get('{}-{}-{}'.format(
-                layer, str_mr, str_fh)) for layer in layers_list]
-        except TileNotFoundError:
+        identifiers = ['{}-{}-{}'.format(layer, str_mr, str_fh)
+                       for layer in layers_list]
+
+        dependencies = {}
+        for identifier in identifiers:
+            doc = DOCUMENT_CACHE.get(identifier)
+            if doc is not None:
+                dependencies[identifier] = doc
+
+        missing = [identifier for identifier in identifiers
+                   if identifier not in dependencies]
+        if missing:
+            dependencies.update(self.tileindex.mget(
+                missing, model=model or self.model, reference_datetime=str_mr))
+
+        if len(dependencies) < len(identifiers):
             LOGGER.debug('Some layer dependencies not found.')
             return False
 
-        return dependencies
+        return [dependencies[identifier] for identifier in identifiers]
 
     def configure_layer_with_dependencies(self,
                                           dependencies,
@@ -259,20 +925,29 @@ class BaseLayer:
 
         return vrt, urls, weather_variables
 
-    def check_dependencies_default_mr(self, mr_datetime, dependencies):
+    def check_dependencies_default_mr(self, mr_datetime, dependencies,
+                                      default_model_runs=None):
         """
         For each dependency, verify that a default model run is available in
         the store and the value is equal to the passed model run time.
         :param dependencies: `list` of dependencies to check
         :param mr_datetime: `datetime` to compare dependencies to
+        :param default_model_runs: `dict` of default model run keys to
+                                   values already fetched from the store, if
+                                   any (otherwise fetched with one request)
         :returns: `bool` indicating if all dependencies'
                   default model run is equal to the passed mr_datetime param
         """
+
+        keys = ['{}_default_model_run'.format(layer) for layer in dependencies]
+
+        if default_model_runs is None:
+            default_model_runs = dict(zip(keys, self.store.get_keys(keys)))
+
         results = [datetime.strptime(default_mr, DATE_FORMAT) == mr_datetime
                    if default_mr is not None else False
-                   for default_mr in [self.store.get_key
-                                      ('{}_default_model_run'.format(layer))
-                                      for layer in dependencies]]
+                   for default_mr in [default_model_runs.get(key)
+                                      for key in keys]]
         return all(results)
 
     @staticmethod
@@ -300,8 +975,27 @@ class BaseLayer:
         to store for layers included in self.items (a list of GeoMet
         layers modified/updated by an incoming received weather
         variable).
+
+        The default model runs of all layers and of their dependencies are
+        fetched with one request, and the time keys of all layers are set
+        with one (pipelined) request.
         :returns: `bool` if layers had their time keys updated successfully
         """
+
+        keys = []
+        for item in self.items:
+            keys.append('{}_default_model_run'.format(item['layer_name']))
+            keys.extend('{}_default_model_run'.format(layer) for layer in
+                        item['layer_config'].get('dependencies', []))
+        keys = list(dict.fromkeys(keys))
+
+        # default model runs, as updated by the layers of this file
+        default_model_runs = {}
+        if keys:
+            default_model_runs = dict(zip(keys, self.store.get_keys(keys)))
+
+        time_keys = {}
+
         for item in self.items:
 
             time_extent_key = '{}_time_extent'.format(item['layer_name'])
@@ -321,7 +1015,8 @@ class BaseLayer:
             default_model_key = '{}_default_model_run'.format(
                 item['layer_name'])
 
-            stored_default_model_run = self.store.get_key(default_model_key)
+            stored_default_model_run = default_model_runs.get(
+                default_model_key)
 
             model_run_extent_key = '{}_model_run_extent'.format(
                 item['layer_name'])
@@ -346,7 +1041,8 @@ class BaseLayer:
 
             if 'dependencies' in item['layer_config']:
                 if not self.check_dependencies_default_mr(
-                        self.date_, item['layer_config']['dependencies']):
+                        self.date_, item['layer_config']['dependencies'],
+                        default_model_runs):
                     item['refresh_config'] = False
                     LOGGER.debug(
                         'The default model run for at least one '
@@ -356,11 +1052,15 @@ class BaseLayer:
                     )
                     continue
 
-            LOGGER.debug('Adding time keys in the store')
+            time_keys[time_extent_key] = time_extent_value
+            time_keys[default_model_key] = default_model_run
+            time_keys[model_run_extent_key] = model_run_extent_value
+
+            default_model_runs[default_model_key] = default_model_run
 
-            self.store.set_key(time_extent_key, time_extent_value)
-            self.store.set_key(default_model_key, default_model_run)
-            self.store.set_key(model_run_extent_key, model_run_extent_value)
+        if time_keys:
+            LOGGER.debug('Adding time keys in the store')
+            self.store.set_keys(time_keys)
 
         return True
 
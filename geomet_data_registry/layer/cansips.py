@@ -19,10 +19,8 @@
 
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
-import json
 import logging
 import os
-from parse import parse
 import re
 
 from geomet_data_registry.layer.base import BaseLayer
@@ -62,11 +60,11 @@ class CansipsLayer(BaseLayer):
         self.model = 'cansips'
 
         LOGGER.debug('Loading model information from store')
-        self.file_dict = json.loads(self.store.get_key(self.model))
+        self.file_dict = self.get_model_config()
 
         filename_pattern = self.file_dict[self.model]['filename_pattern']
 
-        tmp = parse(filename_pattern, os.path.basename(filepath))
+        tmp = self.parse_filename(filename_pattern, os.path.basename(filepath))
 
         file_pattern_info = {
             'resolution': tmp.named['resolution'],
@@ -19,10 +19,8 @@
 ###############################################################################
 
 from datetime import datetime, timedelta
-import json
 import logging
 import os
-from parse import parse
 import re
 
 from geomet_data_registry.layer.base import BaseLayer
@@ -64,7 +62,7 @@ class GepsLayer(BaseLayer):
         self.model = 'geps'
 
         LOGGER.debug('Loading model information from store')
-        self.file_dict = json.loads(self.store.get_key(self.model))
+        self.file_dict = self.get_model_config()
 
         if self.filepath.endswith('allmbrs.grib2'):
             filename_pattern = self.file_dict[self.model]['member'][
@@ -75,7 +73,7 @@ class GepsLayer(BaseLayer):
                 'filename_pattern']
             self.type = 'product'
 
-        tmp = parse(filename_pattern, os.path.basename(filepath))
+        tmp = self.parse_filename(filename_pattern, os.path.basename(filepath))
 
         file_pattern_info = {
             'wx_variable': tmp.named['wx_variable'],
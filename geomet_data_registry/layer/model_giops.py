@@ -19,14 +19,12 @@
 
 from copy import deepcopy
 from datetime import datetime, timedelta
-import json
 import logging
 import os
-from parse import parse
 import re
 
 from geomet_data_registry.layer.base import BaseLayer
-from geomet_data_registry.util import DATE_FORMAT, parse_nonwhitespace
+from geomet_data_registry.util import DATE_FORMAT
 
 LOGGER = logging.getLogger(__name__)
 
@@ -48,6 +46,7 @@ class GiopsLayer(BaseLayer):
         self.bands = None
 
         super().__init__(provider_def)
+        self.layer_dependencies = True
 
     def identify(self, filepath, url=None):
         """
@@ -64,7 +63,7 @@ class GiopsLayer(BaseLayer):
         self.model = 'model_giops'
 
         LOGGER.debug('Loading model information from store')
-        self.file_dict = json.loads(self.store.get_key(self.model))
+        self.file_dict = self.get_model_config()
         filename_pattern = self.file_dict[self.model]['filename_pattern']
 
         if self.filepath.split('/')[-4] == '2d':
@@ -72,11 +71,7 @@ class GiopsLayer(BaseLayer):
         elif self.filepath.split('/')[-4] == '3d':
             self.dimension = '3D'
 
-        tmp = parse(
-            filename_pattern,
-            os.path.basename(filepath),
-            dict(NonWhitespaceChars=parse_nonwhitespace)
-        )
+        tmp = self.parse_filename(filename_pattern, os.path.basename(filepath))
 
         file_pattern_info = {
             'wx_variable': tmp.named['wx_variable'],
@@ -169,7 +164,8 @@ class GiopsLayer(BaseLayer):
                         dependencies_found = self.check_layer_dependencies(
                             layer_config['dependencies'],
                             str_mr,
-                            str_fh)
+                            str_fh,
+                            feature_dict['model'])
                         if dependencies_found:
                             bands_order = (
                                 self.file_dict[self.model][self.dimension][
@@ -245,7 +241,8 @@ class GiopsLayer(BaseLayer):
                     dependencies_found = self.check_layer_dependencies(
                         layer_config['dependencies'],
                         str_mr,
-                        str_fh)
+                        str_fh,
+                        feature_dict['model'])
                     if dependencies_found:
                         bands_order = (
                             self.file_dict[self.model][self.dimension][
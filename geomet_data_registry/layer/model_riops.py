@@ -19,10 +19,8 @@
 
 from copy import deepcopy
 from datetime import datetime, timedelta
-import json
 import logging
 import os
-from parse import parse
 import re
 
 from geomet_data_registry.layer.base import BaseLayer
@@ -48,6 +46,7 @@ class RiopsLayer(BaseLayer):
         self.bands = None
 
         super().__init__(provider_def)
+        self.layer_dependencies = True
 
     def identify(self, filepath, url=None):
         """
@@ -64,7 +63,7 @@ class RiopsLayer(BaseLayer):
         self.model = 'model_riops'
 
         LOGGER.debug('Loading model information from store')
-        self.file_dict = json.loads(self.store.get_key(self.model))
+        self.file_dict = self.get_model_config()
         filename_pattern = self.file_dict[self.model]['filename_pattern']
 
         if self.filepath.split('/')[-4] == '2d':
@@ -72,7 +71,7 @@ class RiopsLayer(BaseLayer):
         elif self.filepath.split('/')[-4] == '3d':
             self.dimension = '3D'
 
-        tmp = parse(filename_pattern, os.path.basename(filepath))
+        tmp = self.parse_filename(filename_pattern, os.path.basename(filepath))
 
         file_pattern_info = {
             'wx_variable': tmp.named['wx_variable'],
@@ -169,7 +168,8 @@ class RiopsLayer(BaseLayer):
                             for layer in layer_config['dependencies']
                         ]
                         dependencies_found = self.check_layer_dependencies(
-                            layer_config['dependencies'], str_mr, str_fh
+                            layer_config['dependencies'], str_mr, str_fh,
+                            feature_dict['model']
                         )
                         if dependencies_found:
                             bands_order = self.file_dict[self.model][
@@ -252,7 +252,8 @@ class RiopsLayer(BaseLayer):
 
                 if 'dependencies' in layer_config:
                     dependencies_found = self.check_layer_dependencies(
-                        layer_config['dependencies'], str_mr, str_fh
+                        layer_config['dependencies'], str_mr, str_fh,
+                        feature_dict['model']
                     )
                     if dependencies_found:
                         bands_order = self.file_dict[self.model][
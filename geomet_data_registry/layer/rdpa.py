@@ -18,12 +18,10 @@
 ###############################################################################
 
 from datetime import datetime, timedelta
-import json
 import logging
 import os
 import re
 
-from parse import parse
 from geomet_data_registry.layer.base import BaseLayer
 from geomet_data_registry.util import DATE_FORMAT
 
@@ -61,7 +59,7 @@ class RdpaLayer(BaseLayer):
         self.model = 'rdpa'
 
         LOGGER.debug('Loading model information from store')
-        self.file_dict = json.loads(self.store.get_key(self.model))
+        self.file_dict = self.get_model_config()
 
         if '15km' in self.filepath:
             filename_pattern = self.file_dict[self.model]['filename_pattern'][
@@ -72,7 +70,7 @@ class RdpaLayer(BaseLayer):
                 '10km']
             archive = False
 
-        tmp = parse(filename_pattern, os.path.basename(filepath))
+        tmp = self.parse_filename(filename_pattern, os.path.basename(filepath))
 
         file_pattern_info = {
             'wx_variable': tmp.named['wx_variable'],
@@ -17,15 +17,14 @@
 #
 ###############################################################################
 
+from copy import deepcopy
 from datetime import datetime, timedelta
-import json
 import logging
 import os
 import re
 
-from parse import parse
 from geomet_data_registry.layer.base import BaseLayer
-from geomet_data_registry.util import DATE_FORMAT, parse_nonwhitespace
+from geomet_data_registry.util import DATE_FORMAT
 
 LOGGER = logging.getLogger(__name__)
 
@@ -49,6 +48,7 @@ class RdwpsLayer(BaseLayer):
         self.spatial_resolution = None
 
         super().__init__(provider_def)
+        self.layer_dependencies = True
 
     def identify(self, filepath, url=None):
         """
@@ -65,15 +65,11 @@ class RdwpsLayer(BaseLayer):
         self.model = 'rdwps'
 
         LOGGER.debug('Loading model information from store')
-        self.file_dict = json.loads(self.store.get_key(self.model))
+        self.file_dict = self.get_model_config()
 
         filename_pattern = self.file_dict[self.model]['filename_pattern']
 
-        tmp = parse(
-            filename_pattern,
-            os.path.basename(filepath),
-            dict(NonWhitespaceChars=parse_nonwhitespace)
-        )
+        tmp = self.parse_filename(filename_pattern, os.path.basename(filepath))
 
         file_pattern_info = {
             'region': tmp.named['region'],
@@ -130,7 +126,8 @@ class RdwpsLayer(BaseLayer):
         )
         expected_count = self.file_dict[self.model]['variable'][self.wx_variable]['model_run'][self.model_run]['files_expected']  # noqa
 
-        self.geomet_layers = self.file_dict[self.model]['variable'][self.wx_variable]['geomet_layers']  # noqa
+        # copied, as layer dependencies are formatted for the region below
+        self.geomet_layers = deepcopy(self.file_dict[self.model]['variable'][self.wx_variable]['geomet_layers'])  # noqa
         for layer, layer_config in self.geomet_layers.items():
             layer_name = layer.format(self.region, self.spatial_resolution)
             identifier = '{}-{}-{}'.format(layer_name, str_mr, str_fh)
@@ -18,12 +18,10 @@
 ###############################################################################
 
 from datetime import datetime, timedelta
-import json
 import logging
 import os
 import re
 
-from parse import parse
 from geomet_data_registry.layer.base import BaseLayer
 from geomet_data_registry.util import DATE_FORMAT
 
@@ -45,6 +43,7 @@ class WcpsLayer(BaseLayer):
         provider_def = {'name': 'wcps'}
 
         super().__init__(provider_def)
+        self.layer_dependencies = True
 
     def identify(self, filepath, url=None):
         """
@@ -61,11 +60,11 @@ class WcpsLayer(BaseLayer):
         self.model = 'wcps'
 
         LOGGER.debug('Loading model information from store')
-        self.file_dict = json.loads(self.store.get_key(self.model))
+        self.file_dict = self.get_model_config()
 
         filename_pattern = self.file_dict[self.model]['filename_pattern']
 
-        tmp = parse(filename_pattern, os.path.basename(filepath))
+        tmp = self.parse_filename(filename_pattern, os.path.basename(filepath))
 
         file_pattern_info = {
             'wx_variable': tmp.named['wx_variable'],
@@ -0,0 +1,358 @@
+###############################################################################
+#
+# Copyright (C) 2021 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+import atexit
+from bisect import bisect_left
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import logging
+import os
+from threading import Lock, Thread
+import time
+
+LOGGER = logging.getLogger(__name__)
+
+METRIC_NAME = 'geomet_data_registry_stage_duration_seconds'
+
+# histogram bucket upper bounds (seconds)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+           1, 2.5, 5, 10)
+
+# per-model counters (geomet_data_registry_<name>_total) and their help
+COUNTERS = {
+    'registrations_suppressed': 'Registrations of unchanged documents '
+                                'skipped'
+}
+
+
+class StageMetrics:
+    """
+    Per-stage, per-model latency histograms of file processing, and
+    per-model counters (see `COUNTERS`).
+
+    Metrics are disabled by default, in which case spans are no-ops.  When
+    enabled, histograms are exposed in the Prometheus text format through
+    an HTTP endpoint and/or written to a node_exporter textfile collector
+    directory (one file per process).
+    """
+
+    def __init__(self):
+        """
+        Initialize object
+
+        :returns: `geomet_data_registry.metrics.StageMetrics`
+        """
+
+        self.enabled = False
+        self.histograms = {}
+        self.counters = {}
+        self.lock = Lock()
+        self.server = None
+        self.textfile_dir = None
+        self.textfile_interval = 15
+        self.textfile_written = 0
+
+    def setup(self, port=None, textfile_dir=None, textfile_interval=15):
+        """
+        Enable metrics and their exposition
+
+        :param port: `int` of HTTP endpoint port (`/metrics`), if any
+        :param textfile_dir: `str` of textfile collector directory, if any
+        :param textfile_interval: `int` of minimum number of seconds
+                                  between textfile writes
+
+        :returns: `None`
+        """
+
+        if port is None and textfile_dir is None:
+            return
+
+        self.enabled = True
+
+        if port is not None and self.server is None:
+            try:
+                self.server = start_http_server(self, int(port))
+                LOGGER.debug('Serving metrics on port {}'.format(port))
+            except OSError as err:
+                # e.g. another process of the host already serves metrics
+                LOGGER.warning('Cannot serve metrics on port {}: {}'.format(
+                    port, err))
+
+        if textfile_dir is not None:
+            if self.textfile_dir is None:
+                atexit.register(self.write_textfile)
+            self.textfile_dir = textfile_dir
+            self.textfile_interval = textfile_interval
+
+    def observe(self, stage, model, seconds):
+        """
+        Record the duration of a stage
+
+        :param stage: `str` of stage name
+        :param model: `str` of model name
+        :param seconds: `float` of stage duration
+
+        :returns: `None`
+        """
+
+        key = (stage, model or 'unknown')
+
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {
+                    'buckets': [0] * (len(BUCKETS) + 1),
+                    'sum': 0.0,
+                    'count': 0
+                }
+
+            histogram['buckets'][bisect_left(BUCKETS, seconds)] += 1
+            histogram['sum'] += seconds
+            histogram['count'] += 1
+
+        self.update_textfile()
+
+    def increment(self, name, model, count=1):
+        """
+        Increment a counter (when metrics are enabled)
+
+        :param name: `str` of counter name (see `COUNTERS`)
+        :param model: `str` of model name
+        :param count: `int` of increment
+
+        :returns: `None`
+        """
+
+        if not self.enabled:
+            return
+
+        key = (name, model or 'unknown')
+
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + count
+
+        self.update_textfile()
+
+    def update_textfile(self):
+        """
+        Write metrics to the textfile collector directory, at most every
+        `textfile_interval` seconds
+
+        :returns: `None`
+        """
+
+        if self.textfile_dir is not None:
+            now = time.monotonic()
+            if now - self.textfile_written >= self.textfile_interval:
+                self.textfile_written = now
+                self.write_textfile()
+
+    def render(self, labels=None):
+        """
+        Render histograms in the Prometheus text exposition format
+
+        :param labels: `dict` of additional labels of all series
+
+        :returns: `str` of metrics
+        """
+
+        extra = ''.join(',{}="{}"'.format(key, value)
+                        for key, value in (labels or {}).items())
+
+        lines = [
+            '# HELP {} Duration of file processing stages'.format(
+                METRIC_NAME),
+            '# TYPE {} histogram'.format(METRIC_NAME)
+        ]
+
+        with self.lock:
+            for (stage, model), histogram in sorted(self.histograms.items()):
+                series = 'stage="{}",model="{}"{}'.format(stage, model, extra)
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ('+Inf',),
+                                        histogram['buckets']):
+                    cumulative += count
+                    lines.append('{}_bucket{{{},le="{}"}} {}'.format(
+                        METRIC_NAME, series, bound, cumulative))
+                lines.append('{}_sum{{{}}} {}'.format(
+                    METRIC_NAME, series, histogram['sum']))
+                lines.append('{}_count{{{}}} {}'.format(
+                    METRIC_NAME, series, histogram['count']))
+
+            for name in sorted({name for name, model in self.counters}):
+                metric = 'geomet_data_registry_{}_total'.format(name)
+                lines.append('# HELP {} {}'.format(
+                    metric, COUNTERS.get(name, name)))
+                lines.append('# TYPE {} counter'.format(metric))
+                for (name_, model), value in sorted(self.counters.items()):
+                    if name_ == name:
+                        lines.append('{}{{model="{}"{}}} {}'.format(
+                            metric, model, extra, value))
+
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self):
+        """
+        Write metrics to the textfile collector directory (atomically, as
+        `geomet-data-registry-<pid>.prom`)
+
+        :returns: `None`
+        """
+
+        if self.textfile_dir is None:
+            return
+
+        pid = os.getpid()
+        filename = os.path.join(self.textfile_dir,
+                                'geomet-data-registry-{}.prom'.format(pid))
+        tmp_filename = '{}.{}'.format(filename, 'tmp')
+
+        try:
+            with open(tmp_filename, 'w') as fh:
+                fh.write(self.render({'pid': pid}))
+            os.replace(tmp_filename, filename)
+        except OSError as err:
+            LOGGER.warning('Cannot write metrics to {}: {}'.format(
+                filename, err))
+
+    def span(self, stage, model=None):
+        """
+        Time a stage
+
+        :param stage: `str` of stage name
+        :param model: `str` of model name (may be set on the span
+                      afterwards)
+
+        :returns: `Span` context manager
+        """
+
+        if not self.enabled:
+            return NULL_SPAN
+
+        return Span(self, stage, model)
+
+    def reset(self):
+        """
+        Drop recorded histograms
+
+        :returns: `None`
+        """
+
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def __repr__(self):
+        return '<StageMetrics> {} histograms'.format(len(self.histograms))
+
+
+class Span:
+    """Context manager recording the duration of a stage"""
+
+    __slots__ = ('metrics', 'stage', 'model', 'start')
+
+    def __init__(self, metrics, stage, model=None):
+        self.metrics = metrics
+        self.stage = stage
+        self.model = model
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.metrics.observe(self.stage, self.model,
+                             time.perf_counter() - self.start)
+        return False
+
+
+class NullSpan:
+    """No-op span used when metrics are disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+METRICS = StageMetrics()
+
+
+def timed(stage):
+    """
+    Decorator timing a layer method as a stage of the layer model
+
+    :param stage: `str` of stage name
+
+    :returns: decorator
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if not METRICS.enabled:
+                return func(self, *args, **kwargs)
+            with Span(METRICS, stage, self.model):
+                return func(self, *args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def start_http_server(metrics, port):
+    """
+    Helper function to serve metrics over HTTP in a background thread
+
+    :param metrics: `StageMetrics` object
+    :param port: `int` of port
+
+    :returns: `http.server.ThreadingHTTPServer`
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+
+            body = metrics.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type',
+                             'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            LOGGER.debug(format % args)
+
+    server = ThreadingHTTPServer(('', port), Handler)
+    server.daemon_threads = True
+    Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
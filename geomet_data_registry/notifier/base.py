@@ -37,6 +37,15 @@ class BaseNotifier:
         self.type = provider_def['type']
         self.url = provider_def['url']
 
+    def ping(self):
+        """
+        Health check the notifier connection
+
+        :returns: `bool` of whether the notifier is reachable
+        """
+
+        raise NotImplementedError()
+
     def notify(self, items=[]):
         """
         Sends a notification
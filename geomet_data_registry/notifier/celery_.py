@@ -69,6 +69,15 @@ class CeleryTaskNotifier(BaseNotifier):
 
         return True
 
+    def ping(self):
+        """
+        Health check the notifier connection
+
+        :returns: `bool` of whether the Celery broker is reachable
+        """
+
+        return self.check_broker_connection()
+
     def notify(self, items=[]):
         """
         Sends a refresh_mapfile notifier task
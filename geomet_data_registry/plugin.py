@@ -18,7 +18,12 @@
 ###############################################################################
 
 import importlib
+import json
 import logging
+from threading import Lock
+import time
+
+from geomet_data_registry.env import PROVIDER_HEALTH_CHECK_INTERVAL
 
 LOGGER = logging.getLogger(__name__)
 
@@ -31,6 +36,12 @@ PLUGINS = {
     'tileindex': {
         'Elasticsearch': {
             'path': 'geomet_data_registry.tileindex.elasticsearch_.ElasticsearchTileIndex'  # noqa
+        },
+        'ElasticsearchAsync': {
+            'path': 'geomet_data_registry.tileindex.elasticsearch_async.AsyncElasticsearchTileIndex'  # noqa
+        },
+        'SQLite': {
+            'path': 'geomet_data_registry.tileindex.sqlite_.SQLiteTileIndex'
         }
     },
     'notifier': {
@@ -119,16 +130,21 @@ PLUGINS = {
 }
 
 
-def load_plugin(plugin_type, plugin_def):
+def load_plugin(plugin_type, plugin_def, shared=False):
     """
     loads plugin by type
 
     :param plugin_type: type of plugin (store, tileindex, etc.)
     :param plugin_def: plugin definition
+    :param shared: `bool` of whether to return the process-wide shared
+                   instance of the plugin (see `PluginRegistry`)
 
     :returns: plugin object
     """
 
+    if shared:
+        return PLUGIN_REGISTRY.get(plugin_type, plugin_def)
+
     type_ = plugin_def['type']
 
     if plugin_type not in PLUGINS.keys():
@@ -159,6 +175,156 @@ def load_plugin(plugin_type, plugin_def):
     return plugin
 
 
+class PluginRegistry:
+    """
+    Process-wide registry of shared provider plugins (store, tileindex,
+    etc.).  Provider connections are created once per process and shared by
+    all layer instances.  Shared instances are health checked (at most every
+    `health_check_interval` seconds) when acquired, and lazily re-created
+    when the check fails.  Discarded instances are closed (e.g. to index
+    buffered documents and stop their threads).
+    """
+
+    def __init__(self, health_check_interval=30):
+        """
+        Initialize object
+
+        :param health_check_interval: minimum number of seconds between
+                                      health checks of a shared plugin
+
+        :returns: `geomet_data_registry.plugin.PluginRegistry`
+        """
+
+        self.health_check_interval = health_check_interval
+        self.plugins = {}
+        self.lock = Lock()
+
+    def get(self, plugin_type, plugin_def):
+        """
+        Get shared plugin instance, creating or re-creating it as required
+
+        :param plugin_type: type of plugin (store, tileindex, etc.)
+        :param plugin_def: plugin definition
+
+        :returns: plugin object
+        """
+
+        key = self.registry_key(plugin_type, plugin_def)
+        evicted = None
+
+        with self.lock:
+            entry = self.plugins.get(key)
+
+            if entry is not None:
+                if time.monotonic() - entry['checked'] < \
+                        self.health_check_interval:
+                    return entry['plugin']
+
+                if self.is_healthy(entry['plugin']):
+                    entry['checked'] = time.monotonic()
+                    return entry['plugin']
+
+                LOGGER.warning('Shared {} plugin failed health check: '
+                               'reconnecting'.format(plugin_type))
+                evicted = self.plugins.pop(key)['plugin']
+
+            LOGGER.debug('Creating shared {} plugin'.format(plugin_type))
+            plugin = load_plugin(plugin_type, plugin_def)
+            self.plugins[key] = {
+                'plugin': plugin,
+                'checked': time.monotonic()
+            }
+
+        if evicted is not None:
+            self.close_plugin(evicted)
+
+        return plugin
+
+    def invalidate(self, plugin_type=None, plugin_def=None):
+        """
+        Discard shared plugin instances, which are re-created on next use
+
+        :param plugin_type: type of plugin (store, tileindex, etc.),
+                            or `None` for all plugin types
+        :param plugin_def: plugin definition, or `None` for all plugins
+                           of `plugin_type`
+
+        :returns: `None`
+        """
+
+        with self.lock:
+            if plugin_type is None:
+                keys = list(self.plugins.keys())
+            elif plugin_def is not None:
+                keys = [self.registry_key(plugin_type, plugin_def)]
+            else:
+                keys = [key for key in self.plugins.keys()
+                        if key[0] == plugin_type]
+
+            evicted = [self.plugins.pop(key)['plugin'] for key in keys
+                       if key in self.plugins]
+
+        for plugin in evicted:
+            self.close_plugin(plugin)
+
+    @staticmethod
+    def close_plugin(plugin):
+        """
+        Close a discarded plugin instance, if it supports closing
+
+        :param plugin: plugin object
+
+        :returns: `None`
+        """
+
+        close = getattr(plugin, 'close', None)
+        if close is None:
+            return
+
+        try:
+            close()
+        except Exception as err:
+            LOGGER.warning('Cannot close plugin {}: {}'.format(plugin, err))
+
+    @staticmethod
+    def is_healthy(plugin):
+        """
+        Health check a plugin instance
+
+        :param plugin: plugin object
+
+        :returns: `bool` of health check result
+        """
+
+        try:
+            return plugin.ping()
+        except (AttributeError, NotImplementedError):
+            return True
+        except Exception as err:
+            LOGGER.warning('Health check error: {}'.format(err))
+            return False
+
+    @staticmethod
+    def registry_key(plugin_type, plugin_def):
+        """
+        Helper function to derive the registry key of a plugin definition
+
+        :param plugin_type: type of plugin (store, tileindex, etc.)
+        :param plugin_def: plugin definition
+
+        :returns: `tuple` of plugin type and serialized plugin definition
+        """
+
+        return plugin_type, json.dumps(plugin_def, sort_keys=True,
+                                       default=str)
+
+    def __repr__(self):
+        return '<PluginRegistry> {} plugins'.format(len(self.plugins))
+
+
+PLUGIN_REGISTRY = PluginRegistry(PROVIDER_HEALTH_CHECK_INTERVAL)
+
+
 class InvalidPluginError(Exception):
     """Invalid plugin"""
     pass
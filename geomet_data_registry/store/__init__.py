@@ -18,15 +18,18 @@
 ###############################################################################
 
 import codecs
+import hashlib
 import json
 import logging
 
 import click
 from yaml import load, Loader
 
-from geomet_data_registry.env import STORE_TYPE, STORE_URL
+from geomet_data_registry.env import (STORE_CONFIG_PARTITIONED, STORE_TYPE,
+                                      STORE_URL)
 from geomet_data_registry.plugin import load_plugin
-from geomet_data_registry.store.base import StoreError
+from geomet_data_registry.store.base import (CONFIG_UPDATES_CHANNEL,
+                                             partition_config, StoreError)
 from geomet_data_registry.util import json_pretty_print, remove_prefix
 
 LOGGER = logging.getLogger(__name__)
@@ -90,7 +93,11 @@ def teardown(ctx, group=None):
               help='Path to config yaml file')
 @click.option('--raw', '-r', is_flag=True,
               help='set key without adding prefix')
-def set_key(ctx, key, config, raw):
+@click.option('--partitioned/--no-partitioned',
+              default=STORE_CONFIG_PARTITIONED,
+              help='also set the configuration as a hash of its header and '
+                   'variables (key <key>_config)')
+def set_key(ctx, key, config, raw, partitioned):
     """populate store"""
 
     if all([key is None, config is None]):
@@ -113,6 +120,21 @@ def set_key(ctx, key, config, raw):
                     .format(key, st.url)
                 )
                 st.set_key(key, string_)
+
+            if partitioned:
+                click.echo('Setting {}_config partitioned key in store '
+                           '({}).'.format(key, st.url))
+                st.set_fields('{}_config'.format(key),
+                              partition_config(yml_dict), raw=raw)
+
+            # bump the key version and announce the update so that running
+            # workers refresh their cached copy of the configuration
+            version = hashlib.sha256(string_.encode('utf-8')).hexdigest()
+            st.set_key('{}_version'.format(key), version, raw=raw)
+            st.publish(CONFIG_UPDATES_CHANNEL, key)
+    except NotImplementedError:
+        raise click.ClickException(
+            'Store does not support partitioned configurations')
     except StoreError as err:
         raise click.ClickException(err)
     click.echo('Done')
@@ -17,10 +17,18 @@
 #
 ###############################################################################
 
+import json
 import logging
 
 LOGGER = logging.getLogger(__name__)
 
+# channel on which updated model configuration keys are announced
+CONFIG_UPDATES_CHANNEL = 'config-updates'
+
+# hash field of the header (model configuration without its variables) of
+# partitioned model configurations
+CONFIG_HEADER_FIELD = '_header'
+
 
 class BaseStore:
     """generic key-value store ABC"""
@@ -55,6 +63,15 @@ class BaseStore:
 
         raise NotImplementedError()
 
+    def ping(self):
+        """
+        Health check the store connection
+
+        :returns: `bool` of whether the store is reachable
+        """
+
+        raise NotImplementedError()
+
     def get_key(self, key):
         """
         Get key from store
@@ -78,6 +95,121 @@ class BaseStore:
 
         raise NotImplementedError()
 
+    def get_keys(self, keys, raw=False):
+        """
+        Get many keys from store
+
+        Stores supporting multi-key requests override this method; keys
+        are otherwise fetched one by one.
+
+        :param keys: `list` of keys to fetch
+        :param raw: `bool` indication whether to add prefix when fetching keys
+
+        :returns: `list` of key values (`None` for missing keys)
+        """
+
+        return [self.get_key(key, raw=raw) for key in keys]
+
+    def set_keys(self, mapping, ttl=None, raw=False):
+        """
+        Set many key values
+
+        Stores supporting pipelined requests override this method; keys
+        are otherwise set one by one (without expiry).
+
+        :param mapping: `dict` of key to value
+        :param ttl: `int` of number of seconds before keys expire, if any
+        :param raw: `bool` indication whether to add prefix when setting keys
+
+        :returns: `bool` of set success
+        """
+
+        return all([self.set_key(key, value, raw=raw)
+                    for key, value in mapping.items()])
+
+    def increment_count(self, key, expected_count, run_keys, raw=False):
+        """
+        Increment the file count of a model run, and reset the file counts
+        of model runs
+
+        When the count reaches the expected count, the counts of all model
+        runs are reset.  When the count of a new model run is initialized,
+        the counts of other (incomplete) model runs are reset.
+
+        Stores supporting server-side scripts override this method to
+        update counts atomically; counts are otherwise read and set one by
+        one.
+
+        :param key: count key of the model run
+        :param expected_count: `int` of number of files of a complete model
+                               run
+        :param run_keys: `list` of count keys of all model runs
+        :param raw: `bool` indication whether to add prefix to keys
+
+        :returns: `tuple` of `bool` of whether the model run just
+                  completed, and `dict` of count keys to counts of reset
+                  incomplete model runs
+        """
+
+        count = int(self.get_key(key, raw=raw) or 0) + 1
+        self.set_key(key, count, raw=raw)
+
+        incomplete = {}
+
+        if count >= int(expected_count):
+            for run_key in run_keys:
+                self.set_key(run_key, 0, raw=raw)
+            return True, incomplete
+
+        if count == 1:
+            for run_key in run_keys:
+                if run_key == key:
+                    continue
+                run_count = self.get_key(run_key, raw=raw)
+                if run_count not in ['0', None]:
+                    incomplete[run_key] = run_count
+                    self.set_key(run_key, 0, raw=raw)
+
+        return False, incomplete
+
+    def get_fields(self, key, fields, raw=False):
+        """
+        Get fields of a hash from store
+
+        :param key: key of hash
+        :param fields: `list` of fields to fetch
+        :param raw: `bool` indication whether to add prefix when fetching key
+
+        :returns: `list` of field values (`None` for missing fields)
+        """
+
+        raise NotImplementedError()
+
+    def set_fields(self, key, mapping, raw=False):
+        """
+        Set (replace) the fields of a hash
+
+        :param key: key of hash
+        :param mapping: `dict` of field to value
+        :param raw: `bool` indication whether to add prefix when setting key
+
+        :returns: `bool` of set success
+        """
+
+        raise NotImplementedError()
+
+    def delete_key(self, key, raw=False):
+        """
+        Delete key from store
+
+        :param key: key to delete
+        :param raw: `bool` indication whether to add prefix when deleting key
+
+        :returns: `bool` of whether the key existed
+        """
+
+        raise NotImplementedError()
+
     def list_keys(self, pattern=None):
         """
         List all keys in store
@@ -89,6 +221,30 @@ class BaseStore:
 
         raise NotImplementedError()
 
+    def publish(self, channel, message):
+        """
+        Publish a message to a store channel
+
+        :param channel: channel name
+        :param message: `str` of message
+
+        :returns: `int` of number of subscribers which received the message
+        """
+
+        raise NotImplementedError()
+
+    def subscribe(self, channel, callback):
+        """
+        Subscribe to a store channel in a background thread
+
+        :param channel: channel name
+        :param callback: function called with the `str` of each message
+
+        :returns: `threading.Thread` of subscription listener
+        """
+
+        raise NotImplementedError()
+
     def __repr__(self):
         return '<BaseStore> {}'.format(self.type)
 
@@ -96,3 +252,41 @@ class BaseStore:
 class StoreError(Exception):
     """setup error"""
     pass
+
+
+def partition_config(config):
+    """
+    Helper function to partition a model configuration into a header (the
+    model configuration, with the path of its variables instead of their
+    definitions, e.g. `model_giops/3D/variable`), one entry per variable
+    (keyed by its path, e.g. `model_giops/3D/variable/VOMECRTY`) and the
+    names of the variables of each path
+
+    :param config: `dict` of model configuration
+
+    :returns: `dict` of hash field to JSON string
+    """
+
+    fields = {}
+
+    def partition(value, path):
+        if not isinstance(value, dict):
+            return value
+
+        header = {}
+        for key, value_ in value.items():
+            if key == 'variable' and isinstance(value_, dict):
+                variables_path = '/'.join(path + [key])
+                header[key] = variables_path
+                fields[variables_path] = json.dumps(list(value_))
+                for name, variable in value_.items():
+                    field = '{}/{}'.format(variables_path, name)
+                    fields[field] = json.dumps(variable)
+            else:
+                header[key] = partition(value_, path + [key])
+
+        return header
+
+    fields[CONFIG_HEADER_FIELD] = json.dumps(partition(config, []))
+
+    return fields
@@ -26,6 +26,37 @@ from geomet_data_registry.store.base import BaseStore, StoreError
 
 LOGGER = logging.getLogger(__name__)
 
+# increments the count of a model run (KEYS[1]), and resets the counts of
+# model runs (KEYS[2..]) on completion (count >= ARGV[1]), or the counts of
+# incomplete model runs when the count is initialized; returns whether the
+# model run completed, and the keys and counts of reset incomplete runs
+INCREMENT_COUNT_SCRIPT = """
+local count = redis.call('INCR', KEYS[1])
+local incomplete = {}
+
+if count >= tonumber(ARGV[1]) then
+    for i = 2, #KEYS do
+        redis.call('SET', KEYS[i], 0)
+    end
+    return {1, incomplete}
+end
+
+if count == 1 then
+    for i = 2, #KEYS do
+        if KEYS[i] ~= KEYS[1] then
+            local run_count = redis.call('GET', KEYS[i])
+            if run_count and run_count ~= '0' then
+                table.insert(incomplete, KEYS[i])
+                table.insert(incomplete, run_count)
+                redis.call('SET', KEYS[i], 0)
+            end
+        end
+    end
+end
+
+return {0, incomplete}
+"""
+
 
 class RedisStore(BaseStore):
     """Redis key-value store implementation"""
@@ -42,13 +73,21 @@ class RedisStore(BaseStore):
         super().__init__(provider_def)
 
         try:
+            # connections are pooled per client, and idle pooled connections
+            # are health checked before reuse
             self.redis = redis.Redis.from_url(self.url,
-                                              decode_responses=True)
+                                              decode_responses=True,
+                                              health_check_interval=30,
+                                              retry_on_timeout=True)
         except redis.exceptions.ConnectionError as err:
             msg = 'Cannot connect to Redis {}: {}'.format(self.url, err)
             LOGGER.exception(msg)
             raise StoreError(msg)
 
+        # loaded on first use (EVALSHA, falling back to EVAL)
+        self.increment_count_script = self.redis.register_script(
+            INCREMENT_COUNT_SCRIPT)
+
     def setup(self):
         """
         Create the store
@@ -76,6 +115,19 @@ class RedisStore(BaseStore):
 
         return True
 
+    def ping(self):
+        """
+        Health check the store connection
+
+        :returns: `bool` of whether the store is reachable
+        """
+
+        try:
+            return self.redis.ping()
+        except redis.exceptions.RedisError as err:
+            LOGGER.warning('Cannot ping Redis {}: {}'.format(self.url, err))
+            return False
+
     def get_key(self, key, raw=False):
         """
         Get key from store
@@ -107,6 +159,126 @@ class RedisStore(BaseStore):
 
         return self.redis.set('geomet-data-registry_{}'.format(key), value)
 
+    def get_keys(self, keys, raw=False):
+        """
+        Get many keys from store, with a single request
+
+        :param keys: `list` of keys to fetch
+        :param raw: `bool` indication whether to add prefix when fetching keys
+
+        :returns: `list` of key values (`None` for missing keys)
+        """
+
+        if not keys:
+            return []
+
+        if not raw:
+            keys = ['geomet-data-registry_{}'.format(key) for key in keys]
+
+        return self.redis.mget(keys)
+
+    def set_keys(self, mapping, ttl=None, raw=False):
+        """
+        Set many key values, with a single pipelined request
+
+        :param mapping: `dict` of key to value
+        :param ttl: `int` of number of seconds before keys expire, if any
+        :param raw: `bool` indication whether to add prefix when setting keys
+
+        :returns: `bool` of set success
+        """
+
+        pipeline = self.redis.pipeline(transaction=False)
+        for key, value in mapping.items():
+            if not raw:
+                key = 'geomet-data-registry_{}'.format(key)
+            pipeline.set(key, value, ex=ttl)
+
+        return all(pipeline.execute())
+
+    def increment_count(self, key, expected_count, run_keys, raw=False):
+        """
+        Increment the file count of a model run, and reset the file counts
+        of model runs, atomically with a single server-side script
+
+        :param key: count key of the model run
+        :param expected_count: `int` of number of files of a complete model
+                               run
+        :param run_keys: `list` of count keys of all model runs
+        :param raw: `bool` indication whether to add prefix to keys
+
+        :returns: `tuple` of `bool` of whether the model run just
+                  completed, and `dict` of count keys to counts of reset
+                  incomplete model runs
+        """
+
+        keys = [key] + run_keys
+        if not raw:
+            keys = ['geomet-data-registry_{}'.format(key_) for key_ in keys]
+
+        completed, incomplete = self.increment_count_script(
+            keys=keys, args=[expected_count])
+
+        # incomplete model runs are returned as [key, count, key, count...]
+        run_keys = dict(zip(keys[1:], run_keys))
+
+        return bool(completed), {
+            run_keys[run_key]: run_count for run_key, run_count in
+            zip(incomplete[::2], incomplete[1::2])
+        }
+
+    def get_fields(self, key, fields, raw=False):
+        """
+        Get fields of a hash from store, with a single request
+
+        :param key: key of hash
+        :param fields: `list` of fields to fetch
+        :param raw: `bool` indication whether to add prefix when fetching key
+
+        :returns: `list` of field values (`None` for missing fields)
+        """
+
+        if not raw:
+            key = 'geomet-data-registry_{}'.format(key)
+
+        return self.redis.hmget(key, fields)
+
+    def set_fields(self, key, mapping, raw=False):
+        """
+        Set (replace) the fields of a hash, atomically
+
+        :param key: key of hash
+        :param mapping: `dict` of field to value
+        :param raw: `bool` indication whether to add prefix when setting key
+
+        :returns: `bool` of set success
+        """
+
+        if not raw:
+            key = 'geomet-data-registry_{}'.format(key)
+
+        pipeline = self.redis.pipeline(transaction=True)
+        pipeline.delete(key)
+        pipeline.hset(key, mapping=mapping)
+        pipeline.execute()
+
+        return True
+
+    def delete_key(self, key, raw=False):
+        """
+        Delete key from store
+
+        :param key: key to delete
+        :param raw: `bool` indication whether to add prefix when deleting key
+
+        :returns: `bool` of whether the key existed
+        """
+
+        if raw:
+            return self.redis.delete(key) > 0
+
+        return self.redis.delete('geomet-data-registry_{}'.format(key)) > 0
+
     def list_keys(self, pattern=None):
         """
         List all store keys
@@ -121,5 +293,43 @@ class RedisStore(BaseStore):
 
         return self.redis.keys()
 
+    def publish(self, channel, message):
+        """
+        Publish a message to a store channel
+
+        :param channel: channel name
+        :param message: `str` of message
+
+        :returns: `int` of number of subscribers which received the message
+        """
+
+        return self.redis.publish(
+            'geomet-data-registry_{}'.format(channel), message)
+
+    def subscribe(self, channel, callback):
+        """
+        Subscribe to a store channel in a background thread
+
+        :param channel: channel name
+        :param callback: function called with the `str` of each message
+
+        :returns: `threading.Thread` of subscription listener
+        """
+
+        def handler(message):
+            callback(message['data'])
+
+        try:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(
+                **{'geomet-data-registry_{}'.format(channel): handler})
+        except redis.exceptions.RedisError as err:
+            msg = 'Cannot subscribe to Redis channel {}: {}'.format(
+                channel, err)
+            LOGGER.warning(msg)
+            raise StoreError(msg)
+
+        return pubsub.run_in_thread(sleep_time=1, daemon=True)
+
     def __repr__(self):
         return '<BaseStore> {}'.format(self.type)
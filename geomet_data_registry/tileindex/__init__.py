@@ -17,12 +17,16 @@
 #
 ###############################################################################
 
+import json
 import logging
+import signal
 
 import click
 
 from geomet_data_registry.env import (
-    TILEINDEX_TYPE, TILEINDEX_BASEURL, TILEINDEX_NAME)
+    STORE_PROVIDER_DEF, TILEINDEX_TYPE, TILEINDEX_BASEURL, TILEINDEX_NAME,
+    TILEINDEX_MAPPING, TILEINDEX_PROVIDER_DEF, TILEINDEX_ROLLOVER,
+    TILEINDEX_ROUTES)
 from geomet_data_registry.plugin import load_plugin
 from geomet_data_registry.tileindex.base import TileIndexError
 
@@ -45,7 +49,10 @@ def setup(ctx, group=None):
         'type': TILEINDEX_TYPE,
         'url': TILEINDEX_BASEURL,
         'name': TILEINDEX_NAME,
-        'group': group
+        'group': group,
+        'mapping': TILEINDEX_MAPPING,
+        'rollover': TILEINDEX_ROLLOVER,
+        'routes': TILEINDEX_ROUTES
     }
 
     ti = load_plugin('tileindex', provider_def)
@@ -68,7 +75,10 @@ def teardown(ctx, group=None):
         'type': TILEINDEX_TYPE,
         'url': TILEINDEX_BASEURL,
         'name': TILEINDEX_NAME,
-        'group': group
+        'group': group,
+        'mapping': TILEINDEX_MAPPING,
+        'rollover': TILEINDEX_ROLLOVER,
+        'routes': TILEINDEX_ROUTES
     }
 
     ti = load_plugin('tileindex', provider_def)
@@ -81,5 +91,169 @@ def teardown(ctx, group=None):
     click.echo('Done')
 
 
+@click.command()
+@click.pass_context
+@click.option('--model', '-m', 'models', multiple=True,
+              help='model (default: all models)')
+@click.option('--requests-per-second', '-r', type=click.FloatRange(min=0),
+              help='Maximum number of removed items per second')
+@click.option('--pause', '-p', type=click.FloatRange(min=0), default=1.0,
+              help='Number of seconds to pause between models')
+@click.option('--interval', '-i', type=click.FloatRange(min=1),
+              help='Purge every given number of seconds until stopped')
+def purge(ctx, models, requests_per_second=None, pause=1.0, interval=None):
+    """remove items past the model run retention"""
+
+    # imported here as layers depend on the tileindex package
+    from geomet_data_registry.tileindex.purge import RetentionPurger
+
+    provider_def = {
+        'type': TILEINDEX_TYPE,
+        'url': TILEINDEX_BASEURL,
+        'name': TILEINDEX_NAME,
+        'group': None,
+        'mapping': TILEINDEX_MAPPING,
+        'rollover': TILEINDEX_ROLLOVER,
+        'routes': TILEINDEX_ROUTES
+    }
+
+    ti = load_plugin('tileindex', provider_def)
+    st = load_plugin('store', STORE_PROVIDER_DEF)
+
+    purger = RetentionPurger(ti, st, requests_per_second, pause)
+
+    if not models and not purger.models():
+        raise click.ClickException('No model configuration found in store')
+
+    click.echo('Purging tileindex {}'.format(ti.fullpath))
+    for model, removed in purger.purge(list(models)).items():
+        click.echo('{}: {} items removed'.format(model, removed))
+
+    if interval is not None:
+        def shutdown(signum, frame):
+            LOGGER.info('Received signal {}: stopping purge'.format(signum))
+            purger.stopped.set()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+
+        click.echo('Purging every {} seconds'.format(interval))
+        purger.start(interval, list(models))
+        while not purger.stopped.wait(1):
+            pass
+        purger.stop()
+
+    click.echo('Done')
+
+
+def parse_range(ctx, param, value):
+    """
+    Helper function to parse an option of a value or a range of values
+    (`min/max`, either of which may be empty or `..`)
+
+    :param ctx: `click.Context`
+    :param param: `click.Parameter`
+    :param value: `str` of option value
+
+    :returns: `str` of value, `tuple` of minimum and maximum values, or
+              `None`
+    """
+
+    if value is None or '/' not in value:
+        return value
+
+    minimum, maximum = [bound if bound not in ['', '..'] else None
+                        for bound in value.split('/', 1)]
+
+    return minimum, maximum
+
+
+@click.command()
+@click.pass_context
+@click.option('--layer', '-l', 'layers', multiple=True,
+              help='layer (wildcards * and ? are supported)')
+@click.option('--model', '-m', 'models', multiple=True, help='model')
+@click.option('--reference-datetime', '-r', callback=parse_range,
+              help='model run, or range of model runs (min/max, e.g. '
+                   '2021-11-26T00:00:00Z/..)')
+@click.option('--forecast-hour-datetime', '-f', callback=parse_range,
+              help='forecast hour, or range of forecast hours (min/max)')
+@click.option('--field', 'fields', multiple=True,
+              help='property to return (default: all properties and '
+                   'geometry)')
+@click.option('--limit', type=click.IntRange(min=1),
+              help='maximum number of items')
+def query(ctx, layers, models, reference_datetime=None,
+          forecast_hour_datetime=None, fields=None, limit=None):
+    """query tileindex items (one GeoJSON feature per line)"""
+
+    provider_def = {
+        'type': TILEINDEX_TYPE,
+        'url': TILEINDEX_BASEURL,
+        'name': TILEINDEX_NAME,
+        'group': None,
+        'mapping': TILEINDEX_MAPPING,
+        'rollover': TILEINDEX_ROLLOVER,
+        'routes': TILEINDEX_ROUTES
+    }
+
+    ti = load_plugin('tileindex', provider_def)
+
+    query_dict = {}
+    ranges = {}
+
+    for key, values in [('layer', layers), ('model', models)]:
+        if len(values) == 1:
+            query_dict[key] = values[0]
+        elif values:
+            query_dict[key] = list(values)
+
+    for key, value in [('reference_datetime', reference_datetime),
+                       ('forecast_hour_datetime', forecast_hour_datetime)]:
+        if isinstance(value, tuple):
+            ranges[key] = value
+        elif value is not None:
+            query_dict[key] = value
+
+    try:
+        for feature in ti.scan(query_dict, limit=limit, ranges=ranges,
+                               fields=list(fields) or None):
+            click.echo(json.dumps(feature, default=str))
+    except TileIndexError as err:
+        raise click.ClickException(err)
+
+
+@click.command()
+@click.pass_context
+def replay(ctx):
+    """index spooled items"""
+
+    provider_def = {
+        'type': TILEINDEX_TYPE,
+        'url': TILEINDEX_BASEURL,
+        'name': TILEINDEX_NAME,
+        'group': None,
+        'mapping': TILEINDEX_MAPPING,
+        'rollover': TILEINDEX_ROLLOVER,
+        'routes': TILEINDEX_ROUTES,
+        'spool': TILEINDEX_PROVIDER_DEF['spool']
+    }
+
+    ti = load_plugin('tileindex', provider_def)
+
+    if getattr(ti, 'spool', None) is None:
+        raise click.ClickException('No spool (set GDR_TILEINDEX_SPOOL_DIR)')
+
+    click.echo('Replaying {}'.format(ti.spool))
+    click.echo('{} items replayed'.format(ti.replay()))
+    if ti.spool.is_pending():
+        raise click.ClickException('Spooled items remain (tileindex '
+                                   'unavailable)')
+    click.echo('Done')
+
+
 tileindex.add_command(setup)
 tileindex.add_command(teardown)
+tileindex.add_command(purge)
+tileindex.add_command(query)
+tileindex.add_command(replay)
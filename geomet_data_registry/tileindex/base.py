@@ -20,8 +20,24 @@
 import logging
 import os
 
+from geomet_data_registry.tileindex.indexer import BulkIndexer
+
 LOGGER = logging.getLogger(__name__)
 
+# status of documents accepted for indexing, e.g. spooled while the
+# tileindex is degraded (indexed once replayed)
+SPOOLED_STATUS = 202
+
+# statuses of documents stored in the tileindex (updated or created)
+STORED_STATUSES = [200, 201]
+
+# statuses of documents indexed, or accepted for indexing
+INDEXED_STATUSES = STORED_STATUSES + [SPOOLED_STATUS]
+
+# statuses of documents added to the tileindex (counted towards the
+# completion of model runs)
+CREATED_STATUSES = [201]
+
 
 class BaseTileIndex:
     """generic Tile Index ABC"""
@@ -41,6 +57,9 @@ class BaseTileIndex:
         self.url = provider_def['url']
         self.name = provider_def['name']
         self.group = None
+        # buffered bulk indexer (see
+        # geomet_data_registry.tileindex.indexer.BulkIndexer), if any
+        self.indexer = None
 
         LOGGER.debug('Detecting group tileindex')
         if 'group' in provider_def:
@@ -51,6 +70,13 @@ class BaseTileIndex:
 
         self.fullpath = os.path.join(self.url, self.name)
 
+        buffer = provider_def.get('buffer') or {}
+        if buffer.get('docs'):
+            LOGGER.debug('Buffering documents: {}'.format(buffer))
+            self.indexer = BulkIndexer(self.bulk_send, buffer['docs'],
+                                       buffer['bytes'], buffer['age'],
+                                       provider_def.get('concurrency') or 1)
+
     def setup(self):
         """
         Create the tileindex
@@ -69,26 +95,101 @@ class BaseTileIndex:
 
         raise NotImplementedError()
 
-    def query(self):
+    def ping(self):
+        """
+        Health check the tileindex connection
+
+        :returns: `bool` of whether the tileindex is reachable
+        """
+
+        raise NotImplementedError()
+
+    def query(self, query_dict=None, bbox=None, limit=None, ranges=None,
+              fields=None):
         """
         Query the tileindex
 
+        :param query_dict: `dict` of property name to value, or `list` of
+                           values (`*` and `?` wildcards are supported)
+        :param bbox: `list` of minx, miny, maxx, maxy
+        :param limit: `int` of maximum number of features
+        :param ranges: `dict` of property name to `tuple` of minimum and
+                       maximum values (inclusive, `None` if unbounded), e.g.
+                       of `reference_datetime` or `forecast_hour_datetime`
+        :param fields: `list` of property names to return (default: all
+                       properties and geometry)
+
         :returns: dict of 0..n GeoJSON features
         """
 
+        return {
+            'type': 'FeatureCollection',
+            'features': list(self.scan(query_dict, bbox, limit, ranges,
+                                       fields))
+        }
+
+    def scan(self, query_dict=None, bbox=None, limit=None, ranges=None,
+             fields=None):
+        """
+        Query the tileindex, streaming features page by page (in constant
+        memory)
+
+        :param query_dict: `dict` of property name to value, or `list` of
+                           values (`*` and `?` wildcards are supported)
+        :param bbox: `list` of minx, miny, maxx, maxy
+        :param limit: `int` of maximum number of features
+        :param ranges: `dict` of property name to `tuple` of minimum and
+                       maximum values (inclusive, `None` if unbounded)
+        :param fields: `list` of property names to return (default: all
+                       properties and geometry)
+
+        :returns: generator of GeoJSON features
+        """
+
         raise NotImplementedError()
 
-    def get(self, identifier):
+    def get(self, identifier, model=None, reference_datetime=None):
         """
         Query the tileindex by identifier
 
         :param identifier: tileindex item identifier
+        :param model: `str` of item model property, if known (a hint for
+                      tileindexes partitioning items by model)
+        :param reference_datetime: `str` of item model run, if known (a
+                                   hint for tileindexes partitioning items
+                                   by date)
 
         :returns: dict of single GeoJSON feature
         """
 
         raise NotImplementedError()
 
+    def mget(self, identifiers, model=None, reference_datetime=None):
+        """
+        Query the tileindex by identifiers
+
+        Tileindexes supporting multi-get requests override this method;
+        items are otherwise fetched one by one.
+
+        :param identifiers: `list` of tileindex item identifiers
+        :param model: `str` of items model property, if known (see `get`)
+        :param reference_datetime: `str` of items model run, if known (see
+                                   `get`)
+
+        :returns: `dict` of identifier to GeoJSON feature (items not found
+                  are not included)
+        """
+
+        docs = {}
+        for identifier in identifiers:
+            try:
+                docs[identifier] = self.get(identifier, model,
+                                            reference_datetime)
+            except TileNotFoundError:
+                pass
+
+        return docs
+
     def add(self, identifier, data):
         """
         Add an item to the tileindex
@@ -112,6 +213,21 @@ class BaseTileIndex:
 
         raise NotImplementedError()
 
+    def bulk_send(self, data):
+        """
+        Add many items to the tileindex, for the buffered bulk indexer
+
+        Tileindexes indexing asynchronously return a future, so that many
+        bulk requests are sent concurrently.
+
+        :param data: GeoJSON dict
+
+        :returns: `dict` {layer_id: HTTP status code}, or
+                  `concurrent.futures.Future` of it
+        """
+
+        return self.bulk_add(data)
+
     def update(self, identifier, update_dict):
         """
         Update an item to the tileindex
@@ -124,18 +240,39 @@ class BaseTileIndex:
 
         raise NotImplementedError()
 
-    def update_by_query(self, query_dict, update_dict):
+    def update_by_query(self, query_dict, update_dict,
+                        wait_for_completion=True):
         """
-        Add an item to the tileindex
+        Update items of the tileindex
 
-        :param query_dict: `dict` of query
+        :param query_dict: `dict` of property name to value, or `list` of
+                           values (`*` and `?` wildcards are supported)
         :param update_dict: `dict` of key/value updates
+        :param wait_for_completion: `bool` of whether to wait for the
+                                    update to complete (tileindexes
+                                    updating asynchronously return a task
+                                    identifier otherwise)
 
         :returns: `int` of status (as per HTTP status codes)
         """
 
         raise NotImplementedError()
 
+    def when_replayed(self, identifiers, callback):
+        """
+        Call a function once spooled documents (`SPOOLED_STATUS`) are
+        replayed
+
+        :param identifiers: `list` of identifiers of spooled documents
+        :param callback: function called with the `dict` of
+                         {identifier: HTTP status code} of the replayed
+                         documents
+
+        :returns: `None`
+        """
+
+        raise NotImplementedError()
+
     def remove(self, identifier):
         """
         Remove an item from the tileindex
@@ -147,10 +284,54 @@ class BaseTileIndex:
 
         raise NotImplementedError()
 
+    def purge(self, model, before, requests_per_second=None):
+        """
+        Remove the items of a model older than a given model run
+
+        :param model: `str` of model name (items of the model and of its
+                      sub-models, e.g. `model_giops_2D`, are removed)
+        :param before: `str` of model run (`DATE_FORMAT`): items with an
+                       older reference datetime are removed
+        :param requests_per_second: `float` of throttle of removals, if
+                                    supported by the tileindex
+
+        :returns: `int` of number of removed items
+        """
+
+        raise NotImplementedError()
+
     def __repr__(self):
         return '<BaseTileIndex> {}'.format(self.type)
 
 
+def bulk_status(result, identifiers):
+    """
+    Helper function to get the status of a file from the result of a bulk
+    request: the status of the first document of the file, unless one of
+    its documents failed or was spooled
+
+    :param result: `dict` of {identifier: HTTP status code}, or `int` of
+                   HTTP status code of all documents
+    :param identifiers: `list` of identifiers of the file documents
+
+    :returns: `int` of status (as per HTTP status codes)
+    """
+
+    if not isinstance(result, dict):
+        return result
+
+    statuses = [result.get(identifier, 500) for identifier in identifiers]
+
+    for status in statuses:
+        if status not in INDEXED_STATUSES:
+            return status
+
+    if SPOOLED_STATUS in statuses:
+        return SPOOLED_STATUS
+
+    return statuses[0]
+
+
 class TileIndexError(Exception):
     """setup error"""
 
@@ -0,0 +1,221 @@
+###############################################################################
+#
+# Copyright (C) 2021 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+from collections import OrderedDict
+from hashlib import blake2b
+import logging
+from threading import Lock
+import time
+
+from geomet_data_registry.metrics import METRICS
+from geomet_data_registry.util import json_bytes
+
+LOGGER = logging.getLogger(__name__)
+
+# document properties set on every delivery, left out of fingerprints
+VOLATILE_PROPERTIES = [
+    'receive_datetime',
+    'identify_datetime',
+    'register_datetime'
+]
+
+# status of suppressed registrations (as if the document was reindexed)
+SUPPRESSED_STATUS = 200
+
+# statuses of documents whose fingerprint is recorded: spooled documents
+# (202) are recorded once replayed, as they may yet be dropped
+RECORDED_STATUSES = [200, 201]
+
+
+class RegistrationFilter:
+    """
+    Filter of redundant registrations.
+
+    The fingerprint (a 64-bit hash of the identifier, file path, URL,
+    times and other properties) of recently indexed documents is kept per
+    identifier, in memory (least recently registered documents are evicted
+    beyond `size` documents) or in the store (shared by all processes), for
+    `ttl` seconds.  Documents with the fingerprint of their last
+    registration (e.g. redelivered or republished files) are not
+    reindexed.  Fingerprints are compared exactly, so that a changed
+    document is only suppressed on a hash collision.
+    """
+
+    def __init__(self, size=100000, ttl=3600, store=None):
+        """
+        Initialize object
+
+        :param size: `int` of maximum number of fingerprints (in memory)
+        :param ttl: `int` of number of seconds fingerprints are kept
+        :param store: store plugin keeping fingerprints, if any (default:
+                      in memory)
+
+        :returns: `geomet_data_registry.tileindex.dedup.RegistrationFilter`
+        """
+
+        self.size = size
+        self.ttl = ttl
+        self.store = store
+        self.fingerprints = OrderedDict()
+        self.lock = Lock()
+
+    def filter(self, docs):
+        """
+        Filter out documents unchanged since their last registration
+
+        :param docs: `list` of GeoJSON documents
+
+        :returns: `tuple` of `list` of documents to index, and `dict` of
+                  {identifier: HTTP status code} of suppressed documents
+        """
+
+        identifiers = [doc['properties']['identifier'] for doc in docs]
+        known = self.get(identifiers)
+
+        new_docs = []
+        suppressed = {}
+
+        for doc, identifier, fingerprint_ in zip(docs, identifiers, known):
+            if fingerprint_ is not None and fingerprint_ == fingerprint(doc):
+                suppressed[identifier] = SUPPRESSED_STATUS
+                METRICS.increment('registrations_suppressed',
+                                  doc['properties'].get('model'))
+            else:
+                new_docs.append(doc)
+
+        if suppressed:
+            LOGGER.debug('Suppressed {} unchanged registrations'.format(
+                len(suppressed)))
+
+        return new_docs, suppressed
+
+    def add(self, docs, status_dict):
+        """
+        Record the fingerprints of indexed documents (see
+        `RECORDED_STATUSES`)
+
+        :param docs: `list` of GeoJSON documents
+        :param status_dict: `dict` of {identifier: HTTP status code}
+
+        :returns: `None`
+        """
+
+        self.set({
+            doc['properties']['identifier']: fingerprint(doc)
+            for doc in docs if status_dict.get(
+                doc['properties']['identifier']) in RECORDED_STATUSES
+        })
+
+    def get(self, identifiers):
+        """
+        Get the fingerprints of the last registrations of documents
+
+        :param identifiers: `list` of document identifiers
+
+        :returns: `list` of `str` of fingerprints (`None` if unknown)
+        """
+
+        if self.store is not None:
+            try:
+                return self.store.get_keys(
+                    ['dedup_{}'.format(identifier)
+                     for identifier in identifiers])
+            except Exception as err:
+                # registrations are not suppressed when the store fails
+                LOGGER.warning('Cannot get fingerprints: {}'.format(err))
+                return [None] * len(identifiers)
+
+        now = time.monotonic()
+        fingerprints = []
+
+        with self.lock:
+            for identifier in identifiers:
+                value = self.fingerprints.get(identifier)
+                if value is None or value[1] < now:
+                    fingerprints.append(None)
+                else:
+                    fingerprints.append(value[0])
+
+        return fingerprints
+
+    def set(self, fingerprints):
+        """
+        Set the fingerprints of registered documents
+
+        :param fingerprints: `dict` of identifier to fingerprint
+
+        :returns: `None`
+        """
+
+        if not fingerprints:
+            return
+
+        if self.store is not None:
+            try:
+                self.store.set_keys({
+                    'dedup_{}'.format(identifier): fingerprint_
+                    for identifier, fingerprint_ in fingerprints.items()
+                }, ttl=self.ttl)
+            except Exception as err:
+                LOGGER.warning('Cannot set fingerprints: {}'.format(err))
+            return
+
+        expires = time.monotonic() + self.ttl
+
+        with self.lock:
+            for identifier, fingerprint_ in fingerprints.items():
+                self.fingerprints[identifier] = (fingerprint_, expires)
+                self.fingerprints.move_to_end(identifier)
+            while len(self.fingerprints) > self.size:
+                self.fingerprints.popitem(last=False)
+
+    def clear(self):
+        """
+        Forget the fingerprints kept in memory
+
+        :returns: `None`
+        """
+
+        with self.lock:
+            self.fingerprints.clear()
+
+    def __repr__(self):
+        if self.store is not None:
+            return '<RegistrationFilter> {}'.format(self.store)
+
+        return '<RegistrationFilter> {} fingerprints'.format(
+            len(self.fingerprints))
+
+
+def fingerprint(doc):
+    """
+    Helper function to compute the fingerprint of a document (all of its
+    properties but `VOLATILE_PROPERTIES`, and its geometry)
+
+    :param doc: `dict` of GeoJSON document
+
+    :returns: `str` of hexadecimal 64-bit hash
+    """
+
+    properties = sorted((key, value) for key, value in
+                        doc['properties'].items()
+                        if key not in VOLATILE_PROPERTIES)
+
+    return blake2b(json_bytes([properties, doc.get('geometry')]),
+                   digest_size=8).hexdigest()
@@ -17,20 +17,86 @@
 #
 ###############################################################################
 
+import atexit
+from collections import Counter, deque
+from fnmatch import fnmatch
 import logging
+import os
+import random
+import re
+from threading import Lock
+import time
 from urllib.parse import urlparse
 
 from elasticsearch import Elasticsearch, exceptions
+import yaml
 
 from geomet_data_registry.tileindex.base import (
     BaseTileIndex,
+    SPOOLED_STATUS,
     TileIndexError,
     TileNotFoundError,
 )
-from geomet_data_registry.util import json_pretty_print
+from geomet_data_registry.plugin import load_plugin
+from geomet_data_registry.tileindex.dedup import RegistrationFilter
+from geomet_data_registry.tileindex.spool import Spool, SpoolReplayer
+from geomet_data_registry.util import (
+    feature_json,
+    get_today_and_now,
+    json_bytes,
+    json_pretty_print,
+)
 
 LOGGER = logging.getLogger(__name__)
 
+# bulk item statuses worth retrying (rejected under load or unavailable)
+BULK_RETRY_STATUSES = [429, 502, 503, 504]
+
+# maximum number of bulk retries of failed documents
+BULK_MAX_RETRIES = 5
+
+# initial and maximum delay (seconds) between bulk retries
+BULK_BACKOFF = 0.5
+BULK_BACKOFF_MAX = 30
+
+# date properties (queried on their date field rather than a keyword field)
+DATE_PROPERTIES = [
+    'forecast_hour_datetime',
+    'reference_datetime',
+    'receive_datetime',
+    'identify_datetime',
+    'register_datetime',
+    'expiry_datetime'
+]
+
+# number of documents fetched per search request when scanning, and
+# lifetime of the point in time (or scroll) between requests
+SCAN_PAGE_SIZE = 1000
+SCAN_KEEP_ALIVE = '1m'
+
+# minimum Elasticsearch version scanning from a point in time, sorted on
+# _shard_doc (older versions scroll)
+PIT_MIN_VERSION = (7, 12)
+
+# status of index request results
+INDEX_RESULTS = {
+    'created': 201,
+    'updated': 200
+}
+
+# stored script of partial updates of document properties (compiled once,
+# with property values passed as parameters)
+UPDATE_SCRIPT_ID = 'gdr_update_properties'
+
+UPDATE_SCRIPT = {
+    'script': {
+        'lang': 'painless',
+        'source': 'for (entry in params.properties.entrySet()) { '
+                  'ctx._source.properties[entry.getKey()] = '
+                  'entry.getValue(); }'
+    }
+}
+
 INDEX_SETTINGS = {
     'settings': {
         'index': {
@@ -129,6 +195,96 @@ INDEX_SETTINGS = {
     }
 }
 
+# lean mapping: keyword-only fields, fields never queried are not indexed
+# (only kept in _source), and geometries (the same global polygon for all
+# items) are not indexed
+INDEX_SETTINGS_V2 = {
+    'settings': {
+        'index': {
+            'number_of_shards': 1,
+            'number_of_replicas': 0
+        }
+    },
+    'mappings': {
+        'dynamic': False,
+        'properties': {
+            'type': {
+                'type': 'keyword',
+                'index': False,
+                'doc_values': False
+            },
+            'properties': {
+                'properties': {
+                    'identifier': {
+                        'type': 'keyword'
+                    },
+                    'layer': {
+                        'type': 'keyword'
+                    },
+                    'model': {
+                        'type': 'keyword'
+                    },
+                    'elevation': {
+                        'type': 'keyword'
+                    },
+                    'member': {
+                        'type': 'integer'
+                    },
+                    'weather_variable': {
+                        'type': 'keyword'
+                    },
+                    'filepath': {
+                        'type': 'keyword',
+                        'index': False,
+                        'doc_values': False
+                    },
+                    'url': {
+                        'type': 'keyword',
+                        'index': False,
+                        'doc_values': False
+                    },
+                    'forecast_hour_datetime': {
+                        'type': 'date',
+                        'format': 'date_time_no_millis||epoch_millis'
+                    },
+                    'reference_datetime': {
+                        'type': 'date',
+                        'format': 'date_time_no_millis||epoch_millis'
+                    },
+                    'receive_datetime': {
+                        'type': 'date',
+                        'format': 'date_time||epoch_millis',
+                        'index': False
+                    },
+                    'identify_datetime': {
+                        'type': 'date',
+                        'format': 'date_time||epoch_millis',
+                        'index': False
+                    },
+                    'register_datetime': {
+                        'type': 'date',
+                        'format': 'date_time||epoch_millis',
+                        'index': False
+                    },
+                    'expiry_datetime': {
+                        'type': 'date',
+                        'format': 'date_time||epoch_millis'
+                    }
+                }
+            },
+            'geometry': {
+                'type': 'object',
+                'enabled': False
+            }
+        }
+    }
+}
+
+MAPPINGS = {
+    'v1': INDEX_SETTINGS,
+    'v2': INDEX_SETTINGS_V2
+}
+
 
 class ElasticsearchTileIndex(BaseTileIndex):
     """Elasticsearch TileIndex"""
@@ -167,13 +323,160 @@ class ElasticsearchTileIndex(BaseTileIndex):
 
         LOGGER.debug('URL settings: {}'.format(url_settings))
 
-        self.es = Elasticsearch([url_settings])
+        # documents are written to a local spool (see
+        # geomet_data_registry.tileindex.spool.Spool) while Elasticsearch
+        # is degraded (errors, or requests slower than `latency` seconds),
+        # and replayed every `interval` seconds once it recovers
+        self.spool = None
+        self.degraded_until = 0
+        spool = provider_def.get('spool') or {}
+        if spool.get('path'):
+            LOGGER.debug('Spooling documents: {}'.format(spool))
+            self.spool = Spool(os.path.join(spool['path'], self.name))
+            self.spool_latency = spool['latency']
+            self.spool_interval = spool['interval']
 
-        if not self.es.ping():
+        # functions called once spooled documents are replayed (see
+        # when_replayed), by identifier, in order of spooling
+        self.replay_callbacks = {}
+        self.replay_lock = Lock()
+
+        # registrations of documents unchanged since they were last indexed
+        # are suppressed (see
+        # geomet_data_registry.tileindex.dedup.RegistrationFilter), with
+        # fingerprints kept for `ttl` seconds in memory or in the store
+        self.dedup = None
+        dedup = provider_def.get('dedup') or {}
+        if dedup.get('ttl'):
+            LOGGER.debug('Suppressing redundant registrations: {}'.format(
+                dedup))
+            store = None
+            if dedup.get('store'):
+                store = load_plugin('store', dedup['store'], shared=True)
+            self.dedup = RegistrationFilter(dedup['size'], dedup['ttl'],
+                                            store)
+
+        self.es = self.connect(url_settings)
+
+        self.max_retries = provider_def.get('retries', BULK_MAX_RETRIES)
+
+        self.mapping = provider_def.get('mapping') or 'v1'
+        if self.mapping not in MAPPINGS:
+            msg = 'Unknown mapping {}'.format(self.mapping)
+            LOGGER.error(msg)
+            raise TileIndexError(msg)
+
+        # with routes or rollover, items are indexed in per-route indices
+        # (<name>-<route>, or per-day <name>-<route>-<YYYYMMDD> indices with
+        # rollover, created from index templates) read through the <name>
+        # alias: routes group models (e.g. a model family) in indices with
+        # their own settings (see `load_routes`), and other models are
+        # routed to their own indices
+        self.rollover = provider_def.get('rollover', False)
+        self.routes = load_routes(provider_def.get('routes'))
+        self.routed = self.rollover or bool(self.routes)
+        self.model_routes = {}
+
+        self.update_script_stored = False
+        # whether Elasticsearch supports points in time (see scan)
+        self.pit_supported = None
+
+        self.replayer = None
+        if self.spool is not None:
+            self.replayer = SpoolReplayer(self, self.spool_interval)
+            self.replayer.start()
+            atexit.register(self.close)
+
+    def connect(self, url_settings):
+        """
+        Connect to Elasticsearch
+
+        :param url_settings: `dict` of Elasticsearch host settings
+
+        :returns: `elasticsearch.Elasticsearch` client
+        """
+
+        # the client pools HTTP connections, and is shared by all layers of a
+        # process (see geomet_data_registry.plugin.PluginRegistry)
+        es = Elasticsearch([url_settings])
+
+        if not es.ping():
             msg = 'Cannot connect to Elasticsearch'
+            if self.spool is not None:
+                LOGGER.warning('{}: spooling documents'.format(msg))
+                self.degrade()
+                return es
             LOGGER.error(msg)
             raise TileIndexError(msg)
 
+        return es
+
+    def degrade(self):
+        """
+        Spool documents for `spool_interval` seconds, rather than sending
+        them to a degraded Elasticsearch
+
+        :returns: `None`
+        """
+
+        if not self.is_degraded():
+            LOGGER.warning('Elasticsearch degraded: spooling documents')
+
+        self.degraded_until = time.monotonic() + self.spool_interval
+
+    def is_degraded(self):
+        """
+        Checks whether Elasticsearch is degraded
+
+        :returns: `bool` of whether documents are to be spooled
+        """
+
+        return time.monotonic() < self.degraded_until
+
+    def close(self):
+        """
+        Index buffered documents, stop replaying and close the spool
+
+        :returns: `None`
+        """
+
+        atexit.unregister(self.close)
+
+        if self.indexer is not None:
+            self.indexer.close()
+
+        if self.replayer is not None:
+            self.replayer.stop()
+
+        if self.spool is not None:
+            self.spool.close()
+
+        if self.replay_callbacks:
+            LOGGER.warning('{} spooled documents are to be replayed by the '
+                           'next process, without completing their '
+                           'registration'.format(len(self.replay_callbacks)))
+
+    def ping(self):
+        """
+        Health check the tileindex connection
+
+        While documents are spooled, the tileindex is healthy even when
+        Elasticsearch is unreachable (documents are replayed once it
+        recovers), so that shared instances are not re-created.
+
+        :returns: `bool` of whether the tileindex is reachable (or
+                  spooling)
+        """
+
+        if self.es.ping():
+            return True
+
+        if self.spool is not None:
+            self.degrade()
+            return True
+
+        return False
+
     def setup(self):
         """
         Create the tileindex
@@ -181,14 +484,36 @@ class ElasticsearchTileIndex(BaseTileIndex):
         :returns: `bool` of process status
         """
 
-        if self.es.indices.exists(self.name):
+        if any([self.es.indices.exists(self.name),
+                self.es.indices.exists_template(self.name)]):
             msg = 'Index exists'
             LOGGER.error(msg)
             raise TileIndexError(msg)
 
-        LOGGER.info('Creating index {}'.format(self.name))
+        if self.routed:
+            LOGGER.info('Creating index template {}'.format(self.name))
+            self.es.indices.put_template(name=self.name, body=dict(
+                MAPPINGS[self.mapping],
+                index_patterns=['{}-*'.format(self.name)],
+                aliases={self.name: {}},
+                order=0))
+            for route, route_def in self.routes.items():
+                if not route_def.get('settings'):
+                    continue
+                template = '{}-{}'.format(self.name, route)
+                LOGGER.info('Creating index template {}'.format(template))
+                self.es.indices.put_template(name=template, body={
+                    'index_patterns': [template, '{}-*'.format(template)],
+                    'settings': {
+                        'index': route_def['settings']
+                    },
+                    'order': 1
+                })
+        else:
+            LOGGER.info('Creating index {}'.format(self.name))
+            self.es.indices.create(index=self.name,
+                                   body=MAPPINGS[self.mapping])
 
-        self.es.indices.create(index=self.name, body=INDEX_SETTINGS)
         self.es.ingest.put_pipeline(id='gdr_register_datetime', body={
             'description': 'Adds a timestamp to a geomet-data-registry '
                            'document\'s properties.register_datetime property '
@@ -203,6 +528,8 @@ class ElasticsearchTileIndex(BaseTileIndex):
             ]
         })
 
+        self.put_update_script()
+
         return True
 
     def teardown(self):
@@ -214,7 +541,17 @@ class ElasticsearchTileIndex(BaseTileIndex):
 
         LOGGER.info('Deleting index {}'.format(self.name))
         try:
-            self.es.indices.delete(index=self.name)
+            if self.routed:
+                indices = list(self.es.indices.get_alias(name=self.name))
+                if indices:
+                    self.es.indices.delete(index=','.join(indices))
+                for route, route_def in self.routes.items():
+                    if route_def.get('settings'):
+                        self.es.indices.delete_template(
+                            name='{}-{}'.format(self.name, route))
+                self.es.indices.delete_template(name=self.name)
+            else:
+                self.es.indices.delete(index=self.name)
             self.es.ingest.delete_pipeline(id='gdr_register_datetime')
         except exceptions.NotFoundError as err:
             msg = err
@@ -233,7 +570,8 @@ class ElasticsearchTileIndex(BaseTileIndex):
         :returns: `int` of status (as per HTTP status codes)
         """
 
-        status_code = None
+        if self.spool is not None or self.dedup is not None:
+            return self.bulk_add([data])[data['properties']['identifier']]
 
         LOGGER.info('Indexing {}'.format(identifier))
         LOGGER.debug('Data: {}'.format(json_pretty_print(data)))
@@ -244,12 +582,10 @@ class ElasticsearchTileIndex(BaseTileIndex):
             # immediately after in support of tracking performance (kind of
             # ironic eh?).
             # TODO: update using asyncio or multiprocessing
-            r = self.es.index(index=self.name, id=identifier, body=data,
+            r = self.es.index(index=self.index_name(data['properties']),
+                              id=identifier, body=data,
                               pipeline='gdr_register_datetime')
-            if r['result'] == 'created':
-                status_code = 201
-            elif r['result'] == 'updated':
-                status_code = 200
+            status_code = INDEX_RESULTS.get(r['result'])
         except Exception as err:
             LOGGER.exception('Error indexing {}: {}'.format(identifier, err))
             return 500
@@ -260,46 +596,312 @@ class ElasticsearchTileIndex(BaseTileIndex):
         """
         Add many items to the tileindex
 
+        Documents rejected with a transient error (e.g. 429 when Elasticsearch
+        is under pressure) are resubmitted, alone, with exponential backoff
+        and jitter, up to `max_retries` times.
+
+        With a registration filter, documents unchanged since their last
+        registration are not reindexed (with status 200).
+
         :param data: GeoJSON dict
 
-        :returns: `dict` {layer_id: HTTP status code}
+        :returns: `dict` {layer_id: HTTP status code} of all documents
         """
 
+        if self.dedup is None:
+            return self.bulk_write(data)
+
+        data, status_dict = self.dedup.filter(data)
+
+        if data:
+            status_dict.update(self.bulk_write(data))
+            self.dedup.add(data, status_dict)
+
+        return status_dict
+
+    def bulk_write(self, data):
+        """
+        Index many items, through the spool if any
+
+        With a spool, documents are spooled (with status 202) while
+        Elasticsearch is degraded or spooled documents are not replayed
+        yet, and documents rejected with a transient error are spooled
+        rather than retried.
+
+        :param data: `list` of GeoJSON documents
+
+        :returns: `dict` {layer_id: HTTP status code} of all documents
+        """
+
+        if self.spool is None:
+            return self.bulk_index(data)
+
+        status_dict = self.spool_accept(data)
+        if status_dict is not None:
+            return status_dict
+
+        start = time.monotonic()
+        status_dict = self.bulk_index(data, 0,
+                                      request_timeout=self.spool_latency)
+
+        return self.spool_failed(data, status_dict,
+                                 time.monotonic() - start)
+
+    def spool_accept(self, data):
+        """
+        Spool documents while Elasticsearch is degraded or spooled
+        documents are not replayed yet
+
+        :param data: `list` of GeoJSON documents
+
+        :returns: `dict` {layer_id: HTTP status code} of all documents if
+                  spooled, else `None` (i.e. documents are to be indexed)
+        """
+
+        if not self.spool.accept(data, force=self.is_degraded()):
+            return None
+
+        LOGGER.debug('Spooled {} documents'.format(len(data)))
+
+        return {doc['properties']['identifier']: SPOOLED_STATUS
+                for doc in data}
+
+    def spool_failed(self, data, status_dict, elapsed):
+        """
+        Spool the documents of a bulk request rejected with a transient
+        error, degrading Elasticsearch when the request failed or was
+        slow
+
+        :param data: `list` of GeoJSON documents
+        :param status_dict: `dict` {layer_id: HTTP status code} of all
+                            documents
+        :param elapsed: `float` of number of seconds of the request
+
+        :returns: `dict` {layer_id: HTTP status code} of all documents
+        """
+
+        failed = [doc for doc in data if status_dict[
+            doc['properties']['identifier']] in BULK_RETRY_STATUSES]
+
+        if failed or elapsed >= self.spool_latency:
+            self.degrade()
+
+        if failed:
+            LOGGER.warning('Spooling {} documents'.format(len(failed)))
+            self.spool.append(failed)
+            status_dict.update({doc['properties']['identifier']:
+                                SPOOLED_STATUS for doc in failed})
+
+        return status_dict
+
+    def bulk_index(self, data, max_retries=None, **kwargs):
+        """
+        Index many items, resubmitting documents rejected with a transient
+        error (see `bulk_add`)
+
+        :param data: `list` of GeoJSON documents
+        :param max_retries: `int` of maximum number of retries (default:
+                            `max_retries`)
+        :param kwargs: bulk request parameters (e.g. `request_timeout`)
+
+        :returns: `dict` {layer_id: HTTP status code} of all documents
+        """
+
+        if max_retries is None:
+            max_retries = self.max_retries
+
         LOGGER.debug('Starting bulk add')
-        try:
-            # until the document is fully available in ES.  This is done in
-            # order to make updates to the layer registration datetime
-            # immediately after in support of tracking performance (kind of
-            # ironic eh?).
-            # TODO: update using asyncio or multiprocessing
 
-            # add 'pipeline': 'register_datetime' to data_es
-            bulk_data = []
-            for doc in data:
-                op_dict = {
-                    'index': {
-                        '_index': self.name,
-                        '_type': '_doc'
-                    }
-                }
-                op_dict['index']['_id'] = doc['properties']['identifier']
-                bulk_data.append(op_dict)
-                bulk_data.append(doc)
-            r = self.es.bulk(index=self.name, body=bulk_data,
-                             pipeline='gdr_register_datetime')
+        # documents of many files are indexed asynchronously in a single
+        # request with the buffered bulk indexer (see
+        # geomet_data_registry.tileindex.indexer.BulkIndexer)
+        retry = BulkRetry(data, max_retries)
+
+        for delay, docs in retry:
+            if delay:
+                time.sleep(delay)
+            retry.update(self.bulk_request(docs, **kwargs))
+
+        return retry.status_dict
+
+    def replay(self):
+        """
+        Replay spooled documents, once Elasticsearch is reachable
+
+        :returns: `int` of number of replayed documents
+        """
+
+        if self.spool is None or self.is_degraded():
+            return 0
+
+        if not self.es.ping():
+            self.degrade()
+            return 0
+
+        return self.spool.replay(self.replay_batch)
+
+    def replay_batch(self, data):
+        """
+        Index a batch of spooled documents, recording the fingerprints of
+        indexed documents with a registration filter, and completing the
+        registrations waiting for them (see `when_replayed`)
+
+        :param data: `list` of GeoJSON documents
+
+        :returns: `bool` of whether documents were indexed (documents
+                  rejected with a permanent error are dropped)
+        """
+
+        status_dict = self.bulk_index(data)
+
+        statuses = list(status_dict.values())
+        if any(status in BULK_RETRY_STATUSES for status in statuses):
+            self.degrade()
+            return False
+
+        rejected = [status for status in statuses if status >= 300]
+        if rejected:
+            LOGGER.error('Dropping {} spooled documents: {}'.format(
+                len(rejected), sorted(set(rejected))))
 
-            status_dict = {}
+        if self.dedup is not None:
+            self.dedup.add(data, status_dict)
 
-            for i in r['items']:
-                lyr_id = i['index']['_id']
-                lyr_status = i['index']['status']
-                tmp_dict = {}
-                tmp_dict[lyr_id] = lyr_status
-                status_dict.update(tmp_dict)
+        self.replayed(data, status_dict)
 
+        return True
+
+    def when_replayed(self, identifiers, callback):
+        """
+        Call a function once spooled documents are replayed (registrations
+        of documents spooled by another process, or before a restart, are
+        not completed)
+
+        :param identifiers: `list` of identifiers of spooled documents
+        :param callback: function called (in the replay thread) with the
+                         `dict` of {identifier: HTTP status code} of the
+                         replayed documents
+
+        :returns: `None`
+        """
+
+        entry = {
+            'pending': set(identifiers),
+            'statuses': {},
+            'callback': callback
+        }
+
+        with self.replay_lock:
+            for identifier in entry['pending']:
+                self.replay_callbacks.setdefault(identifier,
+                                                 deque()).append(entry)
+
+    def replayed(self, data, status_dict):
+        """
+        Complete the registrations waiting for a batch of replayed
+        documents.  A document spooled many times (e.g. a file delivered
+        again while spooling) completes one registration per copy, in
+        order: copies after the first are indexed as updates (200).
+
+        :param data: `list` of replayed GeoJSON documents
+        :param status_dict: `dict` {layer_id: HTTP status code} of the
+                            replayed documents
+
+        :returns: `None`
+        """
+
+        copies = Counter(doc['properties']['identifier'] for doc in data)
+        completed = []
+
+        with self.replay_lock:
+            for identifier, count in copies.items():
+                entries = self.replay_callbacks.get(identifier)
+                for i in range(count):
+                    if not entries:
+                        break
+                    entry = entries.popleft()
+                    status = status_dict.get(identifier, 500)
+                    if i > 0 and status == 201:
+                        status = 200
+                    entry['statuses'][identifier] = status
+                    entry['pending'].discard(identifier)
+                    if not entry['pending']:
+                        completed.append(entry)
+                if entries is not None and not entries:
+                    del self.replay_callbacks[identifier]
+
+        for entry in completed:
+            try:
+                entry['callback'](entry['statuses'])
+            except Exception as err:
+                LOGGER.exception('Cannot complete registration of replayed '
+                                 'documents: {}'.format(err))
+
+    def bulk_request(self, data, **kwargs):
+        """
+        Send a single bulk request
+
+        :param data: `list` of GeoJSON documents
+        :param kwargs: bulk request parameters (e.g. `request_timeout`)
+
+        :returns: `dict` {layer_id: HTTP status code} of all documents
+                  (documents of a failed request get the request status)
+        """
+
+        try:
+            r = self.es.bulk(index=self.name, body=self.bulk_body(data),
+                             pipeline='gdr_register_datetime', **kwargs)
         except Exception as err:
-            LOGGER.exception('Error bulk indexing: {}'.format(err))
-            return 500
+            return bulk_error(data, err)
+
+        return self.bulk_result(data, r)
+
+    def bulk_body(self, data):
+        """
+        Build the body of a bulk request
+
+        :param data: `list` of GeoJSON documents
+
+        :returns: `bytes` of NDJSON bulk actions and documents
+        """
+
+        actions = {}
+        lines = []
+
+        for doc in data:
+            index = self.index_name(doc['properties'])
+            if index not in actions:
+                actions[index] = b''.join([
+                    b'{"index":{"_index":', json_bytes(index),
+                    b',"_type":"_doc","_id":'])
+            lines.append(b''.join([
+                actions[index], json_bytes(doc['properties']['identifier']),
+                b'}}']))
+            lines.append(feature_json(doc))
+
+        lines.append(b'')
+
+        return b'\n'.join(lines)
+
+    def bulk_result(self, data, r):
+        """
+        Get the document statuses of a bulk response
+
+        :param data: `list` of GeoJSON documents
+        :param r: `dict` of bulk response
+
+        :returns: `dict` {layer_id: HTTP status code} of all documents
+        """
+
+        status_dict = {doc['properties']['identifier']: 500 for doc in data}
+
+        for i in r['items']:
+            lyr_id = i['index']['_id']
+            lyr_status = i['index']['status']
+            if 'error' in i['index']:
+                LOGGER.warning('Error indexing {}: {}'.format(
+                    lyr_id, i['index']['error']))
+            status_dict[lyr_id] = lyr_status
 
         return status_dict
 
@@ -317,7 +919,11 @@ class ElasticsearchTileIndex(BaseTileIndex):
 
         update_dict = {'doc': update_dict}
         try:
-            self.es.update(index=self.name, doc_type=self.type_name,
+            if self.routed:
+                index = self.locate(identifier)
+            else:
+                index = self.name
+            self.es.update(index=index, doc_type=self.type_name,
                            id=identifier, body=update_dict)
         except Exception as err:
             LOGGER.exception('Error updating {}: {}'.format(identifier, err))
@@ -325,60 +931,784 @@ class ElasticsearchTileIndex(BaseTileIndex):
 
         return 200
 
-    def update_by_query(self, query_dict, update_dict):
+    def update_by_query(self, query_dict, update_dict,
+                        wait_for_completion=True):
         """
-        Update an existing item in the tileindex
+        Update existing items in the tileindex
 
-        :param identifier: tileindex item id
-        :param data: Python dictionnary
+        Items are selected with term queries on keyword fields (terms
+        queries for lists of values, wildcard queries for values with
+        `*` or `?` wildcards), and updated with a stored script taking
+        the property values as parameters, in parallel slices.
 
-        :returns: `int` of status (as per HTTP status codes)
-        """
+        :param query_dict: `dict` of property name to value, or `list` of
+                           values (all properties must match)
+        :param update_dict: `dict` of property name to value
+        :param wait_for_completion: `bool` of whether to wait for the
+                                    update to complete
 
-        es_query_body = {}
+        :returns: `int` of status (as per HTTP status codes), or `str` of
+                  task identifier (see `task_status`) when not waiting for
+                  completion
+        """
 
         LOGGER.info('Updating by query: {}'.format(query_dict))
-        LOGGER.info('query dict: {}'.format(query_dict))
         LOGGER.info('update dict: {}'.format(update_dict))
 
-        for key, value in query_dict.items():
-            property_name = 'properties.{}.raw'.format(key)
-            es_query_body['query'] = {
-                'wildcard': {
-                    property_name: {
-                        'wildcard': value
-                    }
-                }
-            }
-
-        for key, value in update_dict.items():
-            es_query_body['script'] = {
-                'source': 'ctx._source.properties.{} = "{}"'.format(
-                    key, value)
-            }
+        es_query_body = self.update_by_query_body(query_dict, update_dict)
 
         LOGGER.debug('ES query body: {}'.format(es_query_body))
         LOGGER.debug('Updating by query in ES')
         try:
-            self.es.update_by_query(index=self.name, body=es_query_body,
-                                    conflicts='proceed')
+            if not self.update_script_stored:
+                self.put_update_script()
+
+            r = self.es.update_by_query(
+                index=self.name, body=es_query_body, conflicts='proceed',
+                slices='auto', wait_for_completion=wait_for_completion)
         except Exception as err:
             LOGGER.exception('Error updating by query: {}'.format(err))
             return 500
 
+        return self.update_by_query_result(r, wait_for_completion)
+
+    def update_by_query_body(self, query_dict, update_dict):
+        """
+        Build the body of an update by query request
+
+        :param query_dict: `dict` of property name to value, or `list` of
+                           values
+        :param update_dict: `dict` of property name to value
+
+        :returns: `dict` of request body
+        """
+
+        return {
+            'query': self.query_filter(query_dict),
+            'script': {
+                'id': UPDATE_SCRIPT_ID,
+                'params': {
+                    'properties': update_dict
+                }
+            }
+        }
+
+    def update_by_query_result(self, r, wait_for_completion=True):
+        """
+        Get the result of an update by query response
+
+        :param r: `dict` of update by query response
+        :param wait_for_completion: `bool` of whether the request waited
+                                    for the update to complete
+
+        :returns: `int` of status (as per HTTP status codes), or `str` of
+                  task identifier when not waiting for completion
+        """
+
+        if not wait_for_completion:
+            LOGGER.debug('Updating by query in task {}'.format(r['task']))
+            return r['task']
+
+        if r.get('failures'):
+            LOGGER.error('Error updating by query: {}'.format(
+                r['failures']))
+            return 500
+
+        LOGGER.debug('Updated {} documents'.format(r.get('updated')))
         return 200
 
-    def get(self, identifier):
+    def task_status(self, task_id):
+        """
+        Get the status of an update by query task
+
+        :param task_id: `str` of task identifier
+
+        :returns: `dict` of task status (`completed`, number of `updated`
+                  documents and `failures`)
+        """
+
+        r = self.es.tasks.get(task_id=task_id)
+
+        response = r.get('response') or {}
+        status = response or r['task'].get('status', {})
+
+        return {
+            'completed': r['completed'],
+            'updated': status.get('updated', 0),
+            'failures': response.get('failures', []) + (
+                [r['error']] if 'error' in r else [])
+        }
+
+    def put_update_script(self):
+        """
+        Store the update script of `update_by_query`
+
+        :returns: `None`
+        """
+
+        LOGGER.debug('Storing script {}'.format(UPDATE_SCRIPT_ID))
+        self.es.put_script(id=UPDATE_SCRIPT_ID, body=UPDATE_SCRIPT)
+        self.update_script_stored = True
+
+    def scan(self, query_dict=None, bbox=None, limit=None, ranges=None,
+             fields=None):
+        """
+        Query the tileindex, streaming features page by page (in constant
+        memory) from a point in time with search_after pagination, or
+        with the scroll API on Elasticsearch older than `PIT_MIN_VERSION`
+
+        :param query_dict: `dict` of property name to value, or `list` of
+                           values (`*` and `?` wildcards are supported)
+        :param bbox: `list` of minx, miny, maxx, maxy (v1 mapping only)
+        :param limit: `int` of maximum number of features
+        :param ranges: `dict` of property name to `tuple` of minimum and
+                       maximum values (inclusive, `None` if unbounded)
+        :param fields: `list` of property names to return (default: all
+                       properties and geometry)
+
+        :returns: generator of GeoJSON features
+        """
+
+        size = SCAN_PAGE_SIZE
+        if limit is not None:
+            size = min(size, limit)
+
+        body = {
+            'query': self.query_filter(query_dict or {}, ranges, bbox),
+            'size': size,
+            'track_total_hits': False
+        }
+
+        if fields is not None:
+            body['_source'] = ['type'] + [
+                'properties.{}'.format(field) for field in fields]
+
+        LOGGER.debug('ES query body: {}'.format(body))
+
+        if self.supports_pit():
+            pages = self.pit_pages(body)
+        else:
+            pages = self.scroll_pages(body)
+
+        count = 0
+        try:
+            for hits in pages:
+                if limit is not None:
+                    hits = hits[:limit - count]
+
+                for hit in hits:
+                    yield hit['_source']
+
+                count += len(hits)
+                if len(hits) < size or count == limit:
+                    break
+        finally:
+            pages.close()
+
+    def supports_pit(self):
+        """
+        Checks whether Elasticsearch supports points in time (version
+        `PIT_MIN_VERSION` or later)
+
+        :returns: `bool` of whether points in time are supported
+        """
+
+        if self.pit_supported is None:
+            version = self.es.info()['version']['number']
+            self.pit_supported = tuple(
+                int(number) for number in version.split('.')[:2]
+            ) >= PIT_MIN_VERSION
+            LOGGER.debug('Elasticsearch {}: points in time {}'.format(
+                version, 'supported' if self.pit_supported else
+                'not supported (scrolling)'))
+
+        return self.pit_supported
+
+    def pit_pages(self, body):
+        """
+        Search pages of hits from a point in time, with search_after
+        pagination
+
+        :param body: `dict` of search request body
+
+        :returns: generator of `list` of hits
+        """
+
+        body = dict(body, sort=[{'_shard_doc': 'asc'}])
+
+        pit_id = self.es.open_point_in_time(
+            index=self.name, keep_alive=SCAN_KEEP_ALIVE)['id']
+
+        try:
+            while True:
+                body['pit'] = {'id': pit_id, 'keep_alive': SCAN_KEEP_ALIVE}
+
+                r = self.es.search(body=body)
+                pit_id = r.get('pit_id', pit_id)
+                hits = r['hits']['hits']
+
+                yield hits
+
+                if not hits:
+                    return
+
+                body['search_after'] = hits[-1]['sort']
+        finally:
+            self.es.close_point_in_time(body={'id': pit_id})
+
+    def scroll_pages(self, body):
+        """
+        Search pages of hits with the scroll API
+
+        :param body: `dict` of search request body
+
+        :returns: generator of `list` of hits
+        """
+
+        body = dict(body, sort=['_doc'])
+
+        r = self.es.search(index=self.name, body=body,
+                           scroll=SCAN_KEEP_ALIVE)
+        scroll_id = r['_scroll_id']
+
+        try:
+            while True:
+                hits = r['hits']['hits']
+
+                yield hits
+
+                if not hits:
+                    return
+
+                r = self.es.scroll(body={'scroll_id': scroll_id,
+                                         'scroll': SCAN_KEEP_ALIVE})
+                scroll_id = r.get('_scroll_id', scroll_id)
+        finally:
+            self.es.clear_scroll(body={'scroll_id': scroll_id})
+
+    def query_filter(self, query_dict, ranges=None, bbox=None):
+        """
+        Build the filter query of document properties
+
+        :param query_dict: `dict` of property name to value, or `list` of
+                           values
+        :param ranges: `dict` of property name to `tuple` of minimum and
+                       maximum values (inclusive, `None` if unbounded)
+        :param bbox: `list` of minx, miny, maxx, maxy
+
+        :returns: `dict` of Elasticsearch query
+        """
+
+        filters = []
+
+        for key, (minimum, maximum) in (ranges or {}).items():
+            range_ = {}
+            if minimum is not None:
+                range_['gte'] = minimum
+            if maximum is not None:
+                range_['lte'] = maximum
+            filters.append({'range': {self.field(key): range_}})
+
+        if bbox is not None:
+            if self.mapping != 'v1':
+                msg = 'Bounding box queries require the v1 mapping'
+                LOGGER.error(msg)
+                raise TileIndexError(msg)
+
+            filters.append({
+                'geo_shape': {
+                    'geometry': {
+                        'shape': {
+                            'type': 'envelope',
+                            'coordinates': [[bbox[0], bbox[3]],
+                                            [bbox[2], bbox[1]]]
+                        },
+                        'relation': 'intersects'
+                    }
+                }
+            })
+
+        for key, value in query_dict.items():
+            field = self.field(key)
+            if isinstance(value, (list, tuple, set)):
+                filters.append({'terms': {field: list(value)}})
+            elif isinstance(value, str) and any(c in value for c in '*?'):
+                filters.append({'wildcard': {field: {'wildcard': value}}})
+            else:
+                filters.append({'term': {field: value}})
+
+        return {
+            'bool': {
+                'filter': filters
+            }
+        }
+
+    def get(self, identifier, model=None, reference_datetime=None):
         """
         :param identifier: identifier of document to retrieve
+        :param model: `str` of document model (rollover index hint)
+        :param reference_datetime: `str` of document model run (rollover
+                                   index hint)
         :returns: `dict` of single GeoJSON feature
         """
+        if self.indexer is not None:
+            doc = self.indexer.get(identifier)
+            if doc is not None:
+                return doc
+
+        if self.routed and None in [model, reference_datetime]:
+            # without hints, the index of the document is unknown: search
+            # the alias (documents are found once the index is refreshed)
+            index = self.locate(identifier)
+        else:
+            index = self.index_name({
+                'model': model,
+                'reference_datetime': reference_datetime
+            })
+
         try:
-            result = self.es.get(index=self.name, id=identifier)
+            result = self.es.get(index=index, id=identifier)
             return result['_source']
         except exceptions.NotFoundError as err:
             LOGGER.warning('Could not get document with id: {}'.format(err))
             raise TileNotFoundError()
 
+    def mget(self, identifiers, model=None, reference_datetime=None):
+        """
+        :param identifiers: `list` of identifiers of documents to retrieve
+        :param model: `str` of documents model (rollover index hint)
+        :param reference_datetime: `str` of documents model run (rollover
+                                   index hint)
+        :returns: `dict` of identifier to GeoJSON feature (documents not
+                  found are not included)
+        """
+        docs = {}
+
+        if self.indexer is not None:
+            for identifier in identifiers:
+                doc = self.indexer.get(identifier)
+                if doc is not None:
+                    docs[identifier] = doc
+
+        missing = [identifier for identifier in identifiers
+                   if identifier not in docs]
+        if not missing:
+            return docs
+
+        try:
+            if self.routed and None in [model, reference_datetime]:
+                # without hints, the index of the documents is unknown:
+                # search the alias
+                r = self.es.search(index=self.name, body={
+                    'query': {
+                        'ids': {
+                            'values': missing
+                        }
+                    }
+                }, size=len(missing))
+                found = r['hits']['hits']
+            else:
+                index = self.index_name({
+                    'model': model,
+                    'reference_datetime': reference_datetime
+                })
+                r = self.es.mget(index=index, body={'ids': missing})
+                found = [doc for doc in r['docs'] if doc.get('found')]
+        except exceptions.NotFoundError as err:
+            LOGGER.warning('Could not get documents: {}'.format(err))
+            return docs
+
+        for doc in found:
+            docs[doc['_id']] = doc['_source']
+
+        if len(docs) < len(identifiers):
+            LOGGER.debug('Could not get documents with ids: {}'.format(
+                [identifier for identifier in identifiers
+                 if identifier not in docs]))
+
+        return docs
+
+    def remove(self, identifier):
+        """
+        Remove an item from the tileindex
+
+        :param identifier: tileindex item identifier
+
+        :returns: `int` of status (as per HTTP status codes)
+        """
+
+        LOGGER.info('Removing {}'.format(identifier))
+
+        try:
+            if self.routed:
+                index = self.locate(identifier)
+            else:
+                index = self.name
+            self.es.delete(index=index, id=identifier)
+        except (exceptions.NotFoundError, TileNotFoundError):
+            LOGGER.warning('Could not remove document with id: {}'.format(
+                identifier))
+            return 404
+        except Exception as err:
+            LOGGER.exception('Error removing {}: {}'.format(identifier, err))
+            return 500
+
+        return 200
+
+    def purge(self, model, before, requests_per_second=None):
+        """
+        Remove the items of a model older than a given model run
+
+        With rollover indices, whole days older than the model run are
+        dropped (items of the model run day are kept until the day
+        expires), unless the model shares a route with other models;
+        otherwise items are deleted by query.
+
+        :param model: `str` of model name (items of the model and of its
+                      sub-models, e.g. `model_giops_2D`, are removed)
+        :param before: `str` of model run (`DATE_FORMAT`): items with an
+                       older reference datetime are removed
+        :param requests_per_second: `float` of throttle of the delete by
+                                    query (Elasticsearch reindex throttle)
+
+        :returns: `int` of number of removed items
+        """
+
+        LOGGER.info('Purging {} items older than {}'.format(model, before))
+
+        if self.rollover and not self.is_routed(model):
+            return self.purge_indices(model, before)
+
+        field = self.keyword_field('model')
+        query = {
+            'query': {
+                'bool': {
+                    'filter': [{
+                        'bool': {
+                            'should': [
+                                {'term': {field: model}},
+                                {'prefix': {field: '{}_'.format(model)}}
+                            ]
+                        }
+                    }, {
+                        'range': {
+                            'properties.reference_datetime': {
+                                'lt': before
+                            }
+                        }
+                    }]
+                }
+            }
+        }
+
+        kwargs = {}
+        if requests_per_second is not None:
+            kwargs['requests_per_second'] = requests_per_second
+
+        r = self.es.delete_by_query(index=self.name, body=query,
+                                    conflicts='proceed', **kwargs)
+
+        return r['deleted']
+
+    def purge_indices(self, model, before):
+        """
+        Drop the rollover indices of a model of days older than a given
+        model run
+
+        :param model: `str` of model name
+        :param before: `str` of model run (`DATE_FORMAT`)
+
+        :returns: `int` of number of removed items
+        """
+
+        prefix = '{}-'.format(self.name)
+        model = model.lower()
+        day = re.sub('[^0-9]', '', before)[:8]
+
+        indices = []
+        for index in self.es.indices.get_alias(name=self.name):
+            index_model, _, index_day = index[len(prefix):].rpartition('-')
+            if index_model != model and \
+               not index_model.startswith('{}_'.format(model)):
+                continue
+            if index_day < day:
+                indices.append(index)
+
+        if not indices:
+            return 0
+
+        removed = self.es.count(index=','.join(indices))['count']
+        for index in sorted(indices):
+            LOGGER.debug('Dropping index {}'.format(index))
+            self.es.indices.delete(index=index)
+
+        return removed
+
+    def index_name(self, properties):
+        """
+        Get the index of a document
+
+        :param properties: `dict` of document properties (`model`,
+                           `reference_datetime` or `forecast_hour_datetime`)
+
+        :returns: `str` of index name
+        """
+
+        if not self.routed:
+            return self.name
+
+        index = '{}-{}'.format(self.name, self.route(properties.get('model')))
+
+        if not self.rollover:
+            return index
+
+        datetime_ = (properties.get('reference_datetime') or
+                     properties.get('forecast_hour_datetime') or
+                     get_today_and_now())
+
+        return '{}-{}'.format(index, re.sub('[^0-9]', '', datetime_)[:8])
+
+    def route(self, model):
+        """
+        Get the route of a model: the first route matching the model, or
+        the model itself
+
+        :param model: `str` of document model property
+
+        :returns: `str` of route name
+        """
+
+        model = model or 'none'
+
+        route = self.model_routes.get(model)
+        if route is None:
+            route = model.lower()
+            for name, route_def in self.routes.items():
+                if any(fnmatch(model, pattern)
+                       for pattern in route_def.get('models') or []):
+                    route = name
+                    break
+            self.model_routes[model] = route
+
+        return route
+
+    def is_routed(self, model):
+        """
+        Checks whether a model, or any of its sub-models (e.g.
+        `model_giops_2D` of `model_giops`), may share a route with other
+        models
+
+        :param model: `str` of model name
+
+        :returns: `bool` of whether the model is routed
+        """
+
+        prefix = '{}_'.format(model)
+
+        for route_def in self.routes.values():
+            for pattern in route_def.get('models') or []:
+                if any([fnmatch(model, pattern), fnmatch(prefix, pattern),
+                        pattern.startswith(prefix)]):
+                    return True
+
+        return False
+
+    def locate(self, identifier):
+        """
+        Find the index of a document through the tileindex alias
+
+        :param identifier: identifier of document
+
+        :returns: `str` of index name
+        """
+
+        r = self.es.search(index=self.name, body={
+            'query': {
+                'ids': {
+                    'values': [identifier]
+                }
+            },
+            '_source': False
+        }, size=1)
+
+        hits = r['hits']['hits']
+        if not hits:
+            LOGGER.warning('Could not find document with id: {}'.format(
+                identifier))
+            raise TileNotFoundError()
+
+        return hits[0]['_index']
+
+    def field(self, name):
+        """
+        Get the field of a document property to filter on (the date field
+        of dates, the keyword field otherwise)
+
+        :param name: `str` of property name
+
+        :returns: `str` of field name
+        """
+
+        if name in DATE_PROPERTIES:
+            return 'properties.{}'.format(name)
+
+        return self.keyword_field(name)
+
+    def keyword_field(self, name):
+        """
+        Get the keyword field of a document property
+
+        :param name: `str` of property name
+
+        :returns: `str` of field name
+        """
+
+        if self.mapping == 'v1':
+            return 'properties.{}.raw'.format(name)
+
+        return 'properties.{}'.format(name)
+
     def __repr__(self):
         return '<ElasticsearchTileIndex> {}'.format(self.url)
+
+
+def load_routes(routes):
+    """
+    Helper function to load tileindex routes
+
+    Routes are defined by name (lowercase, used in index names), with the
+    `models` routed (fnmatch patterns of the document `model` property) and
+    the index `settings` of the route (e.g. `number_of_shards`,
+    `refresh_interval`), e.g.::
+
+        hrdps:
+            models:
+                - model_hrdps_*
+            settings:
+                number_of_shards: 2
+                refresh_interval: 30s
+
+    :param routes: `dict` of routes, or `str` of path to a YAML file of
+                   routes, if any
+
+    :returns: `dict` of route name to route definition
+    """
+
+    if not routes:
+        return {}
+
+    if isinstance(routes, str):
+        with open(routes) as fh:
+            routes = yaml.load(fh, Loader=yaml.SafeLoader) or {}
+
+    for name in routes:
+        if name != name.lower() or '-' in name:
+            msg = 'Invalid route name {} (lowercase, without -)'.format(name)
+            LOGGER.error(msg)
+            raise TileIndexError(msg)
+
+    return routes
+
+
+def bulk_error(data, err):
+    """
+    Helper function to get the document statuses of a failed bulk request
+
+    :param data: `list` of GeoJSON documents
+    :param err: `Exception` of request error
+
+    :returns: `dict` {layer_id: HTTP status code} of all documents
+    """
+
+    if isinstance(err, exceptions.TransportError):
+        # connection errors have no HTTP status code
+        if isinstance(err.status_code, int):
+            status = err.status_code
+        else:
+            status = 503
+        LOGGER.warning('Error bulk indexing: {}'.format(err))
+    else:
+        status = 500
+        LOGGER.exception('Error bulk indexing: {}'.format(err))
+
+    return {doc['properties']['identifier']: status for doc in data}
+
+
+def backoff(attempt):
+    """
+    Helper function to compute the delay before a bulk retry (exponential
+    backoff with jitter, so that concurrent writers do not retry in step)
+
+    :param attempt: `int` of retry number (starting at 1)
+
+    :returns: `float` of number of seconds
+    """
+
+    delay = min(BULK_BACKOFF_MAX, BULK_BACKOFF * 2 ** (attempt - 1))
+
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class BulkRetry:
+    """
+    Attempts of a bulk request: documents rejected with a transient error
+    are resubmitted, alone, with exponential backoff and jitter, up to
+    `max_retries` times.
+
+    Iterating gives the delay and documents of each attempt, and the
+    statuses of each attempt are merged with `update`, so that requests
+    are sent by the (synchronous or asynchronous) caller.
+    """
+
+    def __init__(self, data, max_retries):
+        """
+        Initialize object
+
+        :param data: `list` of GeoJSON documents
+        :param max_retries: `int` of maximum number of retries
+
+        :returns: `geomet_data_registry.tileindex.elasticsearch_.BulkRetry`
+        """
+
+        self.docs = {doc['properties']['identifier']: doc for doc in data}
+        self.max_retries = max_retries
+        self.status_dict = {}
+        self.pending = list(self.docs)
+
+    def __iter__(self):
+        for attempt in range(self.max_retries + 1):
+            delay = 0
+            if attempt > 0:
+                delay = backoff(attempt)
+                LOGGER.warning('Retrying {} documents in {:.2f}s '
+                               '(retry {}/{})'.format(
+                                   len(self.pending), delay, attempt,
+                                   self.max_retries))
+
+            yield delay, [self.docs[identifier] for identifier in
+                          self.pending]
+
+            if not self.pending:
+                return
+
+        if self.max_retries > 0:
+            LOGGER.error('Cannot index {} documents after {} retries'.format(
+                len(self.pending), self.max_retries))
+
+    def update(self, status_dict):
+        """
+        Merge the statuses of an attempt
+
+        :param status_dict: `dict` {layer_id: HTTP status code} of the
+                            documents of the attempt
+
+        :returns: `None`
+        """
+
+        self.status_dict.update(status_dict)
+        self.pending = [identifier for identifier in self.pending
+                        if self.status_dict[identifier] in
+                        BULK_RETRY_STATUSES]
+
+    def __repr__(self):
+        return '<BulkRetry> {} pending documents'.format(len(self.pending))
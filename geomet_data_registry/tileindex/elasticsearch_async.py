@@ -0,0 +1,469 @@
+###############################################################################
+#
+# Copyright (C) 2021 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+import asyncio
+import atexit
+import logging
+from threading import Thread
+import time
+
+from elasticsearch import AsyncElasticsearch, exceptions
+
+from geomet_data_registry.tileindex.base import TileNotFoundError
+from geomet_data_registry.tileindex.elasticsearch_ import (
+    bulk_error,
+    BulkRetry,
+    ElasticsearchTileIndex,
+    INDEX_RESULTS,
+)
+from geomet_data_registry.util import json_pretty_print
+
+LOGGER = logging.getLogger(__name__)
+
+# default maximum number of concurrent requests
+CONCURRENCY = 8
+
+
+class AsyncElasticsearchTileIndex(ElasticsearchTileIndex):
+    """
+    Elasticsearch TileIndex with asyncio requests.
+
+    Lookups, indexing and updates are coroutines (`<method>_async`) run by
+    an event loop of the tileindex (in a background thread) with an
+    `AsyncElasticsearch` client, with at most `concurrency` requests in
+    flight.  Synchronous methods (lookups, updates) wait for their
+    coroutine, so that layers of many threads share the client; only
+    buffered bulk requests (`bulk_send`, see
+    `geomet_data_registry.tileindex.indexer.BulkIndexer`) are kept in
+    flight concurrently from a single thread.  Administration requests
+    (setup, teardown, purges, queries) use the synchronous client.
+    """
+
+    def __init__(self, provider_def):
+        """
+        Initialize object
+
+        :param provider_def: provider definition `dict`
+
+        :returns: `geomet_data_registry.tileindex.elasticsearch_async.AsyncElasticsearchTileIndex`  # noqa
+        """
+
+        self.concurrency = provider_def.get('concurrency') or CONCURRENCY
+        self.loop = None
+
+        super().__init__(provider_def)
+
+    def connect(self, url_settings):
+        """
+        Connect to Elasticsearch, and start the event loop
+
+        :param url_settings: `dict` of Elasticsearch host settings
+
+        :returns: `elasticsearch.Elasticsearch` client
+        """
+
+        es = super().connect(url_settings)
+
+        self.loop = asyncio.new_event_loop()
+        self.thread = Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+        async def create_client():
+            self.semaphore = asyncio.Semaphore(self.concurrency)
+            return AsyncElasticsearch([url_settings])
+
+        self.async_es = self.run(create_client())
+
+        atexit.register(self.close)
+
+        return es
+
+    def submit(self, coroutine):
+        """
+        Run a coroutine on the event loop
+
+        :param coroutine: coroutine (e.g. of a `<method>_async` method)
+
+        :returns: `concurrent.futures.Future` of the coroutine result
+        """
+
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def run(self, coroutine):
+        """
+        Run a coroutine on the event loop, waiting for its result
+
+        :param coroutine: coroutine (e.g. of a `<method>_async` method)
+
+        :returns: coroutine result
+        """
+
+        return self.submit(coroutine).result()
+
+    async def request(self, method, **kwargs):
+        """
+        Send a request, waiting for a free slot when `concurrency`
+        requests are in flight
+
+        :param method: `AsyncElasticsearch` client method
+        :param kwargs: request parameters
+
+        :returns: `dict` of response
+        """
+
+        async with self.semaphore:
+            return await method(**kwargs)
+
+    def close(self):
+        """
+        Index buffered documents, close the spool and the client, and stop
+        the event loop
+
+        :returns: `None`
+        """
+
+        if self.loop is None or self.loop.is_closed():
+            return
+
+        super().close()
+
+        self.run(self.async_es.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    # synchronous tileindex API, waiting for the coroutines
+
+    def get(self, identifier, model=None, reference_datetime=None):
+        return self.run(self.get_async(identifier, model,
+                                       reference_datetime))
+
+    def mget(self, identifiers, model=None, reference_datetime=None):
+        return self.run(self.mget_async(identifiers, model,
+                                        reference_datetime))
+
+    def add(self, identifier, data):
+        return self.run(self.add_async(identifier, data))
+
+    def bulk_add(self, data):
+        return self.run(self.bulk_add_async(data))
+
+    def bulk_send(self, data):
+        return self.submit(self.bulk_add_async(data))
+
+    def update(self, identifier, update_dict):
+        return self.run(self.update_async(identifier, update_dict))
+
+    def update_by_query(self, query_dict, update_dict,
+                        wait_for_completion=True):
+        return self.run(self.update_by_query_async(
+            query_dict, update_dict, wait_for_completion))
+
+    async def get_async(self, identifier, model=None,
+                        reference_datetime=None):
+        """
+        :param identifier: identifier of document to retrieve
+        :param model: `str` of document model (rollover index hint)
+        :param reference_datetime: `str` of document model run (rollover
+                                   index hint)
+        :returns: `dict` of single GeoJSON feature
+        """
+
+        if self.indexer is not None:
+            doc = self.indexer.get(identifier)
+            if doc is not None:
+                return doc
+
+        if self.routed and None in [model, reference_datetime]:
+            index = await self.locate_async(identifier)
+        else:
+            index = self.index_name({
+                'model': model,
+                'reference_datetime': reference_datetime
+            })
+
+        try:
+            result = await self.request(self.async_es.get, index=index,
+                                        id=identifier)
+            return result['_source']
+        except exceptions.NotFoundError as err:
+            LOGGER.warning('Could not get document with id: {}'.format(err))
+            raise TileNotFoundError()
+
+    async def mget_async(self, identifiers, model=None,
+                         reference_datetime=None):
+        """
+        :param identifiers: `list` of identifiers of documents to retrieve
+        :param model: `str` of documents model (rollover index hint)
+        :param reference_datetime: `str` of documents model run (rollover
+                                   index hint)
+        :returns: `dict` of identifier to GeoJSON feature (documents not
+                  found are not included)
+        """
+
+        docs = {}
+
+        if self.indexer is not None:
+            for identifier in identifiers:
+                doc = self.indexer.get(identifier)
+                if doc is not None:
+                    docs[identifier] = doc
+
+        missing = [identifier for identifier in identifiers
+                   if identifier not in docs]
+        if not missing:
+            return docs
+
+        try:
+            if self.routed and None in [model, reference_datetime]:
+                r = await self.request(self.async_es.search, index=self.name,
+                                       body={
+                                           'query': {
+                                               'ids': {
+                                                   'values': missing
+                                               }
+                                           }
+                                       }, size=len(missing))
+                found = r['hits']['hits']
+            else:
+                index = self.index_name({
+                    'model': model,
+                    'reference_datetime': reference_datetime
+                })
+                r = await self.request(self.async_es.mget, index=index,
+                                       body={'ids': missing})
+                found = [doc for doc in r['docs'] if doc.get('found')]
+        except exceptions.NotFoundError as err:
+            LOGGER.warning('Could not get documents: {}'.format(err))
+            return docs
+
+        for doc in found:
+            docs[doc['_id']] = doc['_source']
+
+        return docs
+
+    async def locate_async(self, identifier):
+        """
+        Find the index of a document through the tileindex alias
+
+        :param identifier: identifier of document
+
+        :returns: `str` of index name
+        """
+
+        r = await self.request(self.async_es.search, index=self.name, body={
+            'query': {
+                'ids': {
+                    'values': [identifier]
+                }
+            },
+            '_source': False
+        }, size=1)
+
+        hits = r['hits']['hits']
+        if not hits:
+            LOGGER.warning('Could not find document with id: {}'.format(
+                identifier))
+            raise TileNotFoundError()
+
+        return hits[0]['_index']
+
+    async def add_async(self, identifier, data):
+        """
+        Add an item to the tileindex
+
+        :param identifier: tileindex item id
+        :param data: GeoJSON dict
+
+        :returns: `int` of status (as per HTTP status codes)
+        """
+
+        if self.spool is not None or self.dedup is not None:
+            status_dict = await self.bulk_add_async([data])
+            return status_dict[data['properties']['identifier']]
+
+        LOGGER.info('Indexing {}'.format(identifier))
+        LOGGER.debug('Data: {}'.format(json_pretty_print(data)))
+        try:
+            r = await self.request(
+                self.async_es.index, index=self.index_name(data['properties']),
+                id=identifier, body=data, pipeline='gdr_register_datetime')
+        except Exception as err:
+            LOGGER.exception('Error indexing {}: {}'.format(identifier, err))
+            return 500
+
+        return INDEX_RESULTS.get(r['result'])
+
+    async def bulk_add_async(self, data):
+        """
+        Add many items to the tileindex (see `bulk_add`)
+
+        :param data: GeoJSON dict
+
+        :returns: `dict` {layer_id: HTTP status code} of all documents
+        """
+
+        if self.dedup is None:
+            return await self.bulk_write_async(data)
+
+        # fingerprints may be kept in the store, off the event loop
+        loop = asyncio.get_running_loop()
+        data, status_dict = await loop.run_in_executor(
+            None, self.dedup.filter, data)
+
+        if data:
+            status_dict.update(await self.bulk_write_async(data))
+            await loop.run_in_executor(None, self.dedup.add, data,
+                                       status_dict)
+
+        return status_dict
+
+    async def bulk_write_async(self, data):
+        """
+        Index many items, through the spool if any (see `bulk_write`)
+
+        :param data: `list` of GeoJSON documents
+
+        :returns: `dict` {layer_id: HTTP status code} of all documents
+        """
+
+        if self.spool is None:
+            return await self.bulk_index_async(data)
+
+        # spool writes are synced to disk, off the event loop
+        status_dict = await asyncio.get_running_loop().run_in_executor(
+            None, self.spool_accept, data)
+        if status_dict is not None:
+            return status_dict
+
+        start = time.monotonic()
+        status_dict = await self.bulk_index_async(
+            data, 0, request_timeout=self.spool_latency)
+
+        return self.spool_failed(data, status_dict,
+                                 time.monotonic() - start)
+
+    async def bulk_index_async(self, data, max_retries=None, **kwargs):
+        """
+        Index many items (see `bulk_index`)
+
+        :param data: `list` of GeoJSON documents
+        :param max_retries: `int` of maximum number of retries (default:
+                            `max_retries`)
+        :param kwargs: bulk request parameters (e.g. `request_timeout`)
+
+        :returns: `dict` {layer_id: HTTP status code} of all documents
+        """
+
+        if max_retries is None:
+            max_retries = self.max_retries
+
+        retry = BulkRetry(data, max_retries)
+
+        for delay, docs in retry:
+            if delay:
+                await asyncio.sleep(delay)
+            retry.update(await self.bulk_request_async(docs, **kwargs))
+
+        return retry.status_dict
+
+    async def bulk_request_async(self, data, **kwargs):
+        """
+        Send a single bulk request
+
+        :param data: `list` of GeoJSON documents
+        :param kwargs: bulk request parameters (e.g. `request_timeout`)
+
+        :returns: `dict` {layer_id: HTTP status code} of all documents
+                  (documents of a failed request get the request status)
+        """
+
+        try:
+            r = await self.request(self.async_es.bulk, index=self.name,
+                                   body=self.bulk_body(data),
+                                   pipeline='gdr_register_datetime',
+                                   **kwargs)
+        except Exception as err:
+            return bulk_error(data, err)
+
+        return self.bulk_result(data, r)
+
+    async def update_async(self, identifier, update_dict):
+        """
+        Update an existing item in the tileindex
+
+        :param identifier: tileindex item id
+        :param update_dict: `dict` of key/value updates
+
+        :returns: `int` of status (as per HTTP status codes)
+        """
+
+        LOGGER.info('Updating {}'.format(identifier))
+
+        try:
+            if self.routed:
+                index = await self.locate_async(identifier)
+            else:
+                index = self.name
+            await self.request(self.async_es.update, index=index,
+                               doc_type=self.type_name, id=identifier,
+                               body={'doc': update_dict})
+        except Exception as err:
+            LOGGER.exception('Error updating {}: {}'.format(identifier, err))
+            return 500
+
+        return 200
+
+    async def update_by_query_async(self, query_dict, update_dict,
+                                    wait_for_completion=True):
+        """
+        Update existing items in the tileindex (see `update_by_query`)
+
+        :param query_dict: `dict` of property name to value, or `list` of
+                           values (all properties must match)
+        :param update_dict: `dict` of property name to value
+        :param wait_for_completion: `bool` of whether to wait for the
+                                    update to complete
+
+        :returns: `int` of status (as per HTTP status codes), or `str` of
+                  task identifier when not waiting for completion
+        """
+
+        LOGGER.info('Updating by query: {}'.format(query_dict))
+        LOGGER.info('update dict: {}'.format(update_dict))
+
+        try:
+            if not self.update_script_stored:
+                # stored with the synchronous client, off the event loop
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self.put_update_script)
+
+            r = await self.request(
+                self.async_es.update_by_query, index=self.name,
+                body=self.update_by_query_body(query_dict, update_dict),
+                conflicts='proceed', slices='auto',
+                wait_for_completion=wait_for_completion)
+        except Exception as err:
+            LOGGER.exception('Error updating by query: {}'.format(err))
+            return 500
+
+        return self.update_by_query_result(r, wait_for_completion)
+
+    def __repr__(self):
+        return '<AsyncElasticsearchTileIndex> {}'.format(self.url)
@@ -0,0 +1,313 @@
+###############################################################################
+#
+# Copyright (C) 2021 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+import atexit
+from collections import deque
+from concurrent.futures import Future
+import logging
+from threading import Condition, Thread
+import time
+
+from geomet_data_registry.metrics import METRICS
+from geomet_data_registry.util import feature_json
+
+LOGGER = logging.getLogger(__name__)
+
+
+class BulkIndexer:
+    """
+    Buffered, asynchronous bulk indexer.
+
+    Documents submitted by many files are accumulated and indexed by a
+    background thread with a single bulk request, when the buffer reaches
+    `max_docs` documents or `max_bytes` bytes, or when its oldest document
+    is `max_age` seconds old.  Submitting returns a future of the status
+    of the submitted documents, which are resolved (and their callbacks
+    run) in submission order.  Documents are available through `get` until
+    they are indexed.
+
+    When `send` is asynchronous (returns a future), up to `max_in_flight`
+    bulk requests are sent concurrently.
+    """
+
+    def __init__(self, send, max_docs=500, max_bytes=5242880, max_age=1.0,
+                 max_in_flight=1):
+        """
+        Initialize object
+
+        :param send: function indexing a `list` of GeoJSON documents, and
+                     returning a `dict` of {identifier: HTTP status code}
+                     or an `int` HTTP status code of all documents
+                     (e.g. `BaseTileIndex.bulk_add`), or a
+                     `concurrent.futures.Future` of either
+        :param max_docs: `int` of maximum number of buffered documents
+        :param max_bytes: `int` of maximum number of buffered bytes
+        :param max_age: `float` of maximum number of seconds a document is
+                        buffered
+        :param max_in_flight: `int` of maximum number of concurrent bulk
+                              requests (of an asynchronous `send`)
+
+        :returns: `geomet_data_registry.tileindex.indexer.BulkIndexer`
+        """
+
+        self.send = send
+        self.max_docs = max_docs
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.max_in_flight = max(1, max_in_flight)
+
+        self.buffer = []
+        self.buffer_docs = 0
+        self.buffer_bytes = 0
+        self.buffer_start = None
+        self.pending = {}
+        self.in_flight = deque()
+        self.flushing = False
+        self.closed = False
+        self.requests = 0
+
+        self.condition = Condition()
+        self.thread = Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+        atexit.register(self.close)
+
+    def submit(self, docs):
+        """
+        Buffer documents for indexing
+
+        :param docs: `list` of GeoJSON documents
+
+        :returns: `concurrent.futures.Future` of `dict` of
+                  {identifier: HTTP status code}
+        """
+
+        future = Future()
+        size = sum(len(feature_json(doc)) for doc in docs)
+
+        with self.condition:
+            # backpressure when documents cannot be indexed fast enough
+            while self.buffer_docs >= self.max_docs * 10 and not self.closed:
+                self.condition.wait()
+
+            if self.closed:
+                raise RuntimeError('Bulk indexer is closed')
+
+            if not self.buffer:
+                self.buffer_start = time.monotonic()
+
+            self.buffer.append((docs, future))
+            self.buffer_docs += len(docs)
+            self.buffer_bytes += size
+            for doc in docs:
+                self.pending[doc['properties']['identifier']] = doc
+
+            # wake up the indexer thread to (re)schedule indexing
+            if any([len(self.buffer) == 1,
+                    self.buffer_docs >= self.max_docs,
+                    self.buffer_bytes >= self.max_bytes]):
+                self.condition.notify_all()
+
+        return future
+
+    def get(self, identifier):
+        """
+        Get a document not indexed yet
+
+        :param identifier: tileindex item identifier
+
+        :returns: `dict` of GeoJSON document, or `None` if the document
+                  is not pending
+        """
+
+        with self.condition:
+            return self.pending.get(identifier)
+
+    def flush(self):
+        """
+        Index all buffered documents, waiting for completion
+
+        :returns: `None`
+        """
+
+        with self.condition:
+            self.flushing = True
+            self.condition.notify_all()
+            while self.pending:
+                self.condition.wait()
+            self.flushing = False
+
+    def close(self):
+        """
+        Index all buffered documents and stop the indexer thread
+
+        :returns: `None`
+        """
+
+        atexit.unregister(self.close)
+
+        with self.condition:
+            if self.closed:
+                return
+            self.closed = True
+            self.condition.notify_all()
+
+        self.thread.join()
+
+    def is_due(self):
+        """
+        Checks whether the buffer is due for indexing (lock held)
+
+        :returns: `bool` of whether the buffer is to be indexed
+        """
+
+        if not self.buffer:
+            return False
+
+        return any([self.flushing, self.closed,
+                    self.buffer_docs >= self.max_docs,
+                    self.buffer_bytes >= self.max_bytes,
+                    time.monotonic() - self.buffer_start >= self.max_age])
+
+    def run(self):
+        """
+        Indexer thread: index the buffer when due, and resolve indexed
+        buffers in order, until closed
+
+        :returns: `None`
+        """
+
+        while True:
+            with self.condition:
+                while not self.is_due() and not self.is_indexed():
+                    if all([self.closed, not self.buffer,
+                            not self.in_flight]):
+                        return
+                    if self.buffer:
+                        timeout = self.buffer_start + self.max_age - \
+                            time.monotonic()
+                    else:
+                        timeout = None
+                    self.condition.wait(timeout)
+
+                buffer = None
+                if self.is_due() and len(self.in_flight) < self.max_in_flight:
+                    buffer = self.buffer
+                    self.buffer = []
+                    self.buffer_docs = 0
+                    self.buffer_bytes = 0
+                    self.condition.notify_all()
+
+            if buffer is not None:
+                self.in_flight.append((buffer, self.index(buffer)))
+
+            # wait for the oldest request when no more can be sent
+            self.resolve(wait=buffer is None)
+
+    def is_indexed(self):
+        """
+        Checks whether the oldest bulk request in flight is complete
+
+        :returns: `bool` of whether a buffer is to be resolved
+        """
+
+        return bool(self.in_flight) and self.in_flight[0][1].done()
+
+    def index(self, buffer):
+        """
+        Index buffered documents with a single request
+
+        :param buffer: `list` of (documents, future) tuples
+
+        :returns: `concurrent.futures.Future` of the request result
+        """
+
+        docs = [doc for docs, future in buffer for doc in docs]
+
+        LOGGER.debug('Indexing {} buffered documents'.format(len(docs)))
+        try:
+            with METRICS.span('tileindex_flush'):
+                result = self.send(docs)
+            self.requests += 1
+        except Exception as err:
+            LOGGER.error('Error indexing buffered documents: {}'.format(err))
+            result = 500
+
+        if not isinstance(result, Future):
+            future = Future()
+            future.set_result(result)
+            result = future
+
+        result.add_done_callback(self.notify)
+
+        return result
+
+    def notify(self, future=None):
+        """
+        Wakes up the indexer thread
+
+        :param future: `concurrent.futures.Future` of a completed request
+
+        :returns: `None`
+        """
+
+        with self.condition:
+            self.condition.notify_all()
+
+    def resolve(self, wait=False):
+        """
+        Resolve the futures of indexed buffers, in submission order
+
+        :param wait: `bool` of whether to wait for the oldest request
+
+        :returns: `None`
+        """
+
+        while self.in_flight and (wait or self.in_flight[0][1].done()):
+            wait = False
+            buffer, request = self.in_flight.popleft()
+
+            try:
+                result = request.result()
+            except Exception as err:
+                LOGGER.error('Error indexing buffered documents: '
+                             '{}'.format(err))
+                result = 500
+
+            for docs_, future in buffer:
+                if isinstance(result, dict):
+                    status = {doc['properties']['identifier']: result.get(
+                        doc['properties']['identifier'], 500)
+                        for doc in docs_}
+                else:
+                    status = {doc['properties']['identifier']: result
+                              for doc in docs_}
+                future.set_result(status)
+
+            with self.condition:
+                for docs, future in buffer:
+                    for doc in docs:
+                        identifier = doc['properties']['identifier']
+                        if self.pending.get(identifier) is doc:
+                            del self.pending[identifier]
+                self.condition.notify_all()
+
+    def __repr__(self):
+        return '<BulkIndexer> {} buffered documents'.format(
+            self.buffer_docs)
@@ -0,0 +1,218 @@
+###############################################################################
+#
+# Copyright (C) 2021 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+from datetime import datetime, timedelta, timezone
+import logging
+import re
+from threading import Event, Thread
+
+from geomet_data_registry.layer.base import list_models, MODEL_CONFIG_CACHE
+from geomet_data_registry.util import DATE_FORMAT
+
+LOGGER = logging.getLogger(__name__)
+
+# store model run count keys ({model}_{wx_variable}_{model_run}_count)
+COUNT_KEY_REGEX = '^geomet-data-registry_{}_(.+)_(\\d{{2}}Z)_count$'
+
+
+class RetentionPurger:
+    """
+    Retention purge of the tileindex and store.
+
+    Items of a model older than its `model_run_retention_hours` are removed
+    from the tileindex, and the count keys of variables and model runs no
+    longer configured are removed from the store.  Models without
+    retention are left untouched.  Removals are throttled, and models are
+    purged one after the other with a pause in between, so that purging
+    does not compete with ingest.
+    """
+
+    def __init__(self, tileindex, store, requests_per_second=None,
+                 pause=1.0):
+        """
+        Initialize object
+
+        :param tileindex: tileindex plugin
+        :param store: store plugin
+        :param requests_per_second: `float` of throttle of tileindex
+                                    removals, if supported by the tileindex
+        :param pause: `float` of number of seconds between models
+
+        :returns: `geomet_data_registry.tileindex.purge.RetentionPurger`
+        """
+
+        self.tileindex = tileindex
+        self.store = store
+        self.requests_per_second = requests_per_second
+        self.pause = pause
+        self.stopped = Event()
+        self.thread = None
+
+    def models(self):
+        """
+        List the models configured in the store
+
+        :returns: `list` of model names
+        """
+
+        models = list_models(self.store)
+
+        if not models:
+            LOGGER.warning('No model configuration found in store')
+
+        return models
+
+    def purge(self, models=None, now=None):
+        """
+        Purge expired items and stale count keys
+
+        :param models: `list` of model names (default: all models)
+        :param now: `datetime.datetime` of reference time (UTC, default:
+                    now)
+
+        :returns: `dict` of model name to number of removed items (models
+                  without retention are not included)
+        """
+
+        now = now or datetime.now(timezone.utc)
+        summary = {}
+
+        for i, model in enumerate(models or self.models()):
+            if self.stopped.is_set():
+                break
+            if i > 0 and self.stopped.wait(self.pause):
+                break
+
+            try:
+                config = MODEL_CONFIG_CACHE.get(self.store, model)[model]
+            except Exception as err:
+                LOGGER.warning('Cannot load {} configuration: {}'.format(
+                    model, err))
+                continue
+
+            retention_hours = config.get('model_run_retention_hours')
+            if retention_hours is None:
+                LOGGER.debug('No retention for {}'.format(model))
+                continue
+
+            before = (now - timedelta(hours=retention_hours)).strftime(
+                DATE_FORMAT)
+
+            try:
+                summary[model] = self.tileindex.purge(
+                    model, before, self.requests_per_second)
+            except Exception as err:
+                LOGGER.error('Cannot purge {}: {}'.format(model, err))
+                continue
+
+            self.purge_count_keys(model, config)
+
+            LOGGER.info('Purged {} {} items older than {}'.format(
+                summary[model], model, before))
+
+        return summary
+
+    def purge_count_keys(self, model, config):
+        """
+        Remove the count keys of variables or model runs of a model which
+        are no longer configured
+
+        :param model: `str` of model name
+        :param config: `dict` of model configuration
+
+        :returns: `list` of removed keys
+        """
+
+        configured = set(find_model_runs(config))
+        if not configured:
+            return []
+
+        regex = re.compile(COUNT_KEY_REGEX.format(re.escape(model)))
+        removed = []
+
+        for key in self.store.list_keys(
+                'geomet-data-registry_{}_*_count'.format(model)):
+            match = regex.match(key)
+            if match is None or match.groups() in configured:
+                continue
+            LOGGER.debug('Removing stale count key {}'.format(key))
+            self.store.delete_key(key, raw=True)
+            removed.append(key)
+
+        return removed
+
+    def start(self, interval, models=None):
+        """
+        Purge periodically in a background thread
+
+        :param interval: `float` of number of seconds between purges
+        :param models: `list` of model names (default: all models)
+
+        :returns: `None`
+        """
+
+        def run():
+            while not self.stopped.wait(interval):
+                try:
+                    self.purge(models)
+                except Exception as err:
+                    LOGGER.error('Purge failed: {}'.format(err))
+
+        self.stopped.clear()
+        self.thread = Thread(target=run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stop purging
+
+        :returns: `None`
+        """
+
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def __repr__(self):
+        return '<RetentionPurger> {}'.format(self.tileindex)
+
+
+def find_model_runs(config):
+    """
+    Helper function to find the (variable, model run) pairs of a model
+    configuration (including nested configurations, e.g. GIOPS dimensions
+    or REPS products/members)
+
+    :param config: `dict` of model configuration
+
+    :returns: generator of (variable, model run) tuples
+    """
+
+    if not isinstance(config, dict):
+        return
+
+    for key, value in config.items():
+        if key == 'variable' and isinstance(value, dict):
+            for variable, variable_config in value.items():
+                model_runs = (variable_config or {}).get('model_run') or {}
+                for model_run in model_runs:
+                    yield variable, model_run
+        elif isinstance(value, dict):
+            yield from find_model_runs(value)
@@ -0,0 +1,398 @@
+###############################################################################
+#
+# Copyright (C) 2021 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+import json
+import logging
+import os
+import re
+from threading import Event, Lock, Thread
+import time
+
+from geomet_data_registry.util import feature_json
+
+LOGGER = logging.getLogger(__name__)
+
+# maximum size (bytes) of a segment file before a new one is started
+SEGMENT_BYTES = 67108864
+
+# segments are synced to disk every SYNC_DOCS documents or SYNC_INTERVAL
+# seconds, whichever comes first
+SYNC_DOCS = 1000
+SYNC_INTERVAL = 1.0
+
+# number of documents replayed per bulk request
+REPLAY_BATCH_DOCS = 5000
+
+# segment files (<time in ns>-<pid>.ndjson), suffixed with .open while
+# being written
+SEGMENT_REGEX = re.compile(r'^(\d+)-(\d+)\.ndjson(\.open)?$')
+
+
+class Spool:
+    """
+    Local write-ahead spool of tileindex documents.
+
+    Documents are appended (one GeoJSON feature per line) to segment
+    files of a spool directory, synced to disk in batches.  Each process
+    writes its own open segment; closed segments are replayed, oldest
+    first, and removed once indexed.  Segments left open by a process
+    which is no longer running are closed when a spool is opened.
+
+    Documents are indexed in order per process: while this process has
+    documents pending in the spool, its documents are spooled as well.
+    Processes sharing a spool directory do not coordinate: a document
+    indexed directly by one process may be overwritten by an older
+    version of it replayed from the segment of another process.
+    """
+
+    def __init__(self, path, segment_bytes=SEGMENT_BYTES,
+                 sync_docs=SYNC_DOCS, sync_interval=SYNC_INTERVAL):
+        """
+        Initialize object
+
+        :param path: `str` of spool directory
+        :param segment_bytes: `int` of maximum size of a segment file
+        :param sync_docs: `int` of maximum number of unsynced documents
+        :param sync_interval: `float` of maximum number of seconds between
+                              syncs
+
+        :returns: `geomet_data_registry.tileindex.spool.Spool`
+        """
+
+        self.path = path
+        self.segment_bytes = segment_bytes
+        self.sync_docs = sync_docs
+        self.sync_interval = sync_interval
+
+        self.file = None
+        # whether this process has documents not replayed yet (tracked in
+        # memory, so that writes do not list the spool directory)
+        self.pending = False
+        self.unsynced = 0
+        self.synced = time.monotonic()
+        self.lock = Lock()
+        # serializes replays (of a background replayer and of the CLI)
+        self.replay_lock = Lock()
+
+        os.makedirs(self.path, exist_ok=True)
+        self.recover()
+        self.pending = bool(self.segments())
+
+    def recover(self):
+        """
+        Close the segments left open by processes no longer running
+
+        :returns: `list` of closed segment filenames
+        """
+
+        closed = []
+
+        for filename in os.listdir(self.path):
+            match = SEGMENT_REGEX.match(filename)
+            if match is None or match.group(3) is None:
+                continue
+            if is_running(int(match.group(2))):
+                continue
+
+            LOGGER.warning('Recovering spool segment {}'.format(filename))
+            filepath = os.path.join(self.path, filename)
+            os.replace(filepath, filepath[:-len('.open')])
+            closed.append(filename[:-len('.open')])
+
+        return closed
+
+    def append(self, docs):
+        """
+        Append documents to the open segment
+
+        :param docs: `list` of GeoJSON documents
+
+        :returns: `None`
+        """
+
+        data = b''.join(feature_json(doc) + b'\n' for doc in docs)
+
+        with self.lock:
+            self.write(data, len(docs))
+
+    def accept(self, docs, force=False):
+        """
+        Append documents if the spool holds documents of this process not
+        replayed yet, so that documents of this process are indexed in
+        order
+
+        :param docs: `list` of GeoJSON documents
+        :param force: `bool` of whether to append documents to an empty
+                      spool (e.g. when the tileindex is degraded)
+
+        :returns: `bool` of whether documents were appended
+        """
+
+        data = b''.join(feature_json(doc) + b'\n' for doc in docs)
+
+        with self.lock:
+            if not force and not self.is_pending():
+                return False
+            self.write(data, len(docs))
+
+        return True
+
+    def write(self, data, docs):
+        """
+        Write to the open segment, syncing and rotating as needed (lock
+        held)
+
+        :param data: `bytes` of NDJSON documents
+        :param docs: `int` of number of documents
+
+        :returns: `None`
+        """
+
+        if self.file is None:
+            filename = '{}-{}.ndjson.open'.format(time.time_ns(), os.getpid())
+            LOGGER.info('Spooling documents to {}'.format(filename))
+            self.file = open(os.path.join(self.path, filename), 'ab')
+            self.pending = True
+
+        self.file.write(data)
+        self.unsynced += docs
+
+        if any([self.unsynced >= self.sync_docs,
+                time.monotonic() - self.synced >= self.sync_interval]):
+            self.sync()
+
+        if self.file.tell() >= self.segment_bytes:
+            self.rotate()
+
+    def sync(self):
+        """
+        Sync the open segment to disk (lock held)
+
+        :returns: `None`
+        """
+
+        if self.file is None:
+            return
+
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.unsynced = 0
+        self.synced = time.monotonic()
+
+    def rotate(self):
+        """
+        Close the open segment, making it available for replay (lock held)
+
+        :returns: `None`
+        """
+
+        if self.file is None:
+            return
+
+        self.sync()
+        file, self.file = self.file, None
+        file.close()
+        os.replace(file.name, file.name[:-len('.open')])
+
+    def segments(self):
+        """
+        List closed segments, oldest first
+
+        :returns: `list` of segment file paths
+        """
+
+        segments = []
+
+        for filename in os.listdir(self.path):
+            match = SEGMENT_REGEX.match(filename)
+            if match is not None and match.group(3) is None:
+                segments.append((int(match.group(1)), filename))
+
+        return [os.path.join(self.path, filename)
+                for time_ns, filename in sorted(segments)]
+
+    def is_pending(self):
+        """
+        Checks whether the spool holds documents not replayed yet (spooled
+        by this process, or found when the spool was opened)
+
+        :returns: `bool` of whether documents are pending
+        """
+
+        return self.pending
+
+    def read(self, segment, batch_docs=REPLAY_BATCH_DOCS):
+        """
+        Read the documents of a segment
+
+        :param segment: `str` of segment file path
+        :param batch_docs: `int` of number of documents per batch
+
+        :returns: generator of `list` of GeoJSON documents
+        """
+
+        batch = []
+
+        with open(segment, 'rb') as fh:
+            for line in fh:
+                try:
+                    batch.append(json.loads(line))
+                except ValueError:
+                    # last line of a segment of an interrupted process
+                    LOGGER.warning('Skipping truncated document of {}'.format(
+                        segment))
+                    continue
+                if len(batch) >= batch_docs:
+                    yield batch
+                    batch = []
+
+        if batch:
+            yield batch
+
+    def replay(self, send, batch_docs=REPLAY_BATCH_DOCS):
+        """
+        Replay spooled documents, oldest first, until the spool is empty
+
+        Documents appended during the replay are replayed as well.  When
+        a batch cannot be indexed, replay stops and its segment is kept
+        (documents of the segment are replayed again on the next replay).
+
+        :param send: function indexing a `list` of GeoJSON documents, and
+                     returning a `bool` of whether documents were indexed
+        :param batch_docs: `int` of number of documents per bulk request
+
+        :returns: `int` of number of replayed documents
+        """
+
+        replayed = 0
+
+        with self.replay_lock:
+            while True:
+                with self.lock:
+                    self.rotate()
+                    segments = self.segments()
+                    if not segments:
+                        self.pending = False
+                        return replayed
+
+                for segment in segments:
+                    try:
+                        for batch in self.read(segment, batch_docs):
+                            if not send(batch):
+                                LOGGER.warning(
+                                    'Cannot replay {}: replayed {} '
+                                    'documents'.format(segment, replayed))
+                                return replayed
+                            replayed += len(batch)
+                        os.remove(segment)
+                    except FileNotFoundError:
+                        # replayed by another process
+                        continue
+
+                    LOGGER.info('Replayed {}'.format(segment))
+
+    def close(self):
+        """
+        Sync and close the open segment
+
+        :returns: `None`
+        """
+
+        with self.lock:
+            self.rotate()
+
+    def __repr__(self):
+        return '<Spool> {}'.format(self.path)
+
+
+class SpoolReplayer:
+    """
+    Background replay of the spool of a tileindex, once the tileindex is
+    reachable again.
+    """
+
+    def __init__(self, tileindex, interval):
+        """
+        Initialize object
+
+        :param tileindex: tileindex plugin (with a spool)
+        :param interval: `float` of number of seconds between replays
+
+        :returns: `geomet_data_registry.tileindex.spool.SpoolReplayer`
+        """
+
+        self.tileindex = tileindex
+        self.interval = interval
+        self.stopped = Event()
+        self.thread = None
+
+    def start(self):
+        """
+        Replay periodically in a background thread
+
+        :returns: `None`
+        """
+
+        def run():
+            while not self.stopped.wait(self.interval):
+                try:
+                    self.tileindex.replay()
+                except Exception as err:
+                    LOGGER.error('Replay failed: {}'.format(err))
+
+        self.stopped.clear()
+        self.thread = Thread(target=run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stop replaying
+
+        :returns: `None`
+        """
+
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def __repr__(self):
+        return '<SpoolReplayer> {}'.format(self.tileindex)
+
+
+def is_running(pid):
+    """
+    Helper function to check whether a process is running
+
+    :param pid: `int` of process identifier
+
+    :returns: `bool` of whether the process is running
+    """
+
+    if pid == os.getpid():
+        return True
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+    return True
@@ -0,0 +1,682 @@
+###############################################################################
+#
+# Copyright (C) 2021 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+from contextlib import contextmanager
+import json
+import logging
+import os
+import sqlite3
+from threading import Lock
+import time
+
+from geomet_data_registry.tileindex.base import (
+    BaseTileIndex,
+    TileIndexError,
+    TileNotFoundError,
+)
+from geomet_data_registry.util import get_today_and_now, json_serial
+
+LOGGER = logging.getLogger(__name__)
+
+# document properties stored (and indexed) in their own columns
+INDEXED_PROPERTIES = [
+    'identifier',
+    'layer',
+    'forecast_hour_datetime',
+    'reference_datetime'
+]
+
+# model of an item (as indexed by items_model: queries must use this exact
+# expression for SQLite to use the index)
+MODEL_EXPRESSION = "json_extract(document, '$.properties.model')"
+
+# maximum number of items removed per transaction when purging
+PURGE_BATCH_SIZE = 1000
+
+# number of items fetched per query when scanning
+SCAN_PAGE_SIZE = 1000
+
+SCHEMA = [
+    '''CREATE TABLE items (
+        id INTEGER PRIMARY KEY,
+        identifier TEXT NOT NULL UNIQUE,
+        layer TEXT,
+        forecast_hour_datetime TEXT,
+        reference_datetime TEXT,
+        document TEXT NOT NULL
+    )''',
+    '''CREATE INDEX items_layer
+        ON items (layer, forecast_hour_datetime)''',
+    '''CREATE INDEX items_forecast_hour_datetime
+        ON items (forecast_hour_datetime)''',
+    '''CREATE INDEX items_reference_datetime
+        ON items (reference_datetime)''',
+    '''CREATE INDEX items_model
+        ON items ({}, reference_datetime)'''.format(MODEL_EXPRESSION),
+    '''CREATE VIRTUAL TABLE items_geometry
+        USING rtree(id, minx, maxx, miny, maxy)'''
+]
+
+
+class SQLiteTileIndex(BaseTileIndex):
+    """
+    SQLite TileIndex
+
+    An embedded tileindex (one database file, `<url>/<name>.db`) for
+    deployments without Elasticsearch (e.g. edge nodes, CI, benchmarks).
+    The database runs in WAL mode, so that readers do not block the
+    (single) writer, and writes of many documents are done in a single
+    transaction.  Item geometries are indexed in an R*Tree.
+    """
+
+    def __init__(self, provider_def):
+        """
+        Initialize object
+
+        :param provider_def: provider definition `dict`
+
+        :returns: `geomet_data_registry.tileindex.sqlite_.SQLiteTileIndex`
+        """
+
+        super().__init__(provider_def)
+
+        self.database = '{}.db'.format(self.fullpath)
+        self.lock = Lock()
+
+        LOGGER.debug('Connecting to {}'.format(self.database))
+        try:
+            # transactions are managed explicitly (see transaction())
+            self.connection = sqlite3.connect(
+                self.database, timeout=30, isolation_level=None,
+                check_same_thread=False)
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute('PRAGMA synchronous=NORMAL')
+        except sqlite3.Error as err:
+            msg = 'Cannot open {}: {}'.format(self.database, err)
+            LOGGER.error(msg)
+            raise TileIndexError(msg)
+
+    def exists(self):
+        """
+        Checks whether the tileindex tables exist
+
+        :returns: `bool` of whether the tileindex exists
+        """
+
+        with self.lock:
+            r = self.connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' "
+                "AND name = 'items'").fetchone()
+
+        return r is not None
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run statements in a write transaction (committed on success, rolled
+        back on error)
+
+        :returns: `sqlite3.Connection` in a transaction
+        """
+
+        with self.lock:
+            # take the write lock upfront, so that concurrent writers
+            # (e.g. other processes) wait instead of failing to upgrade
+            self.connection.execute('BEGIN IMMEDIATE')
+            try:
+                yield self.connection
+            except BaseException:
+                self.connection.execute('ROLLBACK')
+                raise
+            self.connection.execute('COMMIT')
+
+    def setup(self):
+        """
+        Create the tileindex
+
+        :returns: `bool` of process status
+        """
+
+        if self.exists():
+            msg = 'Index exists'
+            LOGGER.error(msg)
+            raise TileIndexError(msg)
+
+        LOGGER.info('Creating index {}'.format(self.database))
+
+        with self.transaction() as connection:
+            for statement in SCHEMA:
+                connection.execute(statement)
+
+        return True
+
+    def teardown(self):
+        """
+        Delete the tileindex
+
+        :returns: `bool` of process status
+        """
+
+        if not self.exists():
+            msg = 'Index {} does not exist'.format(self.database)
+            LOGGER.error(msg)
+            raise TileIndexError(msg)
+
+        LOGGER.info('Deleting index {}'.format(self.database))
+
+        with self.transaction() as connection:
+            connection.execute('DROP TABLE items_geometry')
+            connection.execute('DROP TABLE items')
+
+        with self.lock:
+            self.connection.close()
+            for suffix in ['', '-wal', '-shm']:
+                if os.path.exists(self.database + suffix):
+                    os.remove(self.database + suffix)
+
+        return True
+
+    def ping(self):
+        """
+        Health check the tileindex connection
+
+        :returns: `bool` of whether the tileindex is reachable
+        """
+
+        try:
+            with self.lock:
+                self.connection.execute('SELECT 1')
+        except sqlite3.Error:
+            return False
+
+        return True
+
+    def scan(self, query_dict=None, bbox=None, limit=None, ranges=None,
+             fields=None):
+        """
+        Query the tileindex, streaming features page by page (in constant
+        memory)
+
+        :param query_dict: `dict` of property name to value, or `list` of
+                           values (`*` and `?` wildcards are supported)
+        :param bbox: `list` of minx, miny, maxx, maxy
+        :param limit: `int` of maximum number of features
+        :param ranges: `dict` of property name to `tuple` of minimum and
+                       maximum values (inclusive, `None` if unbounded)
+        :param fields: `list` of property names to return (default: all
+                       properties and geometry)
+
+        :returns: generator of GeoJSON features
+        """
+
+        sql = 'SELECT items.id, items.document FROM items'
+        where, parameters = where_clause(query_dict, ranges)
+
+        if bbox is not None:
+            sql += ' JOIN items_geometry ON items_geometry.id = items.id'
+            where.extend(['items_geometry.maxx >= ?',
+                          'items_geometry.minx <= ?',
+                          'items_geometry.maxy >= ?',
+                          'items_geometry.miny <= ?'])
+            parameters.extend([bbox[0], bbox[2], bbox[1], bbox[3]])
+
+        # keyset pagination: pages start after the last item returned
+        sql += ' WHERE {} ORDER BY items.id LIMIT ?'.format(
+            ' AND '.join(where + ['items.id > ?']))
+
+        last_id = 0
+        count = 0
+        while limit is None or count < limit:
+            size = SCAN_PAGE_SIZE
+            if limit is not None:
+                size = min(size, limit - count)
+
+            with self.lock:
+                rows = self.connection.execute(
+                    sql, parameters + [last_id, size]).fetchall()
+
+            for id_, document in rows:
+                yield select_fields(json.loads(document), fields)
+
+            count += len(rows)
+            if len(rows) < size:
+                return
+
+            last_id = rows[-1][0]
+
+    def get(self, identifier, model=None, reference_datetime=None):
+        """
+        :param identifier: identifier of document to retrieve
+        :param model: `str` of document model (unused)
+        :param reference_datetime: `str` of document model run (unused)
+        :returns: `dict` of single GeoJSON feature
+        """
+
+        if self.indexer is not None:
+            doc = self.indexer.get(identifier)
+            if doc is not None:
+                return doc
+
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT document FROM items WHERE identifier = ?',
+                (identifier,)).fetchone()
+
+        if row is None:
+            LOGGER.warning('Could not get document with id: {}'.format(
+                identifier))
+            raise TileNotFoundError()
+
+        return json.loads(row[0])
+
+    def mget(self, identifiers, model=None, reference_datetime=None):
+        """
+        :param identifiers: `list` of identifiers of documents to retrieve
+        :param model: `str` of documents model (unused)
+        :param reference_datetime: `str` of documents model run (unused)
+        :returns: `dict` of identifier to GeoJSON feature (documents not
+                  found are not included)
+        """
+
+        docs = {}
+
+        if self.indexer is not None:
+            for identifier in identifiers:
+                doc = self.indexer.get(identifier)
+                if doc is not None:
+                    docs[identifier] = doc
+
+        missing = [identifier for identifier in identifiers
+                   if identifier not in docs]
+        if not missing:
+            return docs
+
+        with self.lock:
+            rows = self.connection.execute(
+                'SELECT identifier, document FROM items WHERE identifier '
+                'IN ({})'.format(', '.join('?' * len(missing))),
+                missing).fetchall()
+
+        for identifier, document in rows:
+            docs[identifier] = json.loads(document)
+
+        return docs
+
+    def add(self, identifier, data):
+        """
+        Add an item to the tileindex
+
+        :param identifier: tileindex item id
+        :param data: GeoJSON dict
+
+        :returns: `int` of status (as per HTTP status codes)
+        """
+
+        LOGGER.info('Indexing {}'.format(identifier))
+        try:
+            with self.transaction() as connection:
+                return self.index(connection, identifier, data)
+        except sqlite3.Error as err:
+            LOGGER.exception('Error indexing {}: {}'.format(identifier, err))
+            return 500
+
+    def bulk_add(self, data):
+        """
+        Add many items to the tileindex (in a single transaction)
+
+        :param data: GeoJSON dict
+
+        :returns: `dict` {layer_id: HTTP status code} of all documents
+        """
+
+        LOGGER.debug('Starting bulk add')
+        status_dict = {}
+        try:
+            with self.transaction() as connection:
+                for doc in data:
+                    identifier = doc['properties']['identifier']
+                    status_dict[identifier] = self.index(
+                        connection, identifier, doc)
+        except sqlite3.Error as err:
+            LOGGER.exception('Error bulk indexing: {}'.format(err))
+            return {doc['properties']['identifier']: 500 for doc in data}
+
+        return status_dict
+
+    def index(self, connection, identifier, data):
+        """
+        Insert or replace an item (in a transaction)
+
+        :param connection: `sqlite3.Connection` in a transaction
+        :param identifier: tileindex item id
+        :param data: GeoJSON dict
+
+        :returns: `int` of status (201 if created, 200 if updated)
+        """
+
+        # as per the gdr_register_datetime pipeline of Elasticsearch
+        properties = dict(data['properties'],
+                          register_datetime=get_today_and_now())
+        document = json.dumps(dict(data, properties=properties),
+                              default=json_serial)
+
+        row = connection.execute('SELECT id FROM items WHERE identifier = ?',
+                                 (identifier,)).fetchone()
+
+        values = [properties.get(key) for key in INDEXED_PROPERTIES[1:]]
+
+        if row is None:
+            cursor = connection.execute(
+                'INSERT INTO items (identifier, layer, '
+                'forecast_hour_datetime, reference_datetime, document) '
+                'VALUES (?, ?, ?, ?, ?)', [identifier] + values + [document])
+            id_ = cursor.lastrowid
+            status = 201
+        else:
+            id_ = row[0]
+            connection.execute(
+                'UPDATE items SET layer = ?, forecast_hour_datetime = ?, '
+                'reference_datetime = ?, document = ? WHERE id = ?',
+                values + [document, id_])
+            status = 200
+
+        connection.execute('DELETE FROM items_geometry WHERE id = ?', (id_,))
+        bbox = geometry_bbox(data.get('geometry'))
+        if bbox is not None:
+            connection.execute(
+                'INSERT INTO items_geometry VALUES (?, ?, ?, ?, ?)',
+                (id_, bbox[0], bbox[2], bbox[1], bbox[3]))
+
+        return status
+
+    def update(self, identifier, update_dict):
+        """
+        Update an existing item in the tileindex
+
+        :param identifier: tileindex item id
+        :param data: Python dictionnary
+
+        :returns: `int` of status (as per HTTP status codes)
+        """
+
+        LOGGER.info('Updating {}'.format(identifier))
+
+        try:
+            with self.transaction() as connection:
+                row = connection.execute(
+                    'SELECT document FROM items WHERE identifier = ?',
+                    (identifier,)).fetchone()
+                if row is None:
+                    LOGGER.error('Cannot update {}: not found'.format(
+                        identifier))
+                    return 404
+
+                data = merge(json.loads(row[0]), update_dict)
+                properties = data.get('properties', {})
+                connection.execute(
+                    'UPDATE items SET layer = ?, forecast_hour_datetime = ?, '
+                    'reference_datetime = ?, document = ? '
+                    'WHERE identifier = ?',
+                    [properties.get(key) for key in INDEXED_PROPERTIES[1:]] +
+                    [json.dumps(data, default=json_serial), identifier])
+        except sqlite3.Error as err:
+            LOGGER.exception('Error updating {}: {}'.format(identifier, err))
+            return 500
+
+        return 200
+
+    def update_by_query(self, query_dict, update_dict,
+                        wait_for_completion=True):
+        """
+        Update existing items in the tileindex
+
+        :param query_dict: `dict` of property name to value, or `list` of
+                           values (`*` and `?` wildcards are supported)
+        :param update_dict: `dict` of property name to value
+        :param wait_for_completion: `bool` (unused: updates are
+                                    synchronous)
+
+        :returns: `int` of status (as per HTTP status codes)
+        """
+
+        LOGGER.info('Updating by query: {}'.format(query_dict))
+        LOGGER.info('update dict: {}'.format(update_dict))
+
+        # all properties are set in one json_set() call (a column can only
+        # be assigned once per UPDATE), and values are bound as JSON so that
+        # e.g. booleans, lists or objects are not stored as strings
+        paths = []
+        parameters = []
+        for key, value in update_dict.items():
+            paths.append('?, json(?)')
+            parameters.extend(['$.properties.{}'.format(key),
+                               json.dumps(value, default=json_serial)])
+
+        assignments = ['document = json_set(document, {})'.format(
+            ', '.join(paths))]
+        for key, value in update_dict.items():
+            if key in INDEXED_PROPERTIES:
+                assignments.append('{} = ?'.format(key))
+                parameters.append(value)
+
+        where, where_parameters = where_clause(query_dict)
+        sql = 'UPDATE items SET {}'.format(', '.join(assignments))
+        if where:
+            sql += ' WHERE {}'.format(' AND '.join(where))
+
+        try:
+            with self.transaction() as connection:
+                connection.execute(sql, parameters + where_parameters)
+        except sqlite3.Error as err:
+            LOGGER.exception('Error updating by query: {}'.format(err))
+            return 500
+
+        return 200
+
+    def remove(self, identifier):
+        """
+        Remove an item from the tileindex
+
+        :param identifier: tileindex item identifier
+
+        :returns: `int` of status (as per HTTP status codes)
+        """
+
+        LOGGER.info('Removing {}'.format(identifier))
+
+        try:
+            with self.transaction() as connection:
+                row = connection.execute(
+                    'SELECT id FROM items WHERE identifier = ?',
+                    (identifier,)).fetchone()
+                if row is None:
+                    return 404
+                connection.execute('DELETE FROM items_geometry WHERE id = ?',
+                                   row)
+                connection.execute('DELETE FROM items WHERE id = ?', row)
+        except sqlite3.Error as err:
+            LOGGER.exception('Error removing {}: {}'.format(identifier, err))
+            return 500
+
+        return 200
+
+    def purge(self, model, before, requests_per_second=None):
+        """
+        Remove the items of a model older than a given model run (in
+        transactions of `PURGE_BATCH_SIZE` items, so that writers are not
+        blocked for long)
+
+        :param model: `str` of model name (items of the model and of its
+                      sub-models, e.g. `model_giops_2D`, are removed)
+        :param before: `str` of model run (`DATE_FORMAT`): items with an
+                       older reference datetime are removed
+        :param requests_per_second: `float` of maximum number of removed
+                                    items per second
+
+        :returns: `int` of number of removed items
+        """
+
+        LOGGER.info('Purging {} items older than {}'.format(model, before))
+
+        removed = 0
+        while True:
+            with self.transaction() as connection:
+                ids = [row[0] for row in connection.execute(
+                    # sub-models (`<model>_*`) are matched by range, up to
+                    # the character following `_`, rather than by GLOB so
+                    # that both conditions use the items_model index
+                    'SELECT id FROM items WHERE reference_datetime < ? '
+                    'AND ({0} = ? OR ({0} >= ? AND {0} < ?)) '
+                    'LIMIT ?'.format(MODEL_EXPRESSION),
+                    (before, model, '{}_'.format(model),
+                     '{}`'.format(model), PURGE_BATCH_SIZE))]
+                for table in ['items_geometry', 'items']:
+                    connection.executemany(
+                        'DELETE FROM {} WHERE id = ?'.format(table),
+                        [(id_,) for id_ in ids])
+
+            removed += len(ids)
+            if len(ids) < PURGE_BATCH_SIZE:
+                return removed
+
+            if requests_per_second:
+                time.sleep(len(ids) / requests_per_second)
+
+    def __repr__(self):
+        return '<SQLiteTileIndex> {}'.format(self.database)
+
+
+def where_clause(query_dict=None, ranges=None):
+    """
+    Helper function to build the conditions of a property query
+
+    :param query_dict: `dict` of property name to value, or `list` of
+                       values (`*` and `?` wildcards are supported)
+    :param ranges: `dict` of property name to `tuple` of minimum and
+                   maximum values (inclusive, `None` if unbounded)
+
+    :returns: `tuple` of `list` of SQL conditions and `list` of parameters
+    """
+
+    where = []
+    parameters = []
+
+    for key, (minimum, maximum) in (ranges or {}).items():
+        for operator, value in [('>=', minimum), ('<=', maximum)]:
+            if value is None:
+                continue
+            if key in INDEXED_PROPERTIES:
+                where.append('{} {} ?'.format(key, operator))
+            else:
+                where.append('json_extract(document, ?) {} ?'.format(
+                    operator))
+                parameters.append('$.properties.{}'.format(key))
+            parameters.append(value)
+
+    for key, value in (query_dict or {}).items():
+        if key in INDEXED_PROPERTIES:
+            column = key
+        else:
+            column = 'json_extract(document, ?)'
+            parameters.append('$.properties.{}'.format(key))
+
+        if isinstance(value, (list, tuple, set)):
+            where.append('{} IN ({})'.format(
+                column, ', '.join('?' * len(value))))
+            parameters.extend(value)
+            continue
+
+        if isinstance(value, str) and any(c in value for c in '*?['):
+            where.append('{} GLOB ?'.format(column))
+        else:
+            where.append('{} = ?'.format(column))
+        parameters.append(value)
+
+    return where, parameters
+
+
+def select_fields(doc, fields=None):
+    """
+    Helper function to select the properties of a document
+
+    :param doc: `dict` of GeoJSON document
+    :param fields: `list` of property names (default: all properties and
+                   geometry)
+
+    :returns: `dict` of GeoJSON document
+    """
+
+    if fields is None:
+        return doc
+
+    properties = doc.get('properties', {})
+
+    return {
+        'type': doc.get('type', 'Feature'),
+        'properties': {key: properties[key] for key in fields
+                       if key in properties}
+    }
+
+
+def geometry_bbox(geometry):
+    """
+    Helper function to compute the bounding box of a GeoJSON geometry
+
+    :param geometry: `dict` of GeoJSON geometry
+
+    :returns: `list` of minx, miny, maxx, maxy (`None` if the geometry
+              is empty)
+    """
+
+    if not geometry or not geometry.get('coordinates'):
+        return None
+
+    xs = []
+    ys = []
+    coordinates = [geometry['coordinates']]
+
+    while coordinates:
+        value = coordinates.pop()
+        if isinstance(value[0], (int, float)):
+            xs.append(value[0])
+            ys.append(value[1])
+        else:
+            coordinates.extend(value)
+
+    return [min(xs), min(ys), max(xs), max(ys)]
+
+
+def merge(document, update_dict):
+    """
+    Helper function to merge a partial document into a document (nested
+    objects are merged, as in Elasticsearch partial updates)
+
+    :param document: `dict` of document
+    :param update_dict: `dict` of partial document
+
+    :returns: `dict` of updated document
+    """
+
+    for key, value in update_dict.items():
+        if isinstance(value, dict) and isinstance(document.get(key), dict):
+            merge(document[key], value)
+        else:
+            document[key] = value
+
+    return document
@@ -26,10 +26,23 @@ from textwrap import dedent
 from parse import with_pattern
 from dateutil.relativedelta import relativedelta
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 LOGGER = logging.getLogger(__name__)
 
 DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
 
+# footprint of all tileindex items (shared by all features, do not modify)
+GLOBAL_GEOMETRY = {
+    'type': 'Polygon',
+    'coordinates': [
+        [[-180, -90], [-180, 90], [180, 90], [180, -90], [-180, -90]]
+    ]
+}
+
 
 class VRTDataset:
     """
@@ -142,6 +155,44 @@ def json_serial(obj):
     raise TypeError(msg)
 
 
+def json_bytes(data):
+    """
+    Compact JSON serialization (with orjson when available)
+
+    :param data: JSON serializable object
+
+    :returns: `bytes` of UTF-8 JSON representation
+    """
+
+    if orjson is not None:
+        return orjson.dumps(data, default=json_serial)
+
+    return json.dumps(data, default=json_serial,
+                      separators=(',', ':')).encode('utf-8')
+
+
+def feature_json(feature):
+    """
+    Serialize a GeoJSON feature, reusing the serialization of
+    `GLOBAL_GEOMETRY`
+
+    :param feature: `dict` of GeoJSON feature
+
+    :returns: `bytes` of UTF-8 JSON representation
+    """
+
+    if feature.get('geometry') is not GLOBAL_GEOMETRY or \
+            feature.keys() != {'type', 'geometry', 'properties'}:
+        return json_bytes(feature)
+
+    return b''.join([
+        b'{"type":', json_bytes(feature['type']),
+        b',"geometry":', GLOBAL_GEOMETRY_JSON,
+        b',"properties":', json_bytes(feature['properties']),
+        b'}'
+    ])
+
+
 def get_today_and_now():
     """
     helper function to return a string
@@ -222,3 +273,6 @@ def parse_nonwhitespace(text):
     :returns: `str` of parsed text
     """
     return text
+
+
+GLOBAL_GEOMETRY_JSON = json_bytes(GLOBAL_GEOMETRY)
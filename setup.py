@@ -139,7 +139,11 @@ setup(
     maintainer_email='tom.kralidis@canada.ca',
     url='https://github.com/ECCC-MSC/geomet-data-registry',
     install_requires=read('requirements.txt').splitlines(),
-    packages=find_packages(exclude=['geomet_data_registry.tests']),
+    extras_require={
+        'async': ['elasticsearch[async]']
+    },
+    packages=find_packages(exclude=['geomet_data_registry.tests',
+                                    'benchmarks']),
     include_package_data=True,
     entry_points={
         'console_scripts': [
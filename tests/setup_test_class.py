@@ -22,6 +22,8 @@ import importlib
 import json
 from unittest.mock import patch, DEFAULT
 
+from geomet_data_registry.layer.base import MODEL_CONFIG_CACHE
+
 
 class Setup:
     def __init__(self, test_file, classname, handler_name=None):
@@ -43,6 +45,9 @@ class Setup:
         )
         self.mocked_load_plugin = self.plugin_patcher.start()
 
+        # model configurations are mocked per test
+        MODEL_CONFIG_CACHE.clear()
+
         self.maxDiff = None
         self.today_date = (
             datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
@@ -129,3 +134,36 @@ class Setup:
         if type(get_key) is dict:
             return json.dumps(get_key)
         return DEFAULT
+
+
+def doc(identifier, bbox=(-180, -90, 180, 90), **properties):
+    """
+    Returns a tileindex document
+
+    :param identifier: `str` of document identifier
+    :param bbox: `tuple` of (minx, miny, maxx, maxy) of document geometry
+    :param properties: document properties, overriding the defaults
+
+    :returns: `dict` of GeoJSON feature
+    """
+
+    minx, miny, maxx, maxy = bbox
+
+    return {
+        'type': 'Feature',
+        'geometry': {
+            'type': 'Polygon',
+            'coordinates': [[[minx, miny], [minx, maxy], [maxx, maxy],
+                             [maxx, miny], [minx, miny]]]
+        },
+        'properties': dict({
+            'identifier': identifier,
+            'layer': 'GDPS.ETA_TT',
+            'filepath': '/data/{}.grib2'.format(identifier),
+            'model': 'model_gem_global',
+            'forecast_hour_datetime': '2021-11-26T06:00:00Z',
+            'reference_datetime': '2021-11-26T00:00:00Z',
+            'receive_datetime': '2021-11-26T03:00:00.000000Z',
+            'default_model_run': None
+        }, **properties)
+    }
@@ -18,10 +18,16 @@
 ###############################################################################
 
 from datetime import datetime, timedelta
+import json
 import unittest
-from unittest.mock import patch, call
-
-from geomet_data_registry.tileindex.base import TileNotFoundError
+from unittest.mock import patch, call, MagicMock
+
+from geomet_data_registry.layer.base import (DOCUMENT_CACHE,
+                                             DocumentCache,
+                                             FilenameParserRegistry,
+                                             ModelConfigCache)
+from geomet_data_registry.store.base import partition_config, StoreError
+from geomet_data_registry.tileindex.indexer import BulkIndexer
 from geomet_data_registry.util import DATE_FORMAT
 from .setup_test_class import Setup
 
@@ -56,6 +62,7 @@ class TestSingleAssert(unittest.TestCase, Setup):
             'date_': None,
             'file_dict': None,
             'new_key_store': False,
+            'layer_dependencies': False,
             'name': 'model_gem_global',
             'store': self.mocked_load_plugin.return_value,
             'tileindex': self.mocked_load_plugin.return_value,
@@ -87,6 +94,7 @@ class TestSingleAssert(unittest.TestCase, Setup):
             'date_': None,
             'file_dict': None,
             'new_key_store': False,
+            'layer_dependencies': False,
             'name': 'model_gem_global',
             'store': self.mocked_load_plugin.return_value,
             'tileindex': self.mocked_load_plugin.return_value,
@@ -227,6 +235,117 @@ class TestRegister(unittest.TestCase, Setup):
         self.assertTrue(self.base_layer.register())
         self.mocked_load_plugin.return_value.bulk_add.assert_called_once()
 
+    def test_register_partial_failure(self):
+        """
+        Test that a file is not counted when one of its documents failed
+        to be indexed.
+        """
+
+        item = self.create_item()
+        item2 = dict(item, identifier='{}-2'.format(item['identifier']))
+        self.base_layer.items.extend([item, item2])
+
+        tileindex = self.mocked_load_plugin.return_value
+        tileindex.bulk_add.return_value = {item['identifier']: 201,
+                                           item2['identifier']: 429}
+
+        with patch.object(self.base_layer, 'update_count') as update_count:
+            self.assertTrue(self.base_layer.register())
+            update_count.assert_called_once_with(item, 429)
+
+    def test_register_spooled(self):
+        """
+        Test that a file with spooled documents is counted once they are
+        replayed.
+        """
+
+        item = self.create_item()
+        item2 = dict(item, identifier='{}-2'.format(item['identifier']))
+        self.base_layer.items.extend([item, item2])
+
+        tileindex = self.mocked_load_plugin.return_value
+        tileindex.bulk_add.return_value = {item['identifier']: 201,
+                                           item2['identifier']: 202}
+        callback = MagicMock()
+
+        with patch.object(self.base_layer, 'update_count') as update_count:
+            self.assertTrue(self.base_layer.register(callback=callback))
+            update_count.assert_not_called()
+            callback.assert_not_called()
+
+            identifiers, replayed = tileindex.when_replayed.call_args[0]
+            self.assertEqual(identifiers, [item2['identifier']])
+
+            replayed({item2['identifier']: 201})
+            update_count.assert_called_once_with(item, 201)
+            callback.assert_called_once_with()
+
+    def test_register_cached(self):
+        """
+        Test that indexed documents are added to the document cache, and
+        that documents which failed to be indexed are not.
+        """
+
+        item = self.create_item()
+        item2 = dict(item, identifier='{}-2'.format(item['identifier']))
+        self.base_layer.items.extend([item, item2])
+
+        tileindex = self.mocked_load_plugin.return_value
+        tileindex.bulk_add.return_value = {item['identifier']: 201,
+                                           item2['identifier']: 429}
+
+        DOCUMENT_CACHE.clear()
+        with patch.object(self.base_layer, 'update_count'):
+            self.base_layer.register()
+
+        self.assertEqual(
+            DOCUMENT_CACHE.get(item['identifier'])['properties']['identifier'],
+            item['identifier'])
+        self.assertIsNone(DOCUMENT_CACHE.get(item2['identifier']))
+        DOCUMENT_CACHE.clear()
+
+    def test_cache_documents_spooled(self):
+        """
+        Test that spooled documents are not added to the document cache.
+        """
+
+        docs = [{'properties': {'identifier': 'A'}},
+                {'properties': {'identifier': 'B'}}]
+
+        DOCUMENT_CACHE.clear()
+        self.base_layer.cache_documents(docs, {'A': 200, 'B': 202})
+        self.base_layer.cache_documents(docs[1:], 202)
+
+        self.assertIsNotNone(DOCUMENT_CACHE.get('A'))
+        self.assertIsNone(DOCUMENT_CACHE.get('B'))
+        DOCUMENT_CACHE.clear()
+
+    def test_register_buffered(self):
+        """
+        Test that with a buffered tileindex, items are submitted to the
+        bulk indexer and counts are updated once they are indexed.
+        """
+
+        tileindex = self.mocked_load_plugin.return_value
+        tileindex.bulk_add.return_value = {
+            'GDPS.ETA_UGRD-20211126000000-20211128180000': 201}
+        tileindex.indexer = BulkIndexer(tileindex.bulk_add, max_age=60)
+
+        self.base_layer.items.append(self.create_item())
+        callback = MagicMock()
+
+        with patch.object(self.base_layer, 'update_count') as update_count:
+            self.assertTrue(self.base_layer.register(callback=callback))
+            tileindex.add.assert_not_called()
+            update_count.assert_not_called()
+
+            tileindex.indexer.flush()
+            update_count.assert_called_once_with(self.base_layer.items[0],
+                                                 201)
+            callback.assert_called_once_with()
+
+        tileindex.indexer.close()
+
 
 class TestLayer2Dict(unittest.TestCase, Setup):
     def setUp(self):
@@ -330,59 +449,57 @@ class TestUpdateCount(unittest.TestCase, Setup):
 
     def test_update_count_expected_81(self):
         """
-        Test that count is initialized for a previously unencountered
-        weather variable when a new file and an item has an expected count
-        value.
+        Test that count is incremented for a weather variable when a new
+        file and an item has an expected count value.
         """
 
-        # when store.get_key() is called, return None
-        self.mocked_load_plugin.return_value.get_key.return_value = None
+        store = self.mocked_load_plugin.return_value
+        store.increment_count.return_value = (False, {})
 
-        # change expected count from None to 81 so it is greater than
-        # new_layer_file_count
+        # change expected count from None to 81
         self.item['expected_count'] = 81
 
         self.base_layer.update_count(self.item, 201)
 
-        # assert new_key_store wasn't put to True and
-        # store.set_key() was called using these parameters
+        # assert new_key_store wasn't put to True and the count was
+        # incremented in one store request
         self.assertFalse(self.base_layer.new_key_store)
-        self.mocked_load_plugin.return_value.set_key.assert_called_with(
-            'model_gem_global_TMP_TGL_2_00Z_count', 1
+        store.increment_count.assert_called_once_with(
+            'model_gem_global_TMP_TGL_2_00Z_count', 81,
+            ['model_gem_global_TMP_TGL_2_00Z_count',
+             'model_gem_global_TMP_TGL_2_12Z_count']
         )
+        store.get_key.assert_not_called()
+        store.set_key.assert_not_called()
 
     def test_update_count_incomplete_mr(self):
         """
-        Test that the appropriate model run count is reset when an imcomplete
-        model run is identified.
+        Test that incomplete model runs reset by the store are reported.
         """
 
-        # store.get_key() will return these values in sequence like a generator
-        self.mocked_load_plugin.return_value.get_key.side_effect = [
-            None,
-            1,
-            80,
-        ]
+        store = self.mocked_load_plugin.return_value
+        store.increment_count.return_value = (False, {
+            'model_gem_global_TMP_TGL_2_12Z_count': '80'
+        })
 
         self.item['expected_count'] = 81
 
-        # expected arguments used with store.set_key for the 2 calls
-        calls = [
-            call('model_gem_global_TMP_TGL_2_00Z_count', 1),
-            call('model_gem_global_TMP_TGL_2_12Z_count', 0),
-        ]
-
-        self.base_layer.update_count(self.item, 201)
+        with self.assertLogs('geomet_data_registry.layer.base',
+                             level='ERROR') as logs:
+            self.base_layer.update_count(self.item, 201)
 
-        self.mocked_load_plugin.return_value.set_key.assert_has_calls(calls)
+        self.assertFalse(self.base_layer.new_key_store)
+        self.assertIn('Incomplete model run: 12Z --> 80 / 81 files',
+                      logs.output[0])
 
     def test_update_count_complete_mr(self):
         """
-        Test that the appropriate model run counts are reset when a
-        complete model run is achieved.
+        Test that a new key is stored when a complete model run is
+        achieved.
         """
-        # make store.get_key return the same number as expected_count
-        self.mocked_load_plugin.return_value.get_key.return_value = 80
+
+        store = self.mocked_load_plugin.return_value
+        store.increment_count.return_value = (True, {})
         self.item['expected_count'] = 81
 
         self.base_layer.update_count(self.item, 201)
@@ -390,14 +507,28 @@ class TestUpdateCount(unittest.TestCase, Setup):
         # assert new_key_store was set to True
         self.assertTrue(self.base_layer.new_key_store)
 
-        # assert these calls were made with store.set_key
-        calls = [
-            call('model_gem_global_TMP_TGL_2_00Z_count', 81),
-            call('model_gem_global_TMP_TGL_2_00Z_count', 0),
-            call('model_gem_global_TMP_TGL_2_12Z_count', 0),
-        ]
+    def test_update_count_spooled(self):
+        """
+        Test that counts are not incremented for spooled items.
+        """
+
+        self.item['expected_count'] = 81
+        self.base_layer.update_count(self.item, 202)
+
+        self.assertFalse(self.base_layer.new_key_store)
+        self.mocked_load_plugin.return_value.increment_count.assert_not_called()  # noqa
+
+    def test_update_count_not_indexed(self):
+        """
+        Test that counts are not incremented for items not (re)indexed.
+        """
 
-        self.mocked_load_plugin.return_value.set_key.assert_has_calls(calls)
+        self.item['expected_count'] = 81
+
+        self.base_layer.update_count(self.item, 200)
+
+        self.assertFalse(self.base_layer.new_key_store)
+        self.mocked_load_plugin.return_value.increment_count.assert_not_called()  # noqa
 
 
 class TestCheckLayerDependencies(unittest.TestCase, Setup):
@@ -406,22 +537,28 @@ class TestCheckLayerDependencies(unittest.TestCase, Setup):
 
         Setup.__init__(self, 'model_gem_global', 'BaseLayer')
 
+        DOCUMENT_CACHE.clear()
+
     def tearDown(self):
         """Code that executes after every test function."""
 
         self.date_patcher.stop()
         self.plugin_patcher.stop()
 
+        DOCUMENT_CACHE.clear()
+
     def test_check_layer_dependencies(self):
         """
         Test geomet_data_registry.layer.BaseLayer.check_layer_dependencies()
         returns a list of dictionnaries representing tileindex items.
         """
-        # make tileindex.get return an arbitrary
+        # make tileindex.mget return an arbitrary
         # dict to assert that is what is returned
-        self.mocked_load_plugin.return_value.get.return_value = {
-            'geometry': {},
-            'properties': {'weather_variable': 'VGRD_TGL_10'},
+        self.mocked_load_plugin.return_value.mget.return_value = {
+            'GDPS.ETA_VGRD-20211126000000-20211126030000': {
+                'geometry': {},
+                'properties': {'weather_variable': 'VGRD_TGL_10'},
+            }
         }
 
         self.assertListEqual(
@@ -436,25 +573,49 @@ class TestCheckLayerDependencies(unittest.TestCase, Setup):
             ],
         )
 
-    def test_check_layer_dependencies_tilenotfounderror(self):
+    def test_check_layer_dependencies_not_found(self):
         """
         Test geomet_data_registry.layer.BaseLayer.check_layer_dependencies()
-        returns False when TileNotFoundError thrown when some dependencies
-        are not found.
+        returns False when some dependencies are not found.
         """
 
-        # make tileindex.get throw an error when called
-        self.mocked_load_plugin.return_value.get.side_effect = (
-            TileNotFoundError
-        )
+        # make tileindex.mget find no documents
+        self.mocked_load_plugin.return_value.mget.return_value = {}
 
-        # assert that False is returned when error is caught
+        # assert that False is returned
         self.assertFalse(
             self.base_layer.check_layer_dependencies(
                 ['GDPS.ETA_VGRD'], '20211126000000', '20211126030000'
             )
         )
 
+    def test_check_layer_dependencies_cached(self):
+        """
+        Test that dependencies registered recently are served from the
+        document cache, and that the others are fetched with a single
+        request.
+        """
+
+        cached = {'properties': {'identifier': 'A-20211126000000-'
+                                               '20211126030000'}}
+        fetched = {'properties': {'identifier': 'B-20211126000000-'
+                                                '20211126030000'}}
+        DOCUMENT_CACHE.add([cached])
+
+        tileindex = self.mocked_load_plugin.return_value
+        tileindex.mget.return_value = {
+            fetched['properties']['identifier']: fetched}
+
+        self.base_layer.model = 'model_gem_global'
+        self.assertListEqual(
+            self.base_layer.check_layer_dependencies(
+                ['A', 'B'], '20211126000000', '20211126030000'),
+            [cached, fetched])
+        tileindex.mget.assert_called_once_with(
+            ['B-20211126000000-20211126030000'], model='model_gem_global',
+            reference_datetime='20211126000000')
+        tileindex.get.assert_not_called()
+
 
 class TestCheckDependenciesDefaultMr(unittest.TestCase, Setup):
     def setUp(self):
@@ -482,7 +643,10 @@ class TestCheckDependenciesDefaultMr(unittest.TestCase, Setup):
         haven't been processed yet by the registry).
         """
         # make default_mr return None, assert returns False
-        self.mocked_load_plugin.return_value.get_key.return_value = None
+        self.mocked_load_plugin.return_value.get_keys.return_value = [
+            None,
+            None,
+        ]
         self.assertFalse(
             self.base_layer.check_dependencies_default_mr(
                 self.mr_datetime, self.dependencies
@@ -497,9 +661,10 @@ class TestCheckDependenciesDefaultMr(unittest.TestCase, Setup):
         match the passed datetime.
         """
         # make default_mr return same value as mr_datetime, assert returns True
-        self.mocked_load_plugin.return_value.get_key.return_value = (
-            '2021-11-26T00:00:00Z'
-        )
+        self.mocked_load_plugin.return_value.get_keys.return_value = [
+            '2021-11-26T00:00:00Z',
+            '2021-11-26T00:00:00Z',
+        ]
         self.assertTrue(
             self.base_layer.check_dependencies_default_mr(
                 self.mr_datetime, self.dependencies
@@ -515,7 +680,7 @@ class TestCheckDependenciesDefaultMr(unittest.TestCase, Setup):
         dependencies have been processed by the registry).
         """
         # make default_mr return these 2 values
-        self.mocked_load_plugin.return_value.get_key.side_effect = [
+        self.mocked_load_plugin.return_value.get_keys.return_value = [
             '2021-11-26T00:00:00Z',
             None,
         ]
@@ -607,10 +772,11 @@ class TestAddTimeKey(unittest.TestCase, Setup):
         to that of the current item.
         """
 
-        # make store.get_key return a date < base_layer.date_
-        self.mocked_load_plugin.return_value.get_key.return_value = (
-            '2020-11-21T12:00:00Z'
-        )
+        # make store.get_keys return a date < base_layer.date_
+        self.mocked_load_plugin.return_value.get_keys.return_value = [
+            '2020-11-21T12:00:00Z',
+            '2020-11-21T12:00:00Z',
+        ]
 
         # make check_dependencies_default_mr return False
         self.mocked_check_dep_mr.return_value = False
@@ -622,7 +788,7 @@ class TestAddTimeKey(unittest.TestCase, Setup):
         expected_items = self.items
         expected_items[0]['refresh_config'] = False
         self.assertListEqual(expected_items, self.base_layer.items)
-        self.mocked_load_plugin.return_value.set_key.assert_not_called()
+        self.mocked_load_plugin.return_value.set_keys.assert_not_called()
 
     def test_add_time_key_older(self):
         """
@@ -631,10 +797,11 @@ class TestAddTimeKey(unittest.TestCase, Setup):
         the currently stored default model run.
         """
 
-        # make store.get_key return a date > base_layer.date_
-        self.mocked_load_plugin.return_value.get_key.return_value = (
-            '2020-11-22T12:00:00Z'
-        )
+        # make store.get_keys return a date > base_layer.date_
+        self.mocked_load_plugin.return_value.get_keys.return_value = [
+            '2020-11-22T12:00:00Z',
+            '2020-11-22T12:00:00Z',
+        ]
 
         # assert add_time_key was successful
         self.assertTrue(self.base_layer.add_time_key())
@@ -643,7 +810,7 @@ class TestAddTimeKey(unittest.TestCase, Setup):
         # value is older than the current value in store
         expected_items = self.items
         self.assertListEqual(expected_items, self.base_layer.items)
-        self.mocked_load_plugin.return_value.set_key.assert_not_called()
+        self.mocked_load_plugin.return_value.set_keys.assert_not_called()
 
     def test_add_time_key_keys_set(self):
         """
@@ -668,10 +835,11 @@ class TestAddTimeKey(unittest.TestCase, Setup):
         # make check_dependencies_default_mr return True
         self.mocked_check_dep_mr.return_value = True
 
-        # make store.get_key return a date < base_layer.date_
-        self.mocked_load_plugin.return_value.get_key.return_value = (
-            '2020-11-21T12:00:00Z'
-        )
+        # make store.get_keys return a date < base_layer.date_
+        self.mocked_load_plugin.return_value.get_keys.return_value = [
+            '2020-11-21T12:00:00Z',
+            '2020-11-21T12:00:00Z',
+        ]
 
         # assert add_time_key was successful
         self.assertTrue(self.base_layer.add_time_key())
@@ -679,21 +847,288 @@ class TestAddTimeKey(unittest.TestCase, Setup):
         # assert item values were not changed
         self.assertListEqual(self.items, self.base_layer.items)
 
-        # assert store.set_key was called 3 times using these parameters
-        calls = [
-            call(
-                'RIOPS_UU2W_Y_DBS-1.6m_time_extent',
-                '{}/{}/PT1H'.format(start_time, end_time),
-            ),
-            call('RIOPS_UU2W_Y_DBS-1.6m_default_model_run', date_formatted),
-            call(
-                'RIOPS_UU2W_Y_DBS-1.6m_model_run_extent',
-                '{}/{}/PT12H'.format(run_start_time, date_formatted),
-            ),
+        # assert default model runs were fetched with one request
+        self.mocked_load_plugin.return_value.get_keys.assert_called_once_with(
+            [
+                'RIOPS_UU2W_Y_DBS-1.6m_default_model_run',
+                'RIOPS_UU2W_X_DBS-1.6m_default_model_run',
+            ]
+        )
+
+        # assert the 3 time keys were set with one request
+        self.mocked_load_plugin.return_value.set_keys.assert_called_once_with(
+            {
+                'RIOPS_UU2W_Y_DBS-1.6m_time_extent': '{}/{}/PT1H'.format(
+                    start_time, end_time
+                ),
+                'RIOPS_UU2W_Y_DBS-1.6m_default_model_run': date_formatted,
+                'RIOPS_UU2W_Y_DBS-1.6m_model_run_extent': '{}/{}/PT12H'.format(
+                    run_start_time, date_formatted
+                ),
+            }
+        )
+        self.mocked_load_plugin.return_value.set_key.assert_not_called()
+
+    def test_add_time_key_dependency_same_file(self):
+        """
+        Test that the time keys of a layer are set when its dependency is
+        updated by the same file, as if time keys were set layer by layer.
+        """
+
+        # check dependencies against the store
+        self.check_dep_patcher.stop()
+
+        dependency = dict(
+            self.items[0],
+            layer_name='RIOPS_UU2W_X_DBS-1.6m',
+            layer_config={'forecast_hours': '000/048/PT1H'},
+        )
+        self.base_layer.items = [dependency] + self.items
+
+        # the dependency has an older default model run in store
+        self.mocked_load_plugin.return_value.get_keys.return_value = [
+            '2020-11-21T12:00:00Z',
+            None,
         ]
-        self.mocked_load_plugin.return_value.set_key.assert_has_calls(
-            calls, any_order=True
+
+        self.assertTrue(self.base_layer.add_time_key())
+
+        self.mocked_load_plugin.return_value.get_keys.assert_called_once_with(
+            [
+                'RIOPS_UU2W_X_DBS-1.6m_default_model_run',
+                'RIOPS_UU2W_Y_DBS-1.6m_default_model_run',
+            ]
+        )
+
+        time_keys = (
+            self.mocked_load_plugin.return_value.set_keys.call_args[0][0]
         )
+        self.assertEqual(len(time_keys), 6)
+        self.assertEqual(
+            time_keys['RIOPS_UU2W_Y_DBS-1.6m_default_model_run'],
+            '2020-11-22T00:00:00Z',
+        )
+        self.assertNotIn('refresh_config', self.items[0])
+
+
+class TestModelConfigCache(unittest.TestCase):
+    def setUp(self):
+        """Code that executes before every test function."""
+
+        self.keys = {
+            'model_gem_global': json.dumps({'model_gem_global': {'v': 1}}),
+            'model_gem_global_version': '1'
+        }
+
+        self.store = MagicMock()
+        self.store.get_key.side_effect = self.keys.get
+        self.store.subscribe.side_effect = NotImplementedError
+
+    def test_get_cached(self):
+        """
+        Test that model configurations are only fetched once per version.
+        """
+
+        cache = ModelConfigCache(ttl=0)
+
+        file_dict = cache.get(self.store, 'model_gem_global')
+        self.assertDictEqual(file_dict, {'model_gem_global': {'v': 1}})
+        self.assertIs(file_dict, cache.get(self.store, 'model_gem_global'))
+
+        # configuration is fetched once, its version is checked after ttl
+        self.store.get_key.assert_has_calls([
+            call('model_gem_global_version'),
+            call('model_gem_global'),
+            call('model_gem_global_version')
+        ])
+        self.assertEqual(self.store.get_key.call_count, 3)
+
+    def test_get_version_bump(self):
+        """
+        Test that model configurations are reloaded when their version
+        changes.
+        """
+
+        cache = ModelConfigCache(ttl=0)
+        cache.get(self.store, 'model_gem_global')
+
+        self.keys['model_gem_global'] = json.dumps(
+            {'model_gem_global': {'v': 2}})
+        self.keys['model_gem_global_version'] = '2'
+
+        self.assertDictEqual(cache.get(self.store, 'model_gem_global'),
+                             {'model_gem_global': {'v': 2}})
+
+    def test_get_subscribed(self):
+        """
+        Test that no store requests are made while subscribed, and that
+        update messages invalidate the cached configuration.
+        """
+
+        self.store.subscribe.side_effect = None
+        self.store.subscribe.return_value.is_alive.return_value = True
+
+        cache = ModelConfigCache(ttl=0)
+        cache.get(self.store, 'model_gem_global')
+        cache.get(self.store, 'model_gem_global')
+        self.assertEqual(self.store.get_key.call_count, 2)
+
+        callback = self.store.subscribe.call_args[0][1]
+        self.keys['model_gem_global'] = json.dumps(
+            {'model_gem_global': {'v': 2}})
+        callback('model_gem_global')
+
+        self.assertDictEqual(cache.get(self.store, 'model_gem_global'),
+                             {'model_gem_global': {'v': 2}})
+        self.store.subscribe.assert_called_once()
+
+    def test_get_subscription_lost(self):
+        """
+        Test that cached configurations are dropped when the subscription
+        is lost.
+        """
+
+        listener = self.store.subscribe.return_value
+        self.store.subscribe.side_effect = [listener, StoreError]
+        listener.is_alive.return_value = True
+
+        cache = ModelConfigCache(ttl=0)
+        file_dict = cache.get(self.store, 'model_gem_global')
+
+        listener.is_alive.return_value = False
+        self.assertIsNot(file_dict, cache.get(self.store, 'model_gem_global'))
+        self.assertIsNone(cache.listener)
+
+    def test_get_partitioned(self):
+        """
+        Test that partitioned configurations are loaded from their header,
+        and variables when first accessed.
+        """
+
+        config = {
+            'model_giops': {
+                'filename_pattern': '{wx_variable}_{forecast_hour}.nc',
+                '3D': {
+                    'variable': {
+                        'VOMECRTY': {'members': None},
+                        'VOZOCRTX': {'members': None}
+                    }
+                }
+            }
+        }
+        fields = partition_config(config)
+        self.store.get_fields.side_effect = (
+            lambda key, fields_: [fields.get(field) for field in fields_])
+
+        cache = ModelConfigCache(ttl=0, partitioned=True)
+        file_dict = cache.get(self.store, 'model_giops')
+
+        self.store.get_fields.assert_called_once_with(
+            'model_giops_config', ['_header'])
+        self.store.get_key.assert_called_once_with('model_giops_version')
+
+        variables = file_dict['model_giops']['3D']['variable']
+        self.assertIn('VOMECRTY', variables)
+        self.store.get_fields.assert_called_with(
+            'model_giops_config', ['model_giops/3D/variable/VOMECRTY'])
+        self.assertEqual(variables['VOMECRTY'], {'members': None})
+        self.assertEqual(self.store.get_fields.call_count, 2)
+
+        # unknown variables are looked up once
+        self.assertNotIn('UNKNOWN', variables)
+        with self.assertRaises(KeyError):
+            variables['UNKNOWN']
+        self.assertEqual(self.store.get_fields.call_count, 3)
+
+        self.assertEqual(list(variables), ['VOMECRTY', 'VOZOCRTX'])
+        self.assertEqual(len(variables), 2)
+        self.assertEqual(self.store.get_fields.call_count, 4)
+
+    def test_get_partitioned_missing(self):
+        """
+        Test that configurations which are not partitioned in the store
+        are loaded whole.
+        """
+
+        self.store.get_fields.return_value = [None]
+
+        cache = ModelConfigCache(ttl=0, partitioned=True)
+
+        self.assertDictEqual(cache.get(self.store, 'model_gem_global'),
+                             {'model_gem_global': {'v': 1}})
+
+
+class TestDocumentCache(unittest.TestCase):
+    def test_lru(self):
+        """Test that least recently used documents are evicted."""
+
+        cache = DocumentCache(size=2, ttl=60)
+        cache.add([{'properties': {'identifier': 'A'}},
+                   {'properties': {'identifier': 'B'}}])
+
+        self.assertIsNotNone(cache.get('A'))
+        cache.add([{'properties': {'identifier': 'C'}}])
+
+        self.assertIsNotNone(cache.get('A'))
+        self.assertIsNone(cache.get('B'))
+        self.assertIsNotNone(cache.get('C'))
+
+    @patch('geomet_data_registry.layer.base.time.monotonic')
+    def test_ttl(self, mocked_monotonic):
+        """Test that documents expire, and that a ttl of 0 disables."""
+
+        mocked_monotonic.return_value = 100
+        cache = DocumentCache(ttl=10)
+        cache.add([{'properties': {'identifier': 'A'}}])
+        self.assertIsNotNone(cache.get('A'))
+
+        mocked_monotonic.return_value = 110
+        self.assertIsNone(cache.get('A'))
+        self.assertEqual(len(cache.docs), 0)
+
+        cache = DocumentCache(ttl=0)
+        cache.add([{'properties': {'identifier': 'A'}}])
+        self.assertIsNone(cache.get('A'))
+
+
+class TestFilenameParserRegistry(unittest.TestCase):
+    def test_register(self):
+        """
+        Test that parsers are compiled for all filename patterns of a
+        model configuration, and reused.
+        """
+
+        file_dict = {
+            'rdpa': {
+                'filename_pattern': {
+                    '15km': 'CMC_RDPA_{wx_variable}_ps15km_{YYYYMMDD_model_run}_{forecast_hour}.grib2',  # noqa
+                    '10km': 'CMC_RDPA_{wx_variable}_ps10km_{YYYYMMDD_model_run}_{forecast_hour}.grib2'  # noqa
+                }
+            },
+            'giops': {
+                'filename_pattern': 'CMC_giops_{wx_variable}_{fileinfo:NonWhitespaceChars}_{YYYYMMDD_model_run}_P{forecast_hour:n}.nc'  # noqa
+            }
+        }
+
+        registry = FilenameParserRegistry()
+        self.assertEqual(registry.register('rdpa', file_dict['rdpa']), 2)
+        self.assertEqual(registry.register('giops', file_dict['giops']), 1)
+
+        pattern = file_dict['rdpa']['filename_pattern']['10km']
+        parser = registry.get('rdpa', pattern)
+        self.assertIs(parser, registry.get('rdpa', pattern))
+        self.assertEqual(parser.parse(
+            'CMC_RDPA_APCP-024-0700cutoff_SFC_0_ps10km_2021100100_000.grib2'
+        ).named['wx_variable'], 'APCP-024-0700cutoff_SFC_0')
+
+        result = registry.get(
+            'giops', file_dict['giops']['filename_pattern']).parse(
+            'CMC_giops_iiceconc_notUsedSoWhatever_latlon0.2x0.2_2021112600_P001.nc')  # noqa
+        self.assertEqual(result.named['fileinfo'],
+                         'notUsedSoWhatever_latlon0.2x0.2')
+
+        registry.invalidate('rdpa')
+        self.assertEqual(len(registry.parsers), 1)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,142 @@
+###############################################################################
+#
+# Copyright (C) 2026 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+from click.testing import CliRunner
+
+from geomet_data_registry.handler import add_data
+from geomet_data_registry.handler.bulk import (find_files, ingest_files,
+                                               partition_files,
+                                               register_files)
+
+
+def mock_handler(identifier, dependencies=False):
+    """Returns a mocked CoreHandler of an identified file"""
+
+    item = {
+        'identifier': identifier,
+        'register_status': True,
+        'layer_config': {'dependencies': ['X']} if dependencies else {}
+    }
+
+    handler = MagicMock()
+    handler.filepath = identifier
+    handler.dispatch.return_value = handler.layer_plugin
+    handler.identify.return_value = True
+    handler.layer_plugin.layer_dependencies = dependencies
+    handler.layer_plugin.items = [item]
+    handler.layer_plugin.layer2dict.side_effect = lambda item: {
+        'properties': {'identifier': item['identifier']}}
+
+    return handler
+
+
+class TestBulk(unittest.TestCase):
+    def test_find_files(self):
+        """Test that files are found recursively, sorted by mtime."""
+
+        with tempfile.TemporaryDirectory() as directory:
+            os.mkdir(os.path.join(directory, 'sub'))
+            filepaths = [os.path.join(directory, 'sub', 'b'),
+                         os.path.join(directory, 'a'),
+                         os.path.join(directory, 'sub', 'c')]
+            for i, filepath in enumerate(filepaths):
+                open(filepath, 'w').close()
+                os.utime(filepath, (1000 + i, 1000 + i))
+
+            self.assertEqual(find_files(directory), filepaths)
+
+    def test_partition_files(self):
+        """Test partitioning by model and model run, in arrival order."""
+
+        filepaths = [
+            '/data/CMC_glb_TMP_TGL_2_latlon.15x.15_2021112600_P000.grib2',
+            '/data/20211129T00Z_MSC_RAQDPS_PM2.5_EAtm_RLatLon0.09_PT000H.grib2',  # noqa
+            '/data/CMC_glb_TMP_TGL_2_latlon.15x.15_2021112612_P000.grib2',
+            '/data/CMC_glb_TMP_TGL_2_latlon.15x.15_2021112600_P003.grib2',
+            '/data/20211129T00Z_MSC_RAQDPS_PM2.5_EAtm_RLatLon0.09_PT001H.grib2'  # noqa
+        ]
+
+        self.assertEqual(partition_files(filepaths), [
+            ('ModelGemGlobal', [filepaths[0], filepaths[3]]),
+            ('RAQDPS', [filepaths[1], filepaths[4]]),
+            ('ModelGemGlobal', [filepaths[2]])
+        ])
+
+    def test_register_files(self):
+        """Test that a batch is registered with one bulk request."""
+
+        handlers = [mock_handler('A'), mock_handler('B'), mock_handler('C')]
+        tileindex = handlers[0].layer_plugin.tileindex
+        tileindex.bulk_add.return_value = {'A': 201, 'B': 200, 'C': 500}
+
+        self.assertEqual(register_files(handlers), 2)
+        tileindex.bulk_add.assert_called_once()
+        self.assertEqual(len(tileindex.bulk_add.call_args[0][0]), 3)
+
+        result = tileindex.bulk_add.return_value
+        handlers[0].layer_plugin.complete.assert_called_once_with(
+            handlers[0].layer_plugin.items, result, handlers[0].publish)
+        handlers[2].layer_plugin.complete.assert_not_called()
+
+    @patch('geomet_data_registry.handler.bulk.register_files')
+    @patch('geomet_data_registry.handler.bulk.CoreHandler')
+    def test_ingest_files(self, mocked_handler, mocked_register_files):
+        """
+        Test batching, and that batches are flushed before identifying
+        files of layer plugins with layer dependencies.
+        """
+
+        handlers = {name: mock_handler(name, dependencies=name == 'D')
+                    for name in 'ABCDE'}
+        mocked_handler.side_effect = \
+            lambda filepath, url=None: handlers[filepath]
+        mocked_register_files.side_effect = len
+
+        summary = ingest_files(list('ABCDE'), batch_size=2)
+
+        batches = [[handler.filepath for handler in call[0][0]]
+                   for call in mocked_register_files.call_args_list]
+        self.assertEqual(batches, [['A', 'B'], ['C'], ['D', 'E']])
+        self.assertEqual(summary, {'processed': 5, 'registered': 5,
+                                   'failed': 0})
+
+        self.assertEqual(mocked_handler.call_count, 5)
+        for handler in handlers.values():
+            handler.identify.assert_called_once_with()
+
+    def test_add_data_verify_workers(self):
+        """Test that --verify is rejected with --workers."""
+
+        with tempfile.TemporaryDirectory() as directory:
+            result = CliRunner().invoke(add_data, ['--directory', directory,
+                                                   '--verify',
+                                                   '--workers', '2'])
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn('--verify/-v cannot be used with --workers/-w',
+                      result.output)
+
+
+if __name__ == '__main__':
+    unittest.main()
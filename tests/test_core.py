@@ -0,0 +1,59 @@
+###############################################################################
+#
+# Copyright (C) 2026 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+import unittest
+from unittest.mock import patch, MagicMock
+
+from geomet_data_registry.handler.core import warm_start
+
+
+class TestWarmStart(unittest.TestCase):
+    @patch('geomet_data_registry.handler.core.MODEL_CONFIG_CACHE')
+    @patch('geomet_data_registry.handler.core.get_dispatch_index')
+    @patch('geomet_data_registry.handler.core.load_plugin')
+    def test_warm_start(self, mocked_load_plugin, mocked_dispatch_index,
+                        mocked_config_cache):
+        """
+        Test that shared providers, the dispatch index and model
+        configurations are loaded.
+        """
+
+        store = MagicMock()
+        store.list_keys.return_value = [
+            'geomet-data-registry_model_gem_global',
+            'geomet-data-registry_model_gem_global_version',
+            'geomet-data-registry_model_raqdps-fw'
+        ]
+        store.get_keys.return_value = ['{"model_raqdps-fw": {}}']
+        mocked_load_plugin.return_value = store
+
+        models = warm_start()
+
+        self.assertEqual(models, ['model_gem_global', 'model_raqdps-fw'])
+        mocked_dispatch_index.assert_called_once()
+        self.assertEqual(
+            [call[0][0] for call in mocked_load_plugin.call_args_list],
+            ['store', 'tileindex'])
+        for call in mocked_load_plugin.call_args_list:
+            self.assertTrue(call[1]['shared'])
+        mocked_config_cache.get.assert_any_call(store, 'model_raqdps-fw')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+###############################################################################
+#
+# Copyright (C) 2026 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from geomet_data_registry.tileindex.dedup import (fingerprint,
+                                                  RegistrationFilter)
+from .setup_test_class import doc
+
+
+class TestRegistrationFilter(unittest.TestCase):
+    """Test suite for the registration filter"""
+
+    def test_fingerprint(self):
+        """Test that fingerprints ignore delivery times."""
+
+        self.assertEqual(
+            fingerprint(doc('A')),
+            fingerprint(doc('A', receive_datetime='2021-11-26T04:00:00Z')))
+        self.assertNotEqual(fingerprint(doc('A')),
+                            fingerprint(doc('A', filepath='/data/B.grib2')))
+
+    def test_filter(self):
+        """Test that unchanged registrations are suppressed."""
+
+        dedup = RegistrationFilter(size=2, ttl=60)
+
+        self.assertEqual(dedup.filter([doc('A')]), ([doc('A')], {}))
+        dedup.add([doc('A'), doc('B')], {'A': 201, 'B': 500})
+
+        docs, suppressed = dedup.filter([
+            doc('A', receive_datetime='2021-11-26T04:00:00Z'),
+            doc('B'),
+            doc('C')
+        ])
+        self.assertEqual(suppressed, {'A': 200})
+        self.assertEqual(docs, [doc('B'), doc('C')])
+
+        # changed documents are reindexed
+        docs, suppressed = dedup.filter([doc('A', filepath='/data/B.grib2')])
+        self.assertEqual(suppressed, {})
+
+        # least recently registered documents are evicted
+        dedup.add([doc('B'), doc('C')], {'B': 201, 'C': 201})
+        self.assertEqual(dedup.get(['A', 'B']),
+                         [None, fingerprint(doc('B'))])
+
+    @patch('geomet_data_registry.tileindex.dedup.time.monotonic')
+    def test_ttl(self, mocked_monotonic):
+        """Test that fingerprints expire."""
+
+        dedup = RegistrationFilter(ttl=60)
+
+        mocked_monotonic.return_value = 0
+        dedup.add([doc('A')], {'A': 201})
+
+        mocked_monotonic.return_value = 61
+        self.assertEqual(dedup.filter([doc('A')]), ([doc('A')], {}))
+
+    def test_store(self):
+        """Test that fingerprints are shared through the store."""
+
+        store = MagicMock()
+        store.get_keys.return_value = [fingerprint(doc('A')), None]
+
+        dedup = RegistrationFilter(ttl=60, store=store)
+
+        docs, suppressed = dedup.filter([doc('A'), doc('B')])
+        self.assertEqual(suppressed, {'A': 200})
+        store.get_keys.assert_called_once_with(['dedup_A', 'dedup_B'])
+
+        dedup.add(docs, {'B': 201})
+        store.set_keys.assert_called_once_with(
+            {'dedup_B': fingerprint(doc('B'))}, ttl=60)
+
+        # registrations are not suppressed when the store fails
+        store.get_keys.side_effect = ConnectionError()
+        self.assertEqual(dedup.filter([doc('A')]), ([doc('A')], {}))
+
+
+if __name__ == '__main__':
+    unittest.main()
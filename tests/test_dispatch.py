@@ -0,0 +1,107 @@
+###############################################################################
+#
+# Copyright (C) 2026 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+from fnmatch import fnmatch
+import unittest
+
+from geomet_data_registry.handler.dispatch import (LayerDispatchIndex,
+                                                   find_ambiguities)
+from geomet_data_registry.plugin import PLUGINS
+
+FILENAMES = [
+    'CMC_glb_UGRD_TGL_10_latlon.15x.15_2021112600_P066.grib2',
+    'CMC_reg_ABSV_ISBL_250_ps10km_202011220_P001.grib2',
+    'CMC_hrdps_continental_ABSV_ISBL_0250_ps2.5km_202011220_P001-00.grib2',
+    '20211130T1400Z_MSC_Radar-Composite_MMHR_1km.tif',
+    'cansips_forecast_raw_latlon2.5x2.5_PRATE_SFC_0_2020-11_allmembers.grib2',
+    'CMC-reps-srpe-raw_PRMSL_MSL_0_ps15km_202011220_P00_allmbrs.grib2',
+    'CMC_geps-prob_HEATX_TGL_2m_latlon0p5x0p5_202011220_P001_all-products.grib2',  # noqa
+    'CMC_giops_iiceconc_notUsedSoWhatever_202011220_P001.nc',
+    '20201122T0Z_MSC_RIOPS_VOMECRTY_-1.6m_PS5km_P000.nc',
+    'CMC_coupled-rdps-stlawrence-ocean_latlon0.02x0.03_202011220_P001.grib2',
+    '20211014T00Z_MSC_RDWPS-Lake-Huron-Michigan_HTSGW_Sfc_LatLon0.009x0.012_PT000H.grib2',  # noqa
+    '20211007T00Z_MSC_GDWPS_HTSGW_Sfc_LatLon0.25_PT000H.grib2',
+    'CMC_wcps_nemo_itmecrty_sfc_0_latlon0.009x0.009_2021100500_P001.nc',
+    'CMC_HRDPA_APCP-006-0100cutoff_SFC_0_ps2.5km_202011220_001.grib2',
+    'CMC_RDPA_APCP-006-0700cutoff_SFC_0_ps10km_2021100100_-720.grib2',
+    '20211129T00Z_MSC_RAQDPS_PM2.5_EAtm_RLatLon0.09_PT000H.grib2',
+    '20211129T00Z_MSC_RAQDPS-FW_PM2.5_EAtm_RLatLon0.09_PT000H.grib2',
+    '20201122T0Z_MSC_RAQDPS-FW_PM2.5-DIFF-MAvg-DMax_SFC_RLatLon0.09x0.09_P1M.nc',  # noqa
+    '20201122T0Z_MSC_RDAQA_O3-MAvg_SFC_RLatLon0.09x0.09_P1M.nc',
+    'unknown_file.grib2'
+]
+
+
+class TestLayerDispatchIndex(unittest.TestCase):
+    def setUp(self):
+        """Code that executes before every test function."""
+
+        self.index = LayerDispatchIndex(PLUGINS['layer'])
+
+    def fnmatch_loop(self, filename):
+        """Sequential dispatch which the index replaces"""
+
+        match = None
+        for key, value in PLUGINS['layer'].items():
+            if fnmatch(filename, value['pattern']):
+                match = key
+        return match
+
+    def test_match(self):
+        """
+        Test that the dispatch index resolves filenames to the same layer
+        plugin as the sequential fnmatch loop (last match wins).
+        """
+
+        for filename in FILENAMES:
+            self.assertEqual(self.fnmatch_loop(filename),
+                             self.index.match(filename), msg=filename)
+
+    def test_match_overlap(self):
+        """
+        Test that filenames matched by overlapping patterns resolve to the
+        plugin defined last.
+        """
+
+        self.assertEqual(self.index.match(FILENAMES[16]), 'RAQDPS-FW')
+        self.assertEqual(self.index.match(FILENAMES[17]),
+                         'RAQDPS-FW-Cumulative-Effects')
+        self.assertIsNone(self.index.match(FILENAMES[-1]))
+
+    def test_ambiguities(self):
+        """
+        Test that overlapping patterns are reported at build time, and
+        only those.
+        """
+
+        self.assertListEqual(self.index.ambiguities, [
+            ('RAQDPS', 'RAQDPS-FW'),
+            ('RAQDPS', 'RAQDPS-FW-Cumulative-Effects')
+        ])
+
+        self.assertListEqual(find_ambiguities([
+            ('first', 'CMC_glb*'),
+            ('second', '*Radar-Composite*'),
+            ('third', 'CMC_glb_TMP*'),
+            ('fourth', 'CMC_gl[ab]_*')
+        ]), [('first', 'third'), ('third', 'fourth')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,873 @@
+###############################################################################
+#
+# Copyright (C) 2026 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from elasticsearch import exceptions
+
+from geomet_data_registry.tileindex.base import (TileIndexError,
+                                                 TileNotFoundError)
+from geomet_data_registry.tileindex.elasticsearch_ import (
+    backoff,
+    BULK_BACKOFF_MAX,
+    BulkRetry,
+    ElasticsearchTileIndex,
+    INDEX_SETTINGS_V2,
+    load_routes,
+    UPDATE_SCRIPT_ID,
+)
+from geomet_data_registry.util import GLOBAL_GEOMETRY
+from .setup_test_class import doc
+
+THISDIR = os.path.dirname(os.path.realpath(__file__))
+
+PROVIDER_DEF = {
+    'type': 'Elasticsearch',
+    'url': 'http://localhost:9200',
+    'name': 'geomet-data-registry-test',
+    'retries': 3
+}
+
+
+def ndjson(body):
+    """Returns the actions and documents of an NDJSON bulk body"""
+
+    return [json.loads(line) for line in body.splitlines()]
+
+
+def bulk_response(statuses):
+    """Returns an Elasticsearch bulk response of item statuses"""
+
+    items = []
+    for identifier, status in statuses.items():
+        item = {'_id': identifier, 'status': status}
+        if status >= 300:
+            item['error'] = {'type': 'es_rejected_execution_exception'}
+        items.append({'index': item})
+
+    return {
+        'errors': any(status >= 300 for status in statuses.values()),
+        'items': items
+    }
+
+
+@patch('geomet_data_registry.tileindex.elasticsearch_.time.sleep')
+@patch('geomet_data_registry.tileindex.elasticsearch_.Elasticsearch')
+class TestBulkAdd(unittest.TestCase):
+    def test_bulk_add(self, mocked_es, mocked_sleep):
+        """Test that all documents are indexed with a single request."""
+
+        es = mocked_es.return_value
+        es.bulk.return_value = bulk_response({'A': 201, 'B': 200})
+
+        tileindex = ElasticsearchTileIndex(PROVIDER_DEF)
+
+        self.assertEqual(tileindex.bulk_add([doc('A'), doc('B')]),
+                         {'A': 201, 'B': 200})
+        es.bulk.assert_called_once()
+        mocked_sleep.assert_not_called()
+
+    def test_bulk_add_partial_failure(self, mocked_es, mocked_sleep):
+        """Test that only rejected documents are resubmitted."""
+
+        es = mocked_es.return_value
+        es.bulk.side_effect = [
+            bulk_response({'A': 201, 'B': 429, 'C': 400}),
+            bulk_response({'B': 503}),
+            bulk_response({'B': 201})
+        ]
+
+        tileindex = ElasticsearchTileIndex(PROVIDER_DEF)
+
+        self.assertEqual(tileindex.bulk_add([doc('A'), doc('B'), doc('C')]),
+                         {'A': 201, 'B': 201, 'C': 400})
+        self.assertEqual(es.bulk.call_count, 3)
+        self.assertEqual(len(ndjson(es.bulk.call_args_list[1][1]['body'])), 2)
+        self.assertEqual(mocked_sleep.call_count, 2)
+
+    def test_bulk_add_retry_budget(self, mocked_es, mocked_sleep):
+        """Test that documents are retried at most max_retries times."""
+
+        es = mocked_es.return_value
+        es.bulk.side_effect = lambda **kwargs: bulk_response({'A': 429})
+
+        tileindex = ElasticsearchTileIndex(PROVIDER_DEF)
+
+        self.assertEqual(tileindex.bulk_add([doc('A')]), {'A': 429})
+        self.assertEqual(es.bulk.call_count, 4)
+
+    def test_bulk_add_request_error(self, mocked_es, mocked_sleep):
+        """Test that failed requests are retried, and statuses mapped."""
+
+        es = mocked_es.return_value
+        es.bulk.side_effect = [
+            exceptions.ConnectionError('N/A', 'Connection refused', None),
+            bulk_response({'A': 201, 'B': 201})
+        ]
+
+        tileindex = ElasticsearchTileIndex(PROVIDER_DEF)
+
+        self.assertEqual(tileindex.bulk_add([doc('A'), doc('B')]),
+                         {'A': 201, 'B': 201})
+
+        es.bulk.side_effect = exceptions.RequestError(400, 'parsing', None)
+
+        self.assertEqual(tileindex.bulk_add([doc('A'), doc('B')]),
+                         {'A': 400, 'B': 400})
+
+        es.bulk.side_effect = ValueError('Unexpected')
+
+        self.assertEqual(tileindex.bulk_add([doc('A')]), {'A': 500})
+
+    def test_bulk_body(self, mocked_es, mocked_sleep):
+        """Test that bulk bodies are serialized as NDJSON."""
+
+        feature = dict(doc('A'), type='Feature', geometry=GLOBAL_GEOMETRY)
+        feature['properties']['layer'] = 'GDPS.ETA_\u00e9"TT'
+        docs = [feature, doc('B')]
+
+        tileindex = ElasticsearchTileIndex(PROVIDER_DEF)
+
+        for orjson in [True, False]:
+            with self.subTest(orjson=orjson):
+                if orjson:
+                    body = tileindex.bulk_body(docs)
+                else:
+                    with patch('geomet_data_registry.util.orjson', None):
+                        body = tileindex.bulk_body(docs)
+
+                self.assertIsInstance(body, bytes)
+                self.assertTrue(body.endswith(b'\n'))
+                self.assertEqual(ndjson(body), [
+                    {'index': {'_index': 'geomet-data-registry-test',
+                               '_type': '_doc', '_id': 'A'}},
+                    feature,
+                    {'index': {'_index': 'geomet-data-registry-test',
+                               '_type': '_doc', '_id': 'B'}},
+                    doc('B')
+                ])
+
+    def test_backoff(self, mocked_es, mocked_sleep):
+        """Test that retry delays grow exponentially, with jitter."""
+
+        delays = [backoff(attempt) for attempt in range(1, 10)]
+
+        self.assertTrue(0.25 <= delays[0] <= 0.5)
+        self.assertTrue(1 <= delays[2] <= 2)
+        self.assertTrue(all(delay <= BULK_BACKOFF_MAX for delay in delays))
+
+    def test_bulk_retry(self, mocked_es, mocked_sleep):
+        """
+        Test that only documents rejected with a transient error are
+        resubmitted, up to the maximum number of retries.
+        """
+
+        retry = BulkRetry([doc('A'), doc('B')], 2)
+        attempts = []
+
+        for delay, docs in retry:
+            attempts.append((delay, [d['properties']['identifier']
+                                     for d in docs]))
+            retry.update({d['properties']['identifier']: 429
+                          if d['properties']['identifier'] == 'B' else 201
+                          for d in docs})
+
+        self.assertEqual([docs for delay, docs in attempts],
+                         [['A', 'B'], ['B'], ['B']])
+        self.assertEqual(attempts[0][0], 0)
+        self.assertTrue(all(delay > 0 for delay, docs in attempts[1:]))
+        self.assertEqual(retry.status_dict, {'A': 201, 'B': 429})
+
+
+@patch('geomet_data_registry.tileindex.elasticsearch_.Elasticsearch')
+class TestRemove(unittest.TestCase):
+    def test_remove(self, mocked_es):
+        """Test that items are removed by identifier."""
+
+        es = mocked_es.return_value
+        tileindex = ElasticsearchTileIndex(PROVIDER_DEF)
+
+        self.assertEqual(tileindex.remove('A'), 200)
+        es.delete.assert_called_once_with(index='geomet-data-registry-test',
+                                          id='A')
+
+        es.delete.side_effect = exceptions.NotFoundError(404, 'not_found', {})
+        self.assertEqual(tileindex.remove('A'), 404)
+
+        es.delete.side_effect = exceptions.ConnectionError(
+            'N/A', 'Connection refused', None)
+        self.assertEqual(tileindex.remove('A'), 500)
+
+    def test_purge(self, mocked_es):
+        """Test that items of a model are purged by query, throttled."""
+
+        es = mocked_es.return_value
+        es.delete_by_query.return_value = {'deleted': 12}
+
+        tileindex = ElasticsearchTileIndex(PROVIDER_DEF)
+
+        self.assertEqual(tileindex.purge('model_giops',
+                                         '2021-11-26T00:00:00Z', 500), 12)
+
+        kwargs = es.delete_by_query.call_args[1]
+        self.assertEqual(kwargs['index'], 'geomet-data-registry-test')
+        self.assertEqual(kwargs['requests_per_second'], 500)
+        self.assertEqual(kwargs['conflicts'], 'proceed')
+        model_filter, range_filter = kwargs['body']['query']['bool']['filter']
+        self.assertEqual(model_filter['bool']['should'], [
+            {'term': {'properties.model.raw': 'model_giops'}},
+            {'prefix': {'properties.model.raw': 'model_giops_'}}
+        ])
+        self.assertEqual(range_filter, {'range': {
+            'properties.reference_datetime': {'lt': '2021-11-26T00:00:00Z'}}})
+
+
+@patch('geomet_data_registry.tileindex.elasticsearch_.Elasticsearch')
+class TestUpdateByQuery(unittest.TestCase):
+    def test_update_by_query(self, mocked_es):
+        """
+        Test that items are selected with keyword queries and updated with
+        the stored script.
+        """
+
+        es = mocked_es.return_value
+        es.update_by_query.return_value = {'updated': 3, 'failures': []}
+
+        tileindex = ElasticsearchTileIndex(PROVIDER_DEF)
+
+        for model_run in ['20211126T000000Z', '20211126T120000Z']:
+            self.assertEqual(tileindex.update_by_query(
+                {'layer': ['GDPS.ETA_TT', 'GDPS.ETA_UU'],
+                 'model': 'model_gem_*'},
+                {'default_model_run': model_run}), 200)
+
+        es.put_script.assert_called_once()
+        self.assertEqual(es.put_script.call_args[1]['id'], UPDATE_SCRIPT_ID)
+
+        kwargs = es.update_by_query.call_args[1]
+        self.assertEqual(kwargs['slices'], 'auto')
+        self.assertEqual(kwargs['conflicts'], 'proceed')
+        self.assertEqual(kwargs['body'], {
+            'query': {
+                'bool': {
+                    'filter': [
+                        {'terms': {'properties.layer.raw': [
+                            'GDPS.ETA_TT', 'GDPS.ETA_UU']}},
+                        {'wildcard': {'properties.model.raw': {
+                            'wildcard': 'model_gem_*'}}}
+                    ]
+                }
+            },
+            'script': {
+                'id': UPDATE_SCRIPT_ID,
+                'params': {
+                    'properties': {'default_model_run': '20211126T120000Z'}
+                }
+            }
+        })
+
+        es.update_by_query.return_value = {'updated': 2, 'failures': [{
+            'cause': {'type': 'es_rejected_execution_exception'}}]}
+        self.assertEqual(tileindex.update_by_query(
+            {'identifier': 'A'}, {'default_model_run': None}), 500)
+
+    def test_update_by_query_task(self, mocked_es):
+        """Test that updates can run as tasks."""
+
+        es = mocked_es.return_value
+        es.update_by_query.return_value = {'task': 'node:42'}
+
+        tileindex = ElasticsearchTileIndex(PROVIDER_DEF)
+
+        task_id = tileindex.update_by_query(
+            {'layer': 'GDPS.ETA_TT'}, {'default_model_run': None},
+            wait_for_completion=False)
+        self.assertEqual(task_id, 'node:42')
+        self.assertFalse(
+            es.update_by_query.call_args[1]['wait_for_completion'])
+
+        es.tasks.get.return_value = {
+            'completed': False,
+            'task': {'status': {'total': 10, 'updated': 4}}
+        }
+        self.assertEqual(tileindex.task_status(task_id), {
+            'completed': False, 'updated': 4, 'failures': []})
+
+        es.tasks.get.return_value = {
+            'completed': True,
+            'task': {'status': {'total': 10, 'updated': 10}},
+            'response': {'updated': 10, 'failures': []}
+        }
+        self.assertEqual(tileindex.task_status(task_id), {
+            'completed': True, 'updated': 10, 'failures': []})
+        es.tasks.get.assert_called_with(task_id='node:42')
+
+
+@patch('geomet_data_registry.tileindex.elasticsearch_.SCAN_PAGE_SIZE', 2)
+@patch('geomet_data_registry.tileindex.elasticsearch_.Elasticsearch')
+class TestScan(unittest.TestCase):
+    def test_scan(self, mocked_es):
+        """
+        Test that queries are paginated with search_after from a point in
+        time.
+        """
+
+        es = mocked_es.return_value
+        es.info.return_value = {'version': {'number': '7.17.0'}}
+        es.open_point_in_time.return_value = {'id': 'pit-1'}
+        es.search.side_effect = [
+            {'pit_id': 'pit-2', 'hits': {'hits': [
+                {'_source': doc('A'), 'sort': [1]},
+                {'_source': doc('B'), 'sort': [2]}]}},
+            {'pit_id': 'pit-2', 'hits': {'hits': [
+                {'_source': doc('C'), 'sort': [3]}]}}
+        ]
+
+        tileindex = ElasticsearchTileIndex(PROVIDER_DEF)
+
+        features = list(tileindex.scan(
+            {'model': ['model_gem_global', 'model_gem_regional']},
+            ranges={'reference_datetime': ('2021-11-26T00:00:00Z', None)},
+            fields=['identifier']))
+
+        self.assertEqual(features, [doc('A'), doc('B'), doc('C')])
+
+        body = es.search.call_args[1]['body']
+        self.assertEqual(body['pit'], {'id': 'pit-2', 'keep_alive': '1m'})
+        self.assertEqual(body['search_after'], [2])
+        self.assertEqual(body['_source'], ['type', 'properties.identifier'])
+        self.assertEqual(body['query']['bool']['filter'], [
+            {'range': {'properties.reference_datetime': {
+                'gte': '2021-11-26T00:00:00Z'}}},
+            {'terms': {'properties.model.raw': [
+                'model_gem_global', 'model_gem_regional']}}
+        ])
+        es.close_point_in_time.assert_called_once_with(
+            body={'id': 'pit-2'})
+
+    def test_query_limit(self, mocked_es):
+        """Test that queries stop at the limit."""
+
+        es = mocked_es.return_value
+        es.info.return_value = {'version': {'number': '7.17.0'}}
+        es.open_point_in_time.return_value = {'id': 'pit-1'}
+        es.search.return_value = {'hits': {'hits': [
+            {'_source': doc('A'), 'sort': [1]}]}}
+
+        tileindex = ElasticsearchTileIndex(PROVIDER_DEF)
+
+        self.assertEqual(tileindex.query({'layer': 'GDPS.ETA_TT'}, limit=1),
+                         {'type': 'FeatureCollection',
+                          'features': [doc('A')]})
+        self.assertEqual(es.search.call_args[1]['body']['size'], 1)
+        es.close_point_in_time.assert_called_once_with(
+            body={'id': 'pit-1'})
+
+        tileindex = ElasticsearchTileIndex(dict(PROVIDER_DEF, mapping='v2'))
+        with self.assertRaises(TileIndexError):
+            tileindex.query(bbox=[-180, -90, 180, 90])
+
+    def test_scan_scroll(self, mocked_es):
+        """
+        Test that queries scroll on Elasticsearch without points in time.
+        """
+
+        es = mocked_es.return_value
+        es.info.return_value = {'version': {'number': '7.5.2'}}
+        es.search.return_value = {'_scroll_id': 'scroll-1', 'hits': {
+            'hits': [{'_source': doc('A')}, {'_source': doc('B')}]}}
+        es.scroll.side_effect = [
+            {'_scroll_id': 'scroll-2', 'hits': {'hits': [
+                {'_source': doc('C')}]}}
+        ]
+
+        tileindex = ElasticsearchTileIndex(PROVIDER_DEF)
+
+        self.assertEqual(list(tileindex.scan({'layer': 'GDPS.ETA_TT'})),
+                         [doc('A'), doc('B'), doc('C')])
+
+        es.open_point_in_time.assert_not_called()
+        self.assertEqual(es.search.call_args[1]['body']['sort'], ['_doc'])
+        self.assertEqual(es.search.call_args[1]['scroll'], '1m')
+        es.scroll.assert_called_once_with(
+            body={'scroll_id': 'scroll-1', 'scroll': '1m'})
+        es.clear_scroll.assert_called_once_with(
+            body={'scroll_id': 'scroll-2'})
+
+
+@patch('geomet_data_registry.tileindex.elasticsearch_.time.sleep')
+@patch('geomet_data_registry.tileindex.elasticsearch_.Elasticsearch')
+class TestSpool(unittest.TestCase):
+    def setUp(self):
+        """Code that executes before every test function."""
+
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.provider_def = dict(PROVIDER_DEF, spool={
+            'path': self.directory,
+            'latency': 5,
+            'interval': 30
+        })
+
+    def tileindex(self):
+        tileindex = ElasticsearchTileIndex(self.provider_def)
+        self.addCleanup(tileindex.close)
+
+        return tileindex
+
+    def test_spool(self, mocked_es, mocked_sleep):
+        """Test that documents are spooled while Elasticsearch is degraded,
+        and replayed once it recovers."""
+
+        es = mocked_es.return_value
+        es.bulk.side_effect = exceptions.ConnectionTimeout(
+            'TIMEOUT', 'Read timed out', None)
+
+        tileindex = self.tileindex()
+
+        self.assertEqual(tileindex.bulk_add([doc('A'), doc('B')]),
+                         {'A': 202, 'B': 202})
+        self.assertEqual(es.bulk.call_count, 1)
+        self.assertEqual(es.bulk.call_args[1]['request_timeout'], 5)
+        self.assertTrue(tileindex.is_degraded())
+
+        # degraded: spooled without requests
+        self.assertEqual(tileindex.add('C', doc('C')), 202)
+        self.assertEqual(es.bulk.call_count, 1)
+        self.assertEqual(tileindex.replay(), 0)
+
+        es.bulk.side_effect = None
+        es.bulk.return_value = bulk_response({'A': 201, 'B': 201, 'C': 201})
+        tileindex.degraded_until = 0
+
+        # spooled documents pending: spooled to be indexed in order
+        self.assertEqual(tileindex.bulk_add([doc('D')]), {'D': 202})
+
+        self.assertEqual(tileindex.replay(), 4)
+        self.assertEqual(
+            [action['index']['_id'] for action in
+             ndjson(es.bulk.call_args[1]['body']) if 'index' in action],
+            ['A', 'B', 'C', 'D'])
+        self.assertFalse(tileindex.spool.is_pending())
+
+        es.bulk.return_value = bulk_response({'E': 201})
+        self.assertEqual(tileindex.bulk_add([doc('E')]), {'E': 201})
+
+    def test_spool_rejected(self, mocked_es, mocked_sleep):
+        """Test that only documents rejected with a transient error are
+        spooled."""
+
+        es = mocked_es.return_value
+        es.bulk.return_value = bulk_response({'A': 201, 'B': 429, 'C': 400})
+
+        tileindex = self.tileindex()
+
+        self.assertEqual(tileindex.bulk_add([doc('A'), doc('B'), doc('C')]),
+                         {'A': 201, 'B': 202, 'C': 400})
+        mocked_sleep.assert_not_called()
+        self.assertTrue(tileindex.spool.is_pending())
+
+        # replay stops on transient errors, and drops rejected documents
+        tileindex.degraded_until = 0
+        es.bulk.return_value = bulk_response({'B': 503})
+        self.assertEqual(tileindex.replay(), 0)
+        self.assertTrue(tileindex.spool.is_pending())
+
+        tileindex.degraded_until = 0
+        es.bulk.return_value = bulk_response({'B': 400})
+        self.assertEqual(tileindex.replay(), 1)
+        self.assertFalse(tileindex.spool.is_pending())
+
+    def test_spool_dedup(self, mocked_es, mocked_sleep):
+        """Test that spooled documents are only suppressed once
+        replayed."""
+
+        es = mocked_es.return_value
+        es.ping.return_value = False
+
+        self.provider_def['dedup'] = {'ttl': 60, 'size': 100, 'store': None}
+        tileindex = self.tileindex()
+
+        self.assertEqual(tileindex.bulk_add([doc('A')]), {'A': 202})
+        self.assertEqual(tileindex.bulk_add([doc('A')]), {'A': 202})
+
+        tileindex.degraded_until = 0
+        es.ping.return_value = True
+        es.bulk.return_value = bulk_response({'A': 200})
+        self.assertEqual(tileindex.replay(), 2)
+
+        self.assertEqual(tileindex.bulk_add([doc('A')]), {'A': 200})
+        self.assertEqual(es.bulk.call_count, 1)
+
+    def test_spool_replayed(self, mocked_es, mocked_sleep):
+        """Test that registrations of spooled documents are completed
+        once replayed, once per spooled copy."""
+
+        es = mocked_es.return_value
+        es.ping.return_value = False
+
+        tileindex = self.tileindex()
+        first = MagicMock()
+        second = MagicMock()
+
+        tileindex.bulk_add([doc('A'), doc('B')])
+        tileindex.when_replayed(['A', 'B'], first)
+        tileindex.bulk_add([doc('A')])
+        tileindex.when_replayed(['A'], second)
+
+        tileindex.degraded_until = 0
+        es.ping.return_value = True
+        es.bulk.return_value = bulk_response({'A': 201, 'B': 201})
+        self.assertEqual(tileindex.replay(), 3)
+
+        first.assert_called_once_with({'A': 201, 'B': 201})
+        second.assert_called_once_with({'A': 200})
+        self.assertEqual(tileindex.replay_callbacks, {})
+
+    def test_spool_unavailable(self, mocked_es, mocked_sleep):
+        """Test that documents are spooled when Elasticsearch is down."""
+
+        es = mocked_es.return_value
+        es.ping.return_value = False
+
+        tileindex = self.tileindex()
+
+        self.assertTrue(tileindex.is_degraded())
+        self.assertEqual(tileindex.bulk_add([doc('A')]), {'A': 202})
+        es.bulk.assert_not_called()
+
+        # spooling tileindexes stay healthy (and are not re-created)
+        self.assertTrue(tileindex.ping())
+
+        with self.assertRaises(TileIndexError):
+            ElasticsearchTileIndex(PROVIDER_DEF)
+
+        es.ping.return_value = True
+        tileindex = ElasticsearchTileIndex(PROVIDER_DEF)
+        es.ping.return_value = False
+        self.assertFalse(tileindex.ping())
+
+
+@patch('geomet_data_registry.tileindex.elasticsearch_.Elasticsearch')
+class TestDedup(unittest.TestCase):
+    def test_dedup(self, mocked_es):
+        """Test that unchanged registrations are not reindexed."""
+
+        es = mocked_es.return_value
+        es.bulk.return_value = bulk_response({'A': 201, 'B': 201})
+
+        tileindex = ElasticsearchTileIndex(dict(PROVIDER_DEF, dedup={
+            'ttl': 60, 'size': 100, 'store': None}))
+
+        self.assertEqual(tileindex.bulk_add([doc('A'), doc('B')]),
+                         {'A': 201, 'B': 201})
+
+        es.bulk.return_value = bulk_response({'C': 201})
+        self.assertEqual(tileindex.bulk_add([doc('A'), doc('C')]),
+                         {'A': 200, 'C': 201})
+        self.assertEqual(
+            [action['index']['_id'] for action in
+             ndjson(es.bulk.call_args[1]['body']) if 'index' in action],
+            ['C'])
+
+        self.assertEqual(tileindex.add('B', doc('B')), 200)
+        self.assertEqual(es.bulk.call_count, 2)
+        es.index.assert_not_called()
+
+
+@patch('geomet_data_registry.tileindex.elasticsearch_.Elasticsearch')
+class TestRollover(unittest.TestCase):
+    def setUp(self):
+        """Code that executes before every test function."""
+
+        self.provider_def = dict(PROVIDER_DEF, mapping='v2', rollover=True)
+
+    def test_setup_teardown(self, mocked_es):
+        """Test that rollover indices are created from a template."""
+
+        es = mocked_es.return_value
+        es.indices.exists.return_value = False
+        es.indices.exists_template.return_value = False
+
+        tileindex = ElasticsearchTileIndex(self.provider_def)
+        tileindex.setup()
+
+        es.indices.create.assert_not_called()
+        template = es.indices.put_template.call_args[1]
+        self.assertEqual(template['name'], 'geomet-data-registry-test')
+        self.assertEqual(template['body']['index_patterns'],
+                         ['geomet-data-registry-test-*'])
+        self.assertEqual(template['body']['aliases'],
+                         {'geomet-data-registry-test': {}})
+        self.assertEqual(template['body']['mappings'],
+                         INDEX_SETTINGS_V2['mappings'])
+
+        es.indices.exists_template.return_value = True
+        with self.assertRaises(TileIndexError):
+            tileindex.setup()
+
+        es.indices.get_alias.return_value = {
+            'geomet-data-registry-test-model_gem_global-20211126': {},
+            'geomet-data-registry-test-radar-20211126': {}
+        }
+        tileindex.teardown()
+        es.indices.delete.assert_called_once_with(
+            index='geomet-data-registry-test-model_gem_global-20211126,'
+                  'geomet-data-registry-test-radar-20211126')
+        es.indices.delete_template.assert_called_once_with(
+            name='geomet-data-registry-test')
+
+    def test_index_name(self, mocked_es):
+        """Test that documents are indexed per model and per day."""
+
+        es = mocked_es.return_value
+        es.bulk.return_value = bulk_response({'A': 201, 'B': 201})
+
+        tileindex = ElasticsearchTileIndex(self.provider_def)
+
+        tileindex.bulk_add([
+            doc('A'),
+            doc('B', model='model_giops_2D',
+                reference_datetime='2021-11-27T12:00:00Z')
+        ])
+
+        body = ndjson(es.bulk.call_args[1]['body'])
+        self.assertEqual(
+            body[0]['index']['_index'],
+            'geomet-data-registry-test-model_gem_global-20211126')
+        self.assertEqual(
+            body[2]['index']['_index'],
+            'geomet-data-registry-test-model_giops_2d-20211127')
+
+        self.assertEqual(tileindex.keyword_field('layer'), 'properties.layer')
+
+    def test_get(self, mocked_es):
+        """Test that documents are found from hints, or the alias."""
+
+        es = mocked_es.return_value
+        es.get.return_value = {'_source': doc('A')}
+
+        tileindex = ElasticsearchTileIndex(self.provider_def)
+
+        self.assertEqual(tileindex.get('A', 'model_gem_global',
+                                       '20211126000000'), doc('A'))
+        es.get.assert_called_once_with(
+            index='geomet-data-registry-test-model_gem_global-20211126',
+            id='A')
+        es.search.assert_not_called()
+
+        es.search.return_value = {'hits': {'hits': [{
+            '_index': 'geomet-data-registry-test-radar-20211126'}]}}
+        tileindex.get('A')
+        es.get.assert_called_with(
+            index='geomet-data-registry-test-radar-20211126', id='A')
+
+        es.search.return_value = {'hits': {'hits': []}}
+        with self.assertRaises(TileNotFoundError):
+            tileindex.get('B')
+
+    def test_mget(self, mocked_es):
+        """Test that documents are fetched from hints, or the alias."""
+
+        es = mocked_es.return_value
+        es.mget.return_value = {'docs': [
+            {'_id': 'A', 'found': True, '_source': doc('A')},
+            {'_id': 'B', 'found': False}
+        ]}
+
+        tileindex = ElasticsearchTileIndex(self.provider_def)
+
+        self.assertEqual(tileindex.mget(['A', 'B'], 'model_gem_global',
+                                        '20211126000000'), {'A': doc('A')})
+        es.mget.assert_called_once_with(
+            index='geomet-data-registry-test-model_gem_global-20211126',
+            body={'ids': ['A', 'B']})
+
+        es.search.return_value = {'hits': {'hits': [
+            {'_id': 'B', '_source': doc('B')}]}}
+        self.assertEqual(tileindex.mget(['A', 'B']), {'B': doc('B')})
+        self.assertEqual(
+            es.search.call_args[1]['body']['query']['ids']['values'],
+            ['A', 'B'])
+
+    def test_purge(self, mocked_es):
+        """Test that expired days of a model are dropped."""
+
+        es = mocked_es.return_value
+        es.indices.get_alias.return_value = {
+            'geomet-data-registry-test-model_giops-20211124': {},
+            'geomet-data-registry-test-model_giops_2d-20211125': {},
+            'geomet-data-registry-test-model_giops_2d-20211126': {},
+            'geomet-data-registry-test-model_gem_global-20211125': {}
+        }
+        es.count.return_value = {'count': 42}
+
+        tileindex = ElasticsearchTileIndex(self.provider_def)
+
+        self.assertEqual(tileindex.purge('model_giops',
+                                         '2021-11-26T12:00:00Z'), 42)
+        es.count.assert_called_once_with(
+            index='geomet-data-registry-test-model_giops-20211124,'
+                  'geomet-data-registry-test-model_giops_2d-20211125')
+        self.assertEqual(
+            [call[1]['index'] for call in
+             es.indices.delete.call_args_list],
+            ['geomet-data-registry-test-model_giops-20211124',
+             'geomet-data-registry-test-model_giops_2d-20211125'])
+        es.delete_by_query.assert_not_called()
+
+    def test_mapping(self, mocked_es):
+        """Test that unknown mappings are rejected."""
+
+        with self.assertRaises(TileIndexError):
+            ElasticsearchTileIndex(dict(PROVIDER_DEF, mapping='v3'))
+
+        tileindex = ElasticsearchTileIndex(PROVIDER_DEF)
+        self.assertEqual(tileindex.index_name(doc('A')['properties']),
+                         'geomet-data-registry-test')
+        self.assertEqual(tileindex.keyword_field('layer'),
+                         'properties.layer.raw')
+
+
+@patch('geomet_data_registry.tileindex.elasticsearch_.Elasticsearch')
+class TestRoutes(unittest.TestCase):
+    def setUp(self):
+        """Code that executes before every test function."""
+
+        self.provider_def = dict(PROVIDER_DEF, mapping='v2', routes={
+            'hrdps': {
+                'models': ['model_hrdps_*'],
+                'settings': {
+                    'number_of_shards': 2,
+                    'refresh_interval': '30s'
+                }
+            },
+            'marine': {
+                'models': ['model_giops_*', 'model_riops_*']
+            }
+        })
+
+    def test_load_routes(self, mocked_es):
+        """Test that routes are loaded from YAML, and validated."""
+
+        routes = load_routes(os.path.join(THISDIR, '..', 'deploy',
+                                          'tileindex-routes.yml'))
+
+        self.assertEqual(routes['hrdps']['models'],
+                         ['model_hrdps_continental'])
+        self.assertEqual(load_routes(None), {})
+
+        with self.assertRaises(TileIndexError):
+            load_routes({'model-hrdps': {'models': ['model_hrdps_*']}})
+
+    def test_index_name(self, mocked_es):
+        """Test that documents are indexed per route."""
+
+        tileindex = ElasticsearchTileIndex(self.provider_def)
+
+        self.assertEqual(tileindex.route('model_hrdps_continental'), 'hrdps')
+        self.assertEqual(tileindex.route('model_giops_2D'), 'marine')
+        self.assertEqual(tileindex.route('model_gem_global'),
+                         'model_gem_global')
+
+        self.assertEqual(
+            tileindex.index_name({'model': 'model_riops_3D'}),
+            'geomet-data-registry-test-marine')
+        self.assertEqual(
+            tileindex.index_name({'model': 'radar'}),
+            'geomet-data-registry-test-radar')
+
+        tileindex = ElasticsearchTileIndex(dict(self.provider_def,
+                                                rollover=True))
+        self.assertEqual(
+            tileindex.index_name({
+                'model': 'model_hrdps_continental',
+                'reference_datetime': '2021-11-26T00:00:00Z'
+            }),
+            'geomet-data-registry-test-hrdps-20211126')
+
+    def test_setup_teardown(self, mocked_es):
+        """Test that routes get index templates of their settings."""
+
+        es = mocked_es.return_value
+        es.indices.exists.return_value = False
+        es.indices.exists_template.return_value = False
+
+        tileindex = ElasticsearchTileIndex(self.provider_def)
+        tileindex.setup()
+
+        es.indices.create.assert_not_called()
+        templates = {kwargs['name']: kwargs['body'] for args, kwargs in
+                     es.indices.put_template.call_args_list}
+        self.assertEqual(sorted(templates), [
+            'geomet-data-registry-test', 'geomet-data-registry-test-hrdps'])
+        self.assertEqual(templates['geomet-data-registry-test']['aliases'],
+                         {'geomet-data-registry-test': {}})
+        self.assertEqual(templates['geomet-data-registry-test-hrdps'], {
+            'index_patterns': ['geomet-data-registry-test-hrdps',
+                               'geomet-data-registry-test-hrdps-*'],
+            'settings': {
+                'index': {
+                    'number_of_shards': 2,
+                    'refresh_interval': '30s'
+                }
+            },
+            'order': 1
+        })
+
+        es.indices.get_alias.return_value = {
+            'geomet-data-registry-test-hrdps': {}
+        }
+        tileindex.teardown()
+        self.assertEqual(
+            [kwargs['name'] for args, kwargs in
+             es.indices.delete_template.call_args_list],
+            ['geomet-data-registry-test-hrdps', 'geomet-data-registry-test'])
+
+    def test_purge(self, mocked_es):
+        """Test that models sharing a route are purged by query."""
+
+        es = mocked_es.return_value
+        es.delete_by_query.return_value = {'deleted': 5}
+        es.indices.get_alias.return_value = {
+            'geomet-data-registry-test-model_gem_global-20211125': {}
+        }
+        es.count.return_value = {'count': 3}
+
+        tileindex = ElasticsearchTileIndex(dict(self.provider_def,
+                                                rollover=True))
+
+        self.assertEqual(tileindex.purge('model_giops',
+                                         '2021-11-26T00:00:00Z'), 5)
+        self.assertEqual(es.delete_by_query.call_args[1]['index'],
+                         'geomet-data-registry-test')
+
+        self.assertEqual(tileindex.purge('model_gem_global',
+                                         '2021-11-26T00:00:00Z'), 3)
+        es.indices.delete.assert_called_once_with(
+            index='geomet-data-registry-test-model_gem_global-20211125')
+
+
+if __name__ == '__main__':
+    unittest.main()
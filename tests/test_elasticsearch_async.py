@@ -0,0 +1,128 @@
+###############################################################################
+#
+# Copyright (C) 2026 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+import asyncio
+import json
+import threading
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from .setup_test_class import doc
+
+try:
+    from geomet_data_registry.tileindex.elasticsearch_async import (
+        AsyncElasticsearchTileIndex)
+except ImportError:  # elasticsearch[async] (aiohttp) not installed
+    AsyncElasticsearchTileIndex = None
+
+PROVIDER_DEF = {
+    'type': 'ElasticsearchAsync',
+    'url': 'http://localhost:9200',
+    'name': 'geomet-data-registry-test',
+    'retries': 3,
+    'concurrency': 2
+}
+
+
+@unittest.skipIf(AsyncElasticsearchTileIndex is None,
+                 'elasticsearch[async] not installed')
+@patch('geomet_data_registry.tileindex.elasticsearch_async.AsyncElasticsearch')  # noqa
+@patch('geomet_data_registry.tileindex.elasticsearch_.Elasticsearch')
+class TestAsyncElasticsearchTileIndex(unittest.TestCase):
+    def tileindex(self, mocked_async_es):
+        async_es = mocked_async_es.return_value
+        async_es.close = AsyncMock()
+        tileindex = AsyncElasticsearchTileIndex(PROVIDER_DEF)
+        self.addCleanup(tileindex.close)
+
+        return tileindex, async_es
+
+    def test_get(self, mocked_es, mocked_async_es):
+        """Test that lookups are sent with the asynchronous client."""
+
+        tileindex, async_es = self.tileindex(mocked_async_es)
+        async_es.get = AsyncMock(return_value={'_source': doc('A')})
+        async_es.mget = AsyncMock(return_value={'docs': [
+            {'_id': 'A', 'found': True, '_source': doc('A')},
+            {'_id': 'B', 'found': False}
+        ]})
+
+        self.assertEqual(tileindex.get('A'), doc('A'))
+        self.assertEqual(tileindex.mget(['A', 'B']), {'A': doc('A')})
+        mocked_es.return_value.get.assert_not_called()
+
+    def test_concurrency(self, mocked_es, mocked_async_es):
+        """Test that at most `concurrency` requests are in flight."""
+
+        tileindex, async_es = self.tileindex(mocked_async_es)
+        in_flight = []
+        peak = []
+
+        async def bulk(body, **kwargs):
+            in_flight.append(body)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.05)
+            in_flight.remove(body)
+            actions = [json.loads(line) for line in body.splitlines()]
+            return {'errors': False, 'items': [
+                {'index': {'_id': action['index']['_id'], 'status': 201}}
+                for action in actions if 'index' in action]}
+
+        async_es.bulk = bulk
+
+        futures = [tileindex.bulk_send([doc(identifier)])
+                   for identifier in 'ABCD']
+        results = [future.result(timeout=5) for future in futures]
+
+        self.assertEqual(results, [{identifier: 201}
+                                   for identifier in 'ABCD'])
+        self.assertEqual(max(peak), 2)
+
+    def test_bulk_add_request_error(self, mocked_es, mocked_async_es):
+        """Test that documents of a failed request get its status."""
+
+        tileindex, async_es = self.tileindex(mocked_async_es)
+        async_es.bulk = AsyncMock(side_effect=RuntimeError('boom'))
+
+        self.assertEqual(tileindex.bulk_add([doc('A'), doc('B')]),
+                         {'A': 500, 'B': 500})
+
+    def test_update_by_query(self, mocked_es, mocked_async_es):
+        """
+        Test that the update script is stored off the event loop, once.
+        """
+
+        tileindex, async_es = self.tileindex(mocked_async_es)
+        async_es.update_by_query = AsyncMock(return_value={'updated': 2})
+        threads = []
+        mocked_es.return_value.put_script.side_effect = \
+            lambda **kwargs: threads.append(threading.current_thread())
+
+        self.assertEqual(tileindex.update_by_query(
+            {'model': 'model_gem_global'}, {'forecast_hour': 12}), 200)
+        tileindex.update_by_query({'model': 'model_gem_global'},
+                                  {'forecast_hour': 24})
+
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], tileindex.thread)
+        self.assertEqual(async_es.update_by_query.await_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
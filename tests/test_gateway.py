@@ -0,0 +1,239 @@
+###############################################################################
+#
+# Copyright (C) 2026 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from geomet_data_registry.gateway.core import (decode_event, encode_event,
+                                               GatewayClient, GatewayError,
+                                               RegistrationGateway)
+
+
+class MockRedis:
+    """In-memory Redis lists (LPUSH, RPOPLPUSH, LREM and pipelines)"""
+
+    def __init__(self):
+        self.lists = {}
+        self.commands = None
+
+    def queue(self, command, *args):
+        if self.commands is not None:
+            self.commands.append((command, *args))
+            return True
+
+        return False
+
+    def lpush(self, name, *values):
+        if self.queue(self.lpush, name, *values):
+            return self
+
+        for value in values:
+            self.lists.setdefault(name, []).insert(0, value)
+
+        return len(self.lists[name])
+
+    def rpush(self, name, *values):
+        if self.queue(self.rpush, name, *values):
+            return self
+
+        self.lists.setdefault(name, []).extend(values)
+
+        return len(self.lists[name])
+
+    def lrange(self, name, start, end):
+        values = self.lists.get(name, [])
+
+        return values[start:] if end == -1 else values[start:end + 1]
+
+    def delete(self, name):
+        if self.queue(self.delete, name):
+            return self
+
+        return int(self.lists.pop(name, None) is not None)
+
+    def rpoplpush(self, src, dst):
+        if self.queue(self.rpoplpush, src, dst):
+            return self
+
+        source = self.lists.setdefault(src, [])
+        if not source:
+            return None
+
+        value = source.pop()
+        self.lists.setdefault(dst, []).insert(0, value)
+
+        return value
+
+    def brpoplpush(self, src, dst, timeout=0):
+        value = self.rpoplpush(src, dst)
+        if value is None:
+            time.sleep(0.01)
+
+        return value
+
+    def lrem(self, name, count, value):
+        if self.queue(self.lrem, name, count, value):
+            return self
+
+        values = self.lists[name]
+        if count < 0:
+            del values[len(values) - 1 - values[::-1].index(value)]
+        else:
+            values.remove(value)
+
+        return 1
+
+    def pipeline(self, transaction=True):
+        pipeline = MockRedis()
+        pipeline.lists = self.lists
+        pipeline.commands = []
+
+        return pipeline
+
+    def execute(self):
+        commands, self.commands = self.commands, None
+
+        return [command(*args) for command, *args in commands]
+
+
+class TestRegistrationGateway(unittest.TestCase):
+    def setUp(self):
+        """Code that executes before every test function."""
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.url = 'unix://{}'.format(
+            os.path.join(self.tmpdir.name, 'gateway.sock'))
+
+    def tearDown(self):
+        """Code that executes after every test function."""
+
+        self.tmpdir.cleanup()
+
+    def test_events(self):
+        """Test event serialization."""
+
+        event = encode_event('/data/file.grib2', 'https://example.org/f')
+        self.assertEqual(decode_event(event),
+                         ('/data/file.grib2', 'https://example.org/f'))
+        self.assertEqual(decode_event(encode_event('/data/file.grib2')),
+                         ('/data/file.grib2', None))
+
+        with self.assertRaises(ValueError):
+            decode_event('{"url": "https://example.org/f"}')
+        with self.assertRaises(ValueError):
+            decode_event('not json')
+
+    def test_unsupported_url(self):
+        """Test that unsupported gateway URLs are rejected."""
+
+        with self.assertRaises(GatewayError):
+            RegistrationGateway('http://localhost')
+        with self.assertRaises(GatewayError):
+            GatewayClient('http://localhost')
+
+    def test_next_batch(self):
+        """Test that batches are bounded by size and time window."""
+
+        gateway = RegistrationGateway(self.url, batch_size=3,
+                                      batch_window=0.1)
+
+        for i in range(5):
+            gateway.events.put(('file{}'.format(i), None))
+
+        self.assertEqual(len(gateway.next_batch()), 3)
+
+        start = time.monotonic()
+        self.assertEqual(len(gateway.next_batch()), 2)
+        self.assertGreaterEqual(time.monotonic() - start, 0.1)
+
+    @patch('geomet_data_registry.gateway.core.ingest_events')
+    def test_unix_socket(self, mocked_ingest_events):
+        """Test forwarding events through a unix socket."""
+
+        gateway = RegistrationGateway(self.url, batch_size=10,
+                                      batch_window=60)
+        gateway.source.start(gateway.events.put)
+
+        client = GatewayClient(self.url)
+        for i in range(10):
+            client.send('file{}'.format(i), 'url{}'.format(i))
+        client.close()
+
+        gateway.process(gateway.next_batch())
+        gateway.source.stop()
+
+        mocked_ingest_events.assert_called_once_with(
+            [('file{}'.format(i), 'url{}'.format(i)) for i in range(10)], 10)
+
+        with self.assertRaises(GatewayError):
+            client.send('file')
+
+    @patch('geomet_data_registry.gateway.core.ingest_events')
+    def test_redis_list(self, mocked_ingest_events):
+        """
+        Test that Redis events are kept in the processing list until
+        registered.
+        """
+
+        gateway = RegistrationGateway('redis://localhost', batch_size=10,
+                                      batch_window=0.1)
+        source = gateway.source
+        source.redis = MockRedis()
+        source.redis.lpush(source.key, encode_event('file0'), 'not json',
+                           encode_event('file1'))
+
+        source.start(gateway.events.put)
+        batch = gateway.next_batch()
+
+        self.assertEqual(batch, [('file0', None), ('file1', None)])
+        self.assertEqual(source.redis.lists[source.key], [])
+        self.assertEqual(source.redis.lists[source.processing_key],
+                         [encode_event('file1'), encode_event('file0')])
+
+        gateway.process(batch)
+        source.stop()
+
+        mocked_ingest_events.assert_called_once_with(batch, 10)
+        self.assertEqual(source.redis.lists[source.processing_key], [])
+
+    def test_redis_list_recover(self):
+        """
+        Test that unacknowledged events are requeued in order on start.
+        """
+
+        gateway = RegistrationGateway('redis://localhost')
+        source = gateway.source
+        source.redis = MockRedis()
+        source.redis.lists[source.key] = ['c']
+        source.redis.lists[source.processing_key] = ['b', 'a']
+
+        self.assertEqual(source.recover(), 2)
+        self.assertEqual(source.redis.lists[source.key], ['c', 'b', 'a'])
+        self.assertNotIn(source.processing_key, source.redis.lists)
+
+        popped = [source.redis.rpoplpush(source.key, source.processing_key)
+                  for _ in range(3)]
+        self.assertEqual(popped, ['a', 'b', 'c'])
+
+
+if __name__ == '__main__':
+    unittest.main()
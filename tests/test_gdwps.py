@@ -57,6 +57,7 @@ class TestGdwpsLayer(unittest.TestCase, Setup):
             'name': 'gdwps',
             'store': self.mocked_load_plugin.return_value,
             'tileindex': self.mocked_load_plugin.return_value,
+            'layer_dependencies': True,
         }
 
         gdwps_layer_attr = self.layer_handler['gdwps'].__dict__
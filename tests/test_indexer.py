@@ -0,0 +1,153 @@
+###############################################################################
+#
+# Copyright (C) 2026 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+from concurrent.futures import Future
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from geomet_data_registry.tileindex.indexer import BulkIndexer
+from .setup_test_class import doc
+
+
+class TestBulkIndexer(unittest.TestCase):
+    def setUp(self):
+        """Code that executes before every test function."""
+
+        self.send = MagicMock(side_effect=lambda docs: {
+            d['properties']['identifier']: 201 for d in docs})
+
+    def test_max_docs(self):
+        """Test that the buffer is indexed when full, in one request."""
+
+        indexer = BulkIndexer(self.send, max_docs=4, max_age=60)
+
+        futures = [indexer.submit([doc('A'), doc('B')]),
+                   indexer.submit([doc('C')])]
+        self.assertEqual(indexer.get('C'), doc('C'))
+
+        futures.append(indexer.submit([doc('D')]))
+
+        self.assertEqual(futures[0].result(timeout=5), {'A': 201, 'B': 201})
+        self.assertEqual(futures[2].result(timeout=5), {'D': 201})
+        self.send.assert_called_once()
+        self.assertEqual(len(self.send.call_args[0][0]), 4)
+
+        indexer.close()
+        self.assertIsNone(indexer.get('C'))
+
+    def test_max_age(self):
+        """Test that buffered documents are indexed after max_age."""
+
+        indexer = BulkIndexer(self.send, max_docs=100, max_age=0.05)
+
+        start = time.monotonic()
+        future = indexer.submit([doc('A')])
+        self.assertEqual(future.result(timeout=5), {'A': 201})
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+
+        indexer.close()
+
+    def test_errors(self):
+        """Test that indexing errors are reported per document."""
+
+        indexer = BulkIndexer(MagicMock(return_value=500), max_age=60)
+
+        future = indexer.submit([doc('A'), doc('B')])
+        indexer.flush()
+        self.assertEqual(future.result(), {'A': 500, 'B': 500})
+
+        indexer.send = MagicMock(side_effect=ConnectionError)
+        future = indexer.submit([doc('C')])
+        indexer.close()
+        self.assertEqual(future.result(), {'C': 500})
+
+        with self.assertRaises(RuntimeError):
+            indexer.submit([doc('D')])
+
+    def test_callback_order(self):
+        """Test that futures are resolved in submission order."""
+
+        indexer = BulkIndexer(self.send, max_age=60)
+        resolved = []
+
+        for identifier in 'ABCDE':
+            indexer.submit([doc(identifier)]).add_done_callback(
+                lambda future: resolved.extend(future.result().keys()))
+
+        indexer.flush()
+        self.assertEqual(resolved, list('ABCDE'))
+
+        indexer.close()
+
+    def test_in_flight(self):
+        """
+        Test that asynchronous bulk requests are sent concurrently, and
+        resolved in submission order.
+        """
+
+        requests = []
+
+        def send(docs):
+            future = Future()
+            requests.append(future)
+            return future
+
+        def wait_for(condition):
+            deadline = time.monotonic() + 5
+            while not condition() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            return condition()
+
+        indexer = BulkIndexer(send, max_docs=1, max_age=60, max_in_flight=2)
+        resolved = []
+
+        try:
+            # one bulk request per document, at most two of them in flight
+            for i, identifier in enumerate('ABC'):
+                indexer.submit([doc(identifier)]).add_done_callback(
+                    lambda future: resolved.extend(future.result().keys()))
+                wait_for(lambda: len(requests) == min(i + 1, 2))
+
+            # two requests in flight, the third waits for a free slot
+            time.sleep(0.1)
+            self.assertEqual(len(requests), 2)
+            self.assertIsNotNone(indexer.get('A'))
+
+            requests[1].set_result({'B': 201})
+            time.sleep(0.1)
+            self.assertEqual(resolved, [])
+
+            requests[0].set_result({'A': 201})
+            self.assertTrue(wait_for(lambda: len(requests) == 3))
+            self.assertEqual(resolved, ['A', 'B'])
+            self.assertIsNone(indexer.get('A'))
+
+            requests[2].set_exception(RuntimeError('timeout'))
+            indexer.flush()
+            self.assertEqual(resolved, ['A', 'B', 'C'])
+        finally:
+            for request in requests:
+                if not request.done():
+                    request.set_result(500)
+            indexer.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
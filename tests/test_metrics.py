@@ -0,0 +1,105 @@
+###############################################################################
+#
+# Copyright (C) 2026 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+import os
+import tempfile
+import unittest
+
+from geomet_data_registry.metrics import (METRIC_NAME, NULL_SPAN,
+                                          StageMetrics)
+
+
+class TestStageMetrics(unittest.TestCase):
+    def test_disabled(self):
+        """Test that spans are no-ops when metrics are disabled."""
+
+        metrics = StageMetrics()
+
+        with metrics.span('dispatch') as span:
+            span.model = 'GEPS'
+
+        self.assertIs(span, NULL_SPAN)
+        self.assertEqual(metrics.histograms, {})
+
+    def test_histograms(self):
+        """Test per-stage, per-model histograms and their rendering."""
+
+        metrics = StageMetrics()
+        metrics.enabled = True
+
+        metrics.observe('tileindex_add', 'geps', 0.0002)
+        metrics.observe('tileindex_add', 'geps', 0.003)
+        metrics.observe('tileindex_add', 'geps', 60)
+        with metrics.span('dispatch') as span:
+            span.model = 'GEPS'
+
+        self.assertEqual(sorted(metrics.histograms.keys()), [
+            ('dispatch', 'GEPS'), ('tileindex_add', 'geps')])
+
+        text = metrics.render()
+        series = 'stage="tileindex_add",model="geps"'
+        self.assertIn('{}_bucket{{{},le="0.0005"}} 1'.format(
+            METRIC_NAME, series), text)
+        self.assertIn('{}_bucket{{{},le="0.005"}} 2'.format(
+            METRIC_NAME, series), text)
+        self.assertIn('{}_bucket{{{},le="10"}} 2'.format(
+            METRIC_NAME, series), text)
+        self.assertIn('{}_bucket{{{},le="+Inf"}} 3'.format(
+            METRIC_NAME, series), text)
+        self.assertIn('{}_count{{{}}} 3'.format(METRIC_NAME, series), text)
+
+    def test_counters(self):
+        """Test per-model counters and their rendering."""
+
+        metrics = StageMetrics()
+        metrics.increment('registrations_suppressed', 'geps')
+        self.assertEqual(metrics.counters, {})
+
+        metrics.enabled = True
+        metrics.increment('registrations_suppressed', 'geps')
+        metrics.increment('registrations_suppressed', 'geps', 2)
+
+        self.assertIn(
+            '# TYPE geomet_data_registry_registrations_suppressed_total '
+            'counter', metrics.render())
+        self.assertIn(
+            'geomet_data_registry_registrations_suppressed_total'
+            '{model="geps"} 3', metrics.render())
+
+    def test_textfile(self):
+        """Test writing metrics to a textfile collector directory."""
+
+        with tempfile.TemporaryDirectory() as textfile_dir:
+            metrics = StageMetrics()
+            metrics.setup(textfile_dir=textfile_dir, textfile_interval=0)
+            self.assertTrue(metrics.enabled)
+
+            metrics.observe('update_count', 'rdpa', 0.01)
+
+            filename = os.path.join(textfile_dir,
+                                    'geomet-data-registry-{}.prom'.format(
+                                        os.getpid()))
+            with open(filename) as fh:
+                self.assertIn('pid="{}"'.format(os.getpid()), fh.read())
+
+            metrics.textfile_dir = None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -57,6 +57,7 @@ class TestModelGemGlobalLayer(unittest.TestCase, Setup):
             'name': 'model_gem_global',
             'store': self.mocked_load_plugin.return_value,
             'tileindex': self.mocked_load_plugin.return_value,
+            'layer_dependencies': True,
         }
 
         model_gem_global_layer_attr = (
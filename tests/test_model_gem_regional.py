@@ -57,6 +57,7 @@ class TestModelGemRegionalLayer(unittest.TestCase, Setup):
             'name': 'model_gem_regional',
             'store': self.mocked_load_plugin.return_value,
             'tileindex': self.mocked_load_plugin.return_value,
+            'layer_dependencies': True,
         }
 
         model_gem_regional_layer_attr = (
@@ -59,6 +59,7 @@ class TestModelHrdpsContinentalLayer(unittest.TestCase, Setup):
             'name': 'model_hrdps_continental',
             'store': self.mocked_load_plugin.return_value,
             'tileindex': self.mocked_load_plugin.return_value,
+            'layer_dependencies': True,
         }
 
         model_hrdps_continental_layer_attr = (
@@ -57,6 +57,7 @@ class TestRiopsLayer(unittest.TestCase, Setup):
             'name': 'model_riops',
             'store': self.mocked_load_plugin.return_value,
             'tileindex': self.mocked_load_plugin.return_value,
+            'layer_dependencies': True,
             'dimension': None,
             'bands': None,
         }
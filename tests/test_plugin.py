@@ -0,0 +1,103 @@
+###############################################################################
+#
+# Copyright (C) 2026 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+import unittest
+from unittest.mock import patch, MagicMock
+
+from geomet_data_registry.plugin import PluginRegistry
+
+
+class TestPluginRegistry(unittest.TestCase):
+    def setUp(self):
+        """Code that executes before every test function."""
+
+        self.load_plugin_patcher = patch(
+            'geomet_data_registry.plugin.load_plugin',
+            side_effect=lambda plugin_type, plugin_def: MagicMock()
+        )
+        self.mocked_load_plugin = self.load_plugin_patcher.start()
+
+        self.provider_def = {'type': 'Redis', 'url': 'redis://localhost'}
+
+    def tearDown(self):
+        """Code that executes after every test function."""
+
+        self.load_plugin_patcher.stop()
+
+    def test_shared(self):
+        """
+        Test that the same plugin instance is returned for the same plugin
+        definition, and that health checks are rate limited.
+        """
+
+        registry = PluginRegistry(health_check_interval=60)
+
+        plugin = registry.get('store', self.provider_def)
+        self.assertIs(plugin, registry.get('store', dict(self.provider_def)))
+        self.assertIsNot(plugin, registry.get('tileindex', self.provider_def))
+
+        self.assertEqual(self.mocked_load_plugin.call_count, 2)
+        plugin.ping.assert_not_called()
+
+    def test_reconnect(self):
+        """
+        Test that a shared plugin failing its health check is re-created.
+        """
+
+        registry = PluginRegistry(health_check_interval=0)
+
+        plugin = registry.get('store', self.provider_def)
+        plugin.ping.return_value = True
+        self.assertIs(plugin, registry.get('store', self.provider_def))
+
+        plugin.ping.side_effect = ConnectionError
+        new_plugin = registry.get('store', self.provider_def)
+        self.assertIsNot(plugin, new_plugin)
+        self.assertEqual(self.mocked_load_plugin.call_count, 2)
+
+        # discarded plugins are closed
+        plugin.close.assert_called_once()
+        new_plugin.close.assert_not_called()
+
+    def test_invalidate(self):
+        """
+        Test that invalidated plugins are re-created on next use.
+        """
+
+        registry = PluginRegistry()
+
+        store = registry.get('store', self.provider_def)
+        tileindex = registry.get('tileindex', self.provider_def)
+
+        registry.invalidate('store')
+        self.assertIsNot(store, registry.get('store', self.provider_def))
+        self.assertIs(tileindex,
+                      registry.get('tileindex', self.provider_def))
+
+        store.close.assert_called_once()
+        tileindex.close.assert_not_called()
+
+        registry.invalidate()
+        self.assertIsNot(tileindex,
+                         registry.get('tileindex', self.provider_def))
+        tileindex.close.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+###############################################################################
+#
+# Copyright (C) 2026 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+from datetime import datetime, timezone
+import json
+import os
+import unittest
+from unittest.mock import patch, MagicMock
+
+from yaml import load, Loader
+
+from geomet_data_registry.tileindex.purge import (find_model_runs,
+                                                  RetentionPurger)
+
+THISDIR = os.path.dirname(os.path.realpath(__file__))
+
+DEPLOY_DIR = os.path.join(THISDIR, '..', 'deploy', 'default')
+
+
+def model_config(model):
+    """Returns the default configuration of a model"""
+
+    with open(os.path.join(DEPLOY_DIR, '{}.yml'.format(model))) as fh:
+        return load(fh, Loader=Loader)
+
+
+class TestRetentionPurger(unittest.TestCase):
+    def setUp(self):
+        """Code that executes before every test function."""
+
+        self.tileindex = MagicMock()
+        self.tileindex.purge.return_value = 10
+
+        self.store = MagicMock()
+        self.store.list_keys.side_effect = lambda pattern: {
+            'geomet-data-registry_*': [
+                'geomet-data-registry_model_gem_global',
+                'geomet-data-registry_model_gem_global_version',
+                'geomet-data-registry_model_giops',
+                'geomet-data-registry_radar',
+                'geomet-data-registry_radar_version',
+                'geomet-data-registry_RADAR_1KM_RRAI_default_time',
+                'geomet-data-registry_model_gem_global_TMP_TGL_2_00Z_count'
+            ],
+            'geomet-data-registry_model_gem_global_*_count': [
+                'geomet-data-registry_model_gem_global_TMP_TGL_2_00Z_count',
+                'geomet-data-registry_model_gem_global_TMP_TGL_2_03Z_count',
+                'geomet-data-registry_model_gem_global_XX_00Z_count'
+            ]
+        }.get(pattern, [])
+
+        self.configs = {
+            'model_gem_global': model_config('model_gem_global'),
+            'model_giops': model_config('model_giops'),
+            'radar': {'radar': {'model': 'RADAR'}}
+        }
+
+        # stores populated before configuration versions have none
+        values = {
+            'model_giops': json.dumps(self.configs['model_giops']),
+            'RADAR_1KM_RRAI_default_time': '2021-11-26T12:00:00Z'
+        }
+        self.store.get_keys.side_effect = \
+            lambda keys: [values.get(key) for key in keys]
+
+        self.now = datetime(2021, 11, 26, 12, tzinfo=timezone.utc)
+
+    @patch('geomet_data_registry.tileindex.purge.MODEL_CONFIG_CACHE')
+    def test_purge(self, mocked_config_cache):
+        """
+        Test that models are purged as per their retention, and that
+        stale count keys are removed.
+        """
+
+        mocked_config_cache.get.side_effect = \
+            lambda store, model: self.configs[model]
+
+        purger = RetentionPurger(self.tileindex, self.store, 100, pause=0)
+        summary = purger.purge(now=self.now)
+
+        self.assertEqual(summary, {'model_gem_global': 10,
+                                   'model_giops': 10})
+        self.tileindex.purge.assert_any_call(
+            'model_gem_global', '2021-11-24T12:00:00Z', 100)
+        self.tileindex.purge.assert_any_call(
+            'model_giops', '2021-11-21T12:00:00Z', 100)
+        self.assertEqual(self.tileindex.purge.call_count, 2)
+
+        deleted = [call[0][0] for call in
+                   self.store.delete_key.call_args_list]
+        self.assertEqual(deleted, [
+            'geomet-data-registry_model_gem_global_TMP_TGL_2_03Z_count',
+            'geomet-data-registry_model_gem_global_XX_00Z_count'
+        ])
+
+    @patch('geomet_data_registry.tileindex.purge.MODEL_CONFIG_CACHE')
+    def test_purge_error(self, mocked_config_cache):
+        """Test that a failing model does not stop the purge."""
+
+        mocked_config_cache.get.side_effect = \
+            lambda store, model: self.configs[model]
+        self.tileindex.purge.side_effect = [Exception('timeout'), 5]
+
+        purger = RetentionPurger(self.tileindex, self.store, pause=0)
+
+        self.assertEqual(purger.purge(now=self.now), {'model_giops': 5})
+        self.store.delete_key.assert_not_called()
+
+    def test_models(self):
+        """
+        Test that models are listed whether or not their configuration
+        is versioned.
+        """
+
+        purger = RetentionPurger(self.tileindex, self.store)
+
+        self.assertEqual(purger.models(),
+                         ['model_gem_global', 'model_giops', 'radar'])
+        self.store.get_keys.assert_called_once_with(
+            ['model_giops', 'RADAR_1KM_RRAI_default_time'])
+
+        self.store.list_keys.side_effect = None
+        self.store.list_keys.return_value = []
+
+        with self.assertLogs('geomet_data_registry.tileindex.purge',
+                             level='WARNING'):
+            self.assertEqual(purger.models(), [])
+
+    def test_find_model_runs(self):
+        """Test that configured variables and model runs are found."""
+
+        model_runs = set(find_model_runs(
+            model_config('model_gem_global')))
+        self.assertIn(('TMP_TGL_2', '00Z'), model_runs)
+        self.assertIn(('TMP_TGL_2', '12Z'), model_runs)
+        self.assertNotIn(('TMP_TGL_2', '03Z'), model_runs)
+
+        # nested (per dimension) configurations
+        model_runs = set(find_model_runs(model_config('model_giops')))
+        self.assertTrue(model_runs)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -59,6 +59,7 @@ class TestRdwpsLayer(unittest.TestCase, Setup):
             'name': 'rdwps',
             'store': self.mocked_load_plugin.return_value,
             'tileindex': self.mocked_load_plugin.return_value,
+            'layer_dependencies': True,
         }
 
         rdwps_layer_attr = self.layer_handler['rdwps'].__dict__
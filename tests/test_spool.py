@@ -0,0 +1,144 @@
+###############################################################################
+#
+# Copyright (C) 2026 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from geomet_data_registry.tileindex.spool import Spool
+from .setup_test_class import doc
+
+
+class TestSpool(unittest.TestCase):
+    """Test suite for the write-ahead spool"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.spool = Spool(self.directory, sync_docs=2)
+
+    def tearDown(self):
+        self.spool.close()
+        shutil.rmtree(self.directory)
+
+    def test_accept(self):
+        """Test that documents are spooled while the spool is pending."""
+
+        self.assertFalse(self.spool.accept([doc('A')]))
+        self.assertFalse(self.spool.is_pending())
+
+        self.assertTrue(self.spool.accept([doc('A')], force=True))
+        self.assertTrue(self.spool.is_pending())
+        self.assertTrue(self.spool.accept([doc('B')]))
+
+        self.assertEqual(self.spool.segments(), [])
+        self.spool.close()
+
+        segments = self.spool.segments()
+        self.assertEqual(len(segments), 1)
+        self.assertEqual(list(self.spool.read(segments[0])),
+                         [[doc('A'), doc('B')]])
+
+    @patch('geomet_data_registry.tileindex.spool.os.fsync')
+    def test_sync(self, mocked_fsync):
+        """Test that segments are synced every sync_docs documents."""
+
+        self.spool.append([doc('A')])
+        mocked_fsync.assert_not_called()
+
+        self.spool.append([doc('B')])
+        self.assertEqual(mocked_fsync.call_count, 1)
+
+    def test_rotate(self):
+        """Test that segments are closed at segment_bytes."""
+
+        self.spool.segment_bytes = 1
+        self.spool.append([doc('A')])
+        self.spool.append([doc('B')])
+
+        self.assertEqual(len(self.spool.segments()), 2)
+
+    def test_replay(self):
+        """Test that segments are replayed in order, and removed."""
+
+        batches = []
+
+        self.spool.segment_bytes = 1
+        self.spool.append([doc('A'), doc('B'), doc('C')])
+        self.spool.append([doc('D')])
+
+        def send(batch):
+            batches.append([d['properties']['identifier'] for d in batch])
+            return True
+
+        self.assertEqual(self.spool.replay(send, batch_docs=2), 4)
+        self.assertEqual(batches, [['A', 'B'], ['C'], ['D']])
+        self.assertFalse(self.spool.is_pending())
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_replay_failure(self):
+        """Test that segments are kept when a batch cannot be indexed."""
+
+        self.spool.append([doc('A'), doc('B')])
+
+        self.assertEqual(self.spool.replay(lambda batch: False), 0)
+        self.assertEqual(len(self.spool.segments()), 1)
+
+        self.assertEqual(self.spool.replay(lambda batch: True), 2)
+        self.assertEqual(self.spool.segments(), [])
+
+    def test_recover(self):
+        """Test that segments of stopped processes are recovered."""
+
+        filepath = os.path.join(self.directory,
+                                '1-999999999.ndjson.open')
+        with open(filepath, 'wb') as fh:
+            fh.write(b'{"properties": {"identifier": "A"}}\n{"prop')
+
+        with patch('geomet_data_registry.tileindex.spool.is_running',
+                   return_value=False):
+            spool = Spool(self.directory)
+
+        segments = spool.segments()
+        self.assertEqual(segments, [filepath[:-len('.open')]])
+        self.assertEqual(list(spool.read(segments[0])),
+                         [[{'properties': {'identifier': 'A'}}]])
+        self.assertTrue(spool.is_pending())
+
+    @patch('geomet_data_registry.tileindex.spool.os.listdir')
+    def test_pending(self, mocked_listdir):
+        """Test that pending documents are tracked without listing the
+        spool directory."""
+
+        self.assertTrue(self.spool.accept([doc('A')], force=True))
+        self.assertTrue(self.spool.accept([doc('B')]))
+        mocked_listdir.assert_not_called()
+
+        mocked_listdir.return_value = []
+        self.spool.replay(lambda batch: True)
+        self.assertFalse(self.spool.is_pending())
+
+        mocked_listdir.reset_mock()
+        self.assertFalse(self.spool.accept([doc('C')]))
+        mocked_listdir.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,261 @@
+###############################################################################
+#
+# Copyright (C) 2026 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from geomet_data_registry.tileindex.base import (TileIndexError,
+                                                 TileNotFoundError)
+from geomet_data_registry.tileindex.sqlite_ import (
+    geometry_bbox,
+    SQLiteTileIndex,
+)
+from .setup_test_class import doc
+
+
+class TestSQLiteTileIndex(unittest.TestCase):
+    def setUp(self):
+        """Code that executes before every test function."""
+
+        self.directory = tempfile.mkdtemp()
+        self.tileindex = SQLiteTileIndex({
+            'type': 'SQLite',
+            'url': self.directory,
+            'name': 'geomet-data-registry-test'
+        })
+        self.tileindex.setup()
+
+    def tearDown(self):
+        """Code that executes after every test function."""
+
+        shutil.rmtree(self.directory)
+
+    def test_setup_teardown(self):
+        """Test that the tileindex is created and deleted once."""
+
+        self.assertTrue(self.tileindex.ping())
+        self.assertTrue(os.path.exists(self.tileindex.database))
+
+        with self.assertRaises(TileIndexError):
+            self.tileindex.setup()
+
+        self.assertTrue(self.tileindex.teardown())
+        self.assertFalse(os.path.exists(self.tileindex.database))
+
+    def test_add_get(self):
+        """Test that items are created, replaced and retrieved."""
+
+        self.assertEqual(self.tileindex.add('A', doc('A')), 201)
+        self.assertEqual(
+            self.tileindex.add('A', doc('A', layer='GDPS.ETA_UU')), 200)
+
+        item = self.tileindex.get('A')
+        self.assertEqual(item['properties']['layer'], 'GDPS.ETA_UU')
+        self.assertIsNotNone(item['properties']['register_datetime'])
+
+        with self.assertRaises(TileNotFoundError):
+            self.tileindex.get('B')
+
+    def test_mget(self):
+        """Test that documents are fetched with a single query."""
+
+        self.tileindex.bulk_add([doc('A'), doc('B')])
+
+        docs = self.tileindex.mget(['A', 'B', 'C'])
+        self.assertEqual(sorted(docs), ['A', 'B'])
+        self.assertEqual(docs['B']['properties']['identifier'], 'B')
+        self.assertEqual(self.tileindex.mget([]), {})
+
+    def test_bulk_add(self):
+        """Test that items are indexed in one transaction."""
+
+        self.tileindex.add('A', doc('A'))
+
+        self.assertEqual(self.tileindex.bulk_add([doc('A'), doc('B')]),
+                         {'A': 200, 'B': 201})
+        self.assertEqual(len(self.tileindex.query()['features']), 2)
+
+    def test_update(self):
+        """Test that items are partially updated."""
+
+        self.tileindex.add('A', doc('A'))
+
+        self.assertEqual(self.tileindex.update(
+            'A', {'properties': {'layer': 'GDPS.ETA_UU'}}), 200)
+        item = self.tileindex.get('A')
+        self.assertEqual(item['properties']['layer'], 'GDPS.ETA_UU')
+        self.assertEqual(item['properties']['filepath'], '/data/A.grib2')
+        self.assertEqual(len(self.tileindex.query(
+            {'layer': 'GDPS.ETA_UU'})['features']), 1)
+
+        self.assertEqual(self.tileindex.update('B', {}), 404)
+
+    def test_update_by_query(self):
+        """Test that items matching a wildcard query are updated."""
+
+        self.tileindex.bulk_add([doc('A'), doc('B', layer='RDPS.ETA_TT'),
+                                 doc('C', layer='GDPS.ETA_UU')])
+
+        self.assertEqual(self.tileindex.update_by_query(
+            {'layer': 'GDPS.*'}, {'default_model_run': '20211126T000000Z'}),
+            200)
+
+        features = self.tileindex.query(
+            {'default_model_run': '20211126T000000Z'})['features']
+        self.assertEqual([feature['properties']['identifier']
+                          for feature in features], ['A', 'C'])
+
+        self.assertEqual(self.tileindex.update_by_query(
+            {'layer': ['RDPS.ETA_TT', 'GDPS.ETA_UU']},
+            {'default_model_run': '20211126T120000Z'}), 200)
+
+        features = self.tileindex.query(
+            {'default_model_run': '20211126T120000Z'})['features']
+        self.assertEqual([feature['properties']['identifier']
+                          for feature in features], ['B', 'C'])
+
+    def test_update_by_query_json(self):
+        """Test that updated values are stored as JSON values."""
+
+        self.tileindex.add('A', doc('A'))
+
+        self.assertEqual(self.tileindex.update_by_query(
+            {'layer': 'GDPS.ETA_TT'}, {'active': True, 'members': [1, 2],
+                                       'default_model_run': None}), 200)
+
+        properties = self.tileindex.query(
+            {'layer': 'GDPS.ETA_TT'})['features'][0]['properties']
+        self.assertIs(properties['active'], True)
+        self.assertEqual(properties['members'], [1, 2])
+        self.assertIsNone(properties['default_model_run'])
+
+    def test_remove(self):
+        """Test that items are removed."""
+
+        self.tileindex.add('A', doc('A'))
+
+        self.assertEqual(self.tileindex.remove('A'), 200)
+        self.assertEqual(self.tileindex.remove('A'), 404)
+        self.assertEqual(self.tileindex.query(bbox=[-10, -10, 10, 10]),
+                         {'type': 'FeatureCollection', 'features': []})
+
+    def test_purge(self):
+        """Test that items of a model older than a model run are purged."""
+
+        self.tileindex.bulk_add([
+            doc('A', reference_datetime='2021-11-25T00:00:00Z'),
+            doc('B', reference_datetime='2021-11-26T00:00:00Z'),
+            doc('C', model='model_gem_regional',
+                reference_datetime='2021-11-25T00:00:00Z'),
+            doc('D', model='model_giops_2D',
+                reference_datetime='2021-11-25T00:00:00Z'),
+            doc('E', model='model_giops',
+                reference_datetime='2021-11-25T00:00:00Z')
+        ])
+
+        self.assertEqual(self.tileindex.purge(
+            'model_gem_global', '2021-11-26T00:00:00Z'), 1)
+        self.assertEqual(self.tileindex.purge(
+            'model_giops', '2021-11-26T00:00:00Z'), 2)
+
+        with self.assertRaises(TileNotFoundError):
+            self.tileindex.get('A')
+        for identifier in ['B', 'C']:
+            self.assertEqual(self.tileindex.get(identifier)['properties'][
+                'identifier'], identifier)
+        self.assertEqual(
+            len(self.tileindex.query(bbox=[-10, -10, 10, 10])['features']),
+            2)
+
+    def test_purge_index(self):
+        """Test that purges use the model index."""
+
+        tileindex = self.tileindex
+        statements = []
+        tileindex.connection.set_trace_callback(statements.append)
+        tileindex.purge('model_giops', '2021-11-26T00:00:00Z')
+        tileindex.connection.set_trace_callback(None)
+
+        select = [sql for sql in statements if sql.startswith('SELECT')][0]
+        plan = ' '.join(row[3] for row in tileindex.connection.execute(
+            'EXPLAIN QUERY PLAN {}'.format(select)))
+        self.assertEqual(plan.count('USING INDEX items_model'), 2)
+
+    def test_query(self):
+        """Test queries by property, bounding box and limit."""
+
+        self.tileindex.bulk_add([
+            doc('A', bbox=(-140, 40, -50, 85)),
+            doc('B', forecast_hour_datetime='2021-11-26T09:00:00Z',
+                bbox=(-140, 40, -50, 85)),
+            doc('C', bbox=(0, -10, 10, 10))
+        ])
+
+        def identifiers(**kwargs):
+            return [feature['properties']['identifier'] for feature in
+                    self.tileindex.query(**kwargs)['features']]
+
+        self.assertEqual(identifiers(), ['A', 'B', 'C'])
+        self.assertEqual(identifiers(
+            query_dict={'forecast_hour_datetime': '2021-11-26T06:00:00Z'}),
+            ['A', 'C'])
+        self.assertEqual(identifiers(bbox=[-100, 50, -90, 60]), ['A', 'B'])
+        self.assertEqual(identifiers(
+            query_dict={'layer': 'GDPS.*'}, bbox=[-100, 50, -90, 60],
+            limit=1), ['A'])
+
+    @patch('geomet_data_registry.tileindex.sqlite_.SCAN_PAGE_SIZE', 2)
+    def test_scan(self):
+        """Test paginated queries by range, with selected fields."""
+
+        self.tileindex.bulk_add([
+            doc(identifier, reference_datetime='2021-11-2{}T00:00:00Z'.format(
+                day)) for identifier, day in zip('ABCDEF', '455566')])
+
+        features = list(self.tileindex.scan(
+            ranges={'reference_datetime': ('2021-11-25T00:00:00Z', None)},
+            fields=['identifier']))
+        self.assertEqual(features, [
+            {'type': 'Feature', 'properties': {'identifier': identifier}}
+            for identifier in 'BCDEF'])
+
+        features = self.tileindex.query(
+            {'layer': ['GDPS.ETA_TT']},
+            ranges={'reference_datetime': (None, '2021-11-25T00:00:00Z')},
+            limit=3)['features']
+        self.assertEqual([feature['properties']['identifier']
+                          for feature in features], ['A', 'B', 'C'])
+        self.assertIn('geometry', features[0])
+
+    def test_geometry_bbox(self):
+        """Test the bounding box of GeoJSON geometries."""
+
+        self.assertEqual(geometry_bbox(doc('A')['geometry']),
+                         [-180, -90, 180, 90])
+        self.assertEqual(geometry_bbox({'type': 'Point',
+                                        'coordinates': [1, 2]}),
+                         [1, 2, 1, 2])
+        self.assertIsNone(geometry_bbox(None))
+
+
+if __name__ == '__main__':
+    unittest.main()
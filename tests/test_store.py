@@ -0,0 +1,176 @@
+###############################################################################
+#
+# Copyright (C) 2026 Tom Kralidis
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+
+import json
+import unittest
+from unittest.mock import patch
+
+from geomet_data_registry.store.base import BaseStore, partition_config
+from geomet_data_registry.store.redis_ import RedisStore
+
+RUN_KEYS = ['model_gem_global_TMP_TGL_2_00Z_count',
+            'model_gem_global_TMP_TGL_2_12Z_count']
+
+
+class DictStore(BaseStore):
+    """store of a dict, relying on BaseStore fallbacks"""
+
+    def __init__(self, keys):
+        super().__init__({'type': 'Dict', 'url': None})
+        self.keys = keys
+
+    def get_key(self, key, raw=False):
+        return self.keys.get(key)
+
+    def set_key(self, key, value, raw=False):
+        self.keys[key] = str(value)
+        return True
+
+
+class TestIncrementCount(unittest.TestCase):
+    """Test suite for model run counts of stores"""
+
+    def test_increment_count(self):
+        """Test that counts are initialized and incremented."""
+
+        store = DictStore({})
+
+        self.assertEqual(store.increment_count(RUN_KEYS[0], 3, RUN_KEYS),
+                         (False, {}))
+        self.assertEqual(store.increment_count(RUN_KEYS[0], 3, RUN_KEYS),
+                         (False, {}))
+        self.assertEqual(store.keys, {RUN_KEYS[0]: '2'})
+
+    def test_increment_count_complete(self):
+        """Test that counts of all model runs are reset on completion."""
+
+        store = DictStore({RUN_KEYS[0]: '2', RUN_KEYS[1]: '1'})
+
+        self.assertEqual(store.increment_count(RUN_KEYS[0], 3, RUN_KEYS),
+                         (True, {}))
+        self.assertEqual(store.keys, {RUN_KEYS[0]: '0', RUN_KEYS[1]: '0'})
+
+    def test_increment_count_incomplete(self):
+        """Test that incomplete model runs are reset by a new model run."""
+
+        store = DictStore({RUN_KEYS[1]: '80'})
+
+        self.assertEqual(store.increment_count(RUN_KEYS[0], 81, RUN_KEYS),
+                         (False, {RUN_KEYS[1]: '80'}))
+        self.assertEqual(store.keys, {RUN_KEYS[0]: '1', RUN_KEYS[1]: '0'})
+
+    @patch('geomet_data_registry.store.redis_.redis.Redis.from_url')
+    def test_increment_count_redis(self, mocked_from_url):
+        """Test that Redis counts are updated with a single script."""
+
+        script = mocked_from_url.return_value.register_script.return_value
+        script.return_value = [0, ['geomet-data-registry_{}'.format(
+            RUN_KEYS[1]), '80']]
+
+        store = RedisStore({'type': 'Redis', 'url': 'redis://localhost'})
+
+        self.assertEqual(store.increment_count(RUN_KEYS[0], 81, RUN_KEYS),
+                         (False, {RUN_KEYS[1]: '80'}))
+        script.assert_called_once_with(keys=[
+            'geomet-data-registry_{}'.format(key)
+            for key in [RUN_KEYS[0]] + RUN_KEYS
+        ], args=[81])
+
+        script.return_value = [1, []]
+        self.assertEqual(store.increment_count(RUN_KEYS[0], 81, RUN_KEYS),
+                         (True, {}))
+
+
+class TestPartitionConfig(unittest.TestCase):
+    """Test suite for partitioned model configurations"""
+
+    def test_partition_config(self):
+        """Test that configurations are partitioned per variable."""
+
+        config = {
+            'reps': {
+                'model_run_retention_hours': 48,
+                'product': {
+                    'variable': {
+                        'APCP_SFC_0': {'members': None}
+                    }
+                },
+                'member': {
+                    'members': 20,
+                    'variable': {
+                        'TMP_TGL_2m': {'members': 20},
+                        'UGRD_TGL_10m': {'members': 20}
+                    }
+                }
+            }
+        }
+
+        fields = partition_config(config)
+
+        self.assertEqual(sorted(fields), [
+            '_header',
+            'reps/member/variable',
+            'reps/member/variable/TMP_TGL_2m',
+            'reps/member/variable/UGRD_TGL_10m',
+            'reps/product/variable',
+            'reps/product/variable/APCP_SFC_0'
+        ])
+        self.assertEqual(json.loads(fields['_header']), {
+            'reps': {
+                'model_run_retention_hours': 48,
+                'product': {
+                    'variable': 'reps/product/variable'
+                },
+                'member': {
+                    'members': 20,
+                    'variable': 'reps/member/variable'
+                }
+            }
+        })
+        self.assertEqual(json.loads(fields['reps/member/variable']),
+                         ['TMP_TGL_2m', 'UGRD_TGL_10m'])
+        self.assertEqual(
+            json.loads(fields['reps/member/variable/TMP_TGL_2m']),
+            {'members': 20})
+
+    @patch('geomet_data_registry.store.redis_.redis.Redis.from_url')
+    def test_fields_redis(self, mocked_from_url):
+        """Test that Redis hash fields are fetched with one HMGET."""
+
+        redis_ = mocked_from_url.return_value
+        redis_.hmget.return_value = ['{}', None]
+
+        store = RedisStore({'type': 'Redis', 'url': 'redis://localhost'})
+
+        self.assertEqual(
+            store.get_fields('reps_config', ['_header', 'reps/x']),
+            ['{}', None])
+        redis_.hmget.assert_called_once_with(
+            'geomet-data-registry_reps_config', ['_header', 'reps/x'])
+
+        self.assertTrue(store.set_fields('reps_config', {'_header': '{}'}))
+        pipeline = redis_.pipeline.return_value
+        pipeline.delete.assert_called_once_with(
+            'geomet-data-registry_reps_config')
+        pipeline.hset.assert_called_once_with(
+            'geomet-data-registry_reps_config', mapping={'_header': '{}'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -57,6 +57,7 @@ class TestWcpsLayer(unittest.TestCase, Setup):
             'name': 'wcps',
             'store': self.mocked_load_plugin.return_value,
             'tileindex': self.mocked_load_plugin.return_value,
+            'layer_dependencies': True,
         }
 
         wcps_layer_attr = self.layer_handler['wcps'].__dict__